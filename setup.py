@@ -30,6 +30,7 @@ setup(
     package_dir={'': 'src'},
     test_suite='tests',
     install_requires=['pyrect'],
+    extras_require={'numpy': ['numpy']},
     keywords="gui window geometry resize minimize maximize close title",
     classifiers=[
         'Development Status :: 4 - Beta',
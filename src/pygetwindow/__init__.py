@@ -19,7 +19,7 @@
 
 __version__ = "0.0.9"
 
-import sys, collections, pyrect
+import sys, collections
 
 
 class PyGetWindowException(Exception):
@@ -44,12 +44,48 @@ Rect = collections.namedtuple("Rect", "left top right bottom")
 Point = collections.namedtuple("Point", "x y")
 Size = collections.namedtuple("Size", "width height")
 
+# Window state bits, as stored in the ``flags`` column of a Snapshot.
+STATE_VISIBLE = 0x1
+STATE_MINIMIZED = 0x2
+STATE_MAXIMIZED = 0x4
+STATE_ACTIVE = 0x8
+
+
+class WindowState(collections.namedtuple("WindowState", "rect flags")):
+    """The geometry and state of a window at one moment, as returned by
+    ``Window.state()`` and ``states()``. ``rect`` is a Rect and ``flags`` is
+    a combination of the STATE_* bits."""
+
+    __slots__ = ()
+
+    @property
+    def isMinimized(self):
+        return bool(self.flags & STATE_MINIMIZED)
+
+    @property
+    def isMaximized(self):
+        return bool(self.flags & STATE_MAXIMIZED)
+
+    @property
+    def isActive(self):
+        return bool(self.flags & STATE_ACTIVE)
+
+    @property
+    def visible(self):
+        return bool(self.flags & STATE_VISIBLE)
+
 
 class BaseWindow:
+    """The base class for Window objects. Subclasses set ``_hWnd`` to the
+    window's handle and ``_backend`` to the backend whose primitive functions
+    (``_getWindowRect()``, ``_showWindow()``, and so on) operate on it."""
+
     def __init__(self):
         pass
 
     def _setupRectProperties(self):
+        import pyrect  # Imported here rather than at the top, so it's only loaded once a Window is created.
+
         def _onRead(attrName):
             r = self._getWindowRect()
             self._rect._left = r.left  # Setting _left directly to skip the onRead.
@@ -65,7 +101,7 @@ class BaseWindow:
         self._rect = pyrect.Rect(r.left, r.top, r.right - r.left, r.bottom - r.top, onChange=_onChange, onRead=_onRead)
 
     def _getWindowRect(self):
-        raise NotImplementedError
+        return self._backend._getWindowRect(self._hWnd)
 
     def __str__(self):
         r = self._getWindowRect()
@@ -80,68 +116,138 @@ class BaseWindow:
             self.title,
         )
 
+    def __repr__(self):
+        return "%s(hWnd=%s)" % (self.__class__.__name__, self._hWnd)
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self._hWnd == other._hWnd
+
     def close(self):
         """Closes this window. This may trigger "Are you sure you want to
         quit?" dialogs or other actions that prevent the window from
         actually closing. This is identical to clicking the X button on the
         window."""
-        raise NotImplementedError
+        self._backend._closeWindow(self._hWnd)
 
     def minimize(self):
         """Minimizes this window."""
-        raise NotImplementedError
+        self._backend._showWindow(self._hWnd, "minimize")
 
     def maximize(self):
         """Maximizes this window."""
-        raise NotImplementedError
+        self._backend._showWindow(self._hWnd, "maximize")
 
     def restore(self):
         """If maximized or minimized, restores the window to it's normal size."""
-        raise NotImplementedError
+        self._backend._showWindow(self._hWnd, "restore")
 
     def activate(self):
         """Activate this window and make it the foreground window."""
-        raise NotImplementedError
+        self._backend._activateWindow(self._hWnd)
 
+    # These read the window's rect once, rather than once for each of the
+    # left, top, width, and height properties.
     def resizeRel(self, widthOffset, heightOffset):
         """Resizes the window relative to its current size."""
-        raise NotImplementedError
+        r = self._getWindowRect()
+        self._backend._setWindowGeometry(self._hWnd, r.left, r.top, r.right - r.left + widthOffset, r.bottom - r.top + heightOffset)
 
     def resizeTo(self, newWidth, newHeight):
         """Resizes the window to a new width and height."""
-        raise NotImplementedError
+        r = self._getWindowRect()
+        self._backend._setWindowGeometry(self._hWnd, r.left, r.top, newWidth, newHeight)
 
     def moveRel(self, xOffset, yOffset):
         """Moves the window relative to its current position."""
-        raise NotImplementedError
+        r = self._getWindowRect()
+        self._backend._setWindowGeometry(self._hWnd, r.left + xOffset, r.top + yOffset, r.right - r.left, r.bottom - r.top)
 
     def moveTo(self, newLeft, newTop):
         """Moves the window to new coordinates on the screen."""
-        raise NotImplementedError
+        r = self._getWindowRect()
+        self._backend._setWindowGeometry(self._hWnd, newLeft, newTop, r.right - r.left, r.bottom - r.top)
+
+    def state(self):
+        """Returns a WindowState with the window's rect and all of its state
+        flags (minimized, maximized, active, and visible), using fewer native
+        calls than reading those properties one at a time."""
+        rect, flags = self._backend._getWindowState(self._hWnd)
+        if self._backend._getActiveWindowHandle() == self._hWnd:
+            flags |= STATE_ACTIVE
+        return WindowState(rect, flags)
+
+    def children(self, snapshot=None):
+        """Returns a list of Window objects for this window's direct child
+        windows (controls, panels, and so on), topmost first. If
+        ``snapshot`` is given, the children are cached in it, so asking again
+        with the same snapshot doesn't make any native calls."""
+        return [_newWindow(self._backend, handle) for handle in _childHandles(self._backend, self._hWnd, snapshot)]
+
+    def descendants(self, maxDepth=None, snapshot=None):
+        """Yields a Window object for each of this window's descendants,
+        depth first, going at most ``maxDepth`` levels down (``1`` is just the
+        children). A window's children are only enumerated when the iteration
+        reaches it, so breaking out early never walks the rest of the tree.
+        ``snapshot`` caches the children the same way as in ``children()``."""
+        backend = self._backend
+        stack = [iter(_childHandles(backend, self._hWnd, snapshot))]
+        while stack:
+            handle = next(stack[-1], None)
+            if handle is None:
+                stack.pop()
+                continue
+            yield _newWindow(backend, handle)
+            if maxDepth is None or len(stack) < maxDepth:
+                stack.append(iter(_childHandles(backend, handle, snapshot)))
+
+    def capture(self, numpy=False):
+        """Returns the window's pixels as a ``(height, width, 4)`` memoryview
+        of BGRA bytes (or a NumPy array, if ``numpy`` is true). The pixels
+        are shared with the next capture, which overwrites them, so copy them
+        to keep them. See WindowCapture."""
+        from . import _capture
+
+        return _capture.defaultCapture(self._backend).capture(self._hWnd, numpy)
 
     @property
     def isMinimized(self):
         """Returns True if the window is currently minimized."""
-        raise NotImplementedError
+        return bool(self._backend._getWindowFlags(self._hWnd) & STATE_MINIMIZED)
 
     @property
     def isMaximized(self):
         """Returns True if the window is currently maximized."""
-        raise NotImplementedError
+        return bool(self._backend._getWindowFlags(self._hWnd) & STATE_MAXIMIZED)
 
     @property
     def isActive(self):
         """Returns True if the window is currently the active, foreground window."""
-        raise NotImplementedError
+        return self._backend._getActiveWindowHandle() == self._hWnd
 
     @property
     def title(self):
         """Returns the window title as a string."""
-        raise NotImplementedError
+        return self._backend._getWindowTitle(self._hWnd)
 
     @property
     def visible(self):
-        raise NotImplementedError
+        """Return ``True`` if the window is currently visible."""
+        return bool(self._backend._getWindowFlags(self._hWnd) & STATE_VISIBLE)
+
+    @property
+    def pid(self):
+        """Returns the ID of the process that owns the window, or ``None`` if
+        it can't be found out."""
+        return self._backend._getWindowPid(self._hWnd)
+
+    @property
+    def processName(self):
+        """Returns the file name of the executable of the process that owns
+        the window (such as ``'notepad.exe'``), or ``None`` if it can't be
+        found out."""
+        from . import _processes
+
+        return _processes.processName(self._backend, self.pid)
 
     # Wrappers for pyrect.Rect object's properties:
     @property
@@ -326,24 +432,391 @@ class BaseWindow:
         self._rect.box = value
 
 
-if sys.platform == "darwin":
-    # raise NotImplementedError('PyGetWindow currently does not support macOS. If you have Appkit/Cocoa knowledge, please contribute! https://github.com/asweigart/pygetwindow') # TODO - implement mac
-    from ._pygetwindow_macos import *
+# The backend is a module (or object) that provides the primitive functions
+# everything below is built on: _enumWindowHandles(), _getActiveWindowHandle(),
+# _getWindowRect(), _getWindowTitle(), _getWindowFlags(), _getWindowState(),
+# _setWindowGeometry(), _showWindow(), _activateWindow(), _closeWindow(), _enumMonitors(), and
+# _getDisplayGeneration(), _enumChildHandles(), _getWindowPid(), _getProcessPath(),
+# _getWindowClass(), _setWindowZOrder(), and _getCursorPosition(). Its ``Window`` attribute is the Window class to create for a handle. See
+# useBackend(). Backends that can report window events as they happen also
+# provide _watchWindowEvents(callback), and backends that can capture
+# windows' pixels provide _openCaptureSession().
+#
+# The native backend for this platform is imported the first time it's
+# needed, so ``import pygetwindow`` stays fast and works on every platform.
+# ``_backend`` is ``None`` while the native backend is in use.
+_platformBackend = None
+_backend = None
+
+
+def _getPlatformBackend():
+    global _platformBackend
+    if _platformBackend is None:
+        if sys.platform == "win32":
+            from . import _pygetwindow_win
+
+            _platformBackend = _pygetwindow_win
+        elif sys.platform == "darwin":
+            from . import _pygetwindow_macos
+
+            _platformBackend = _pygetwindow_macos
+        else:
+            from . import _pygetwindow_linux
+
+            _platformBackend = _pygetwindow_linux._getDefaultBackend()
+    return _platformBackend
+
+
+def _getBackend():
+    backend = _getPlatformBackend() if _backend is None else _backend
+    if backend is None:
+        raise NotImplementedError("PyGetWindow has no backend for this platform. See useBackend().")
+    return backend
+
+
+def useBackend(backend):
+    """Makes PyGetWindow use ``backend`` instead of the platform's native
+    windowing API, and returns the backend that was in use before. Pass
+    ``None`` to go back to the native backend.
+
+    This is mostly useful with ``ReplayBackend``, which lets the rest of
+    PyGetWindow run against a recorded session on any platform."""
+    global _backend
+    previousBackend = _backend
+    _backend = backend
+    return previousBackend
+
+
+def _newWindow(backend, handle):
+    return backend.Window(handle, backend)
+
+
+def _childHandles(backend, handle, snapshot):
+    # Returns the handles of a window's children, from the snapshot's cache
+    # if there is a snapshot.
+    if snapshot is None:
+        return backend._enumChildHandles(handle)
+    children = snapshot._children.get(handle)
+    if children is None:
+        children = snapshot._children[handle] = tuple(backend._enumChildHandles(handle))
+    return children
+
+
+def getActiveWindow():
+    """Returns a Window object of the currently active (focused) Window."""
+    backend = _getBackend()
+    handle = backend._getActiveWindowHandle()
+    if handle is None:
+        return None
+    return _newWindow(backend, handle)
+
+
+def getActiveWindowTitle():
+    """Returns a string of the title text of the currently active (focused) Window."""
+    backend = _getBackend()
+    handle = backend._getActiveWindowHandle()
+    if handle is None:
+        return None
+    return backend._getWindowTitle(handle)
+
+
+def getWindowsAt(x, y):
+    """Returns a list of Window objects whose windows contain the point ``(x, y)``.
+
+    * ``x`` (int, optional): The x position of the window(s).
+    * ``y`` (int, optional): The y position of the window(s)."""
+    backend = _getBackend()
+    windowsAtXY = []
+    for handle in backend._enumWindowHandles():
+        r = backend._getWindowRect(handle)
+        if pointInRect(x, y, r.left, r.top, r.right - r.left, r.bottom - r.top):
+            windowsAtXY.append(_newWindow(backend, handle))
+    return windowsAtXY
+
+
+def getWindowsWithTitle(title):
+    """Returns a list of Window objects that substring match ``title`` in their title text."""
+    return _windowsWithTitle(_getBackend(), title)
+
+
+def _windowsWithTitle(backend, title):
+    title = title.upper()
+    windowObjs = []
+    for handle in backend._enumWindowHandles():
+        if title in backend._getWindowTitle(handle).upper():  # do a case-insensitive match
+            windowObjs.append(_newWindow(backend, handle))
+    return windowObjs
+
+
+def getAllTitles():
+    """Returns a list of strings of window titles for all visible windows."""
+    backend = _getBackend()
+    return [backend._getWindowTitle(handle) for handle in backend._enumWindowHandles()]
+
+
+def getAllWindows(fetch=None, workers=None):
+    """Returns a list of Window objects for all visible windows.
+
+    ``fetch`` is a list of attributes to read from every window up front:
+    any of ``'title'``, ``'rect'``, ``'state'``, ``'pid'``, ``'processName'``,
+    ``'className'``, and ``'children'`` (a list of handles). Each Window then
+    has a ``fetched`` dict of their values, and windows that close while
+    they're being read are left out. If ``workers`` is more than ``1``, the
+    windows are read on that many threads at once; the list is in z-order
+    either way."""
+    backend = _getBackend()
+    if fetch is None and workers is None:
+        return [_newWindow(backend, handle) for handle in backend._enumWindowHandles()]
+
+    from . import _fetch
+
+    return _fetch.fetchWindows(backend, backend._enumWindowHandles(), fetch or (), workers)
 
-    Window = MacOSWindow
-elif sys.platform == "win32":
-    from ._pygetwindow_win import (
-        Win32Window,
-        getActiveWindow,
-        getActiveWindowTitle,
-        getWindowsAt,
-        getWindowsWithTitle,
-        getAllWindows,
-        getAllTitles,
-    )
 
-    Window = Win32Window
+def states(windows):
+    """Returns a list of WindowState objects for each of the Window objects
+    in ``windows``. The active window is only looked up once for all of
+    them, rather than once per window as ``Window.state()`` would."""
+    activeHandles = {}  # Maps each backend to its active window's handle.
+    results = []
+    for window in windows:
+        backend = window._backend
+        if backend not in activeHandles:
+            activeHandles[backend] = backend._getActiveWindowHandle()
+        rect, flags = backend._getWindowState(window._hWnd)
+        if activeHandles[backend] == window._hWnd:
+            flags |= STATE_ACTIVE
+        results.append(WindowState(rect, flags))
+    return results
+
+
+def getSnapshot(workers=None):
+    """Returns a Snapshot of all visible windows, recording each window's
+    handle, geometry, title, and state flags in z-order. Pass two snapshots
+    to ``diff()`` to find out what changed between them. If ``workers`` is
+    more than ``1``, the windows are read on that many threads at once."""
+    from . import _snapshot
+
+    return _snapshot.takeSnapshot(_getBackend(), workers)
+
+
+def changeToken():
+    """Returns a hash of the visible windows' handles, z-order, and rects.
+    This doesn't read any titles or create any Window objects, so it is a
+    cheap way to check whether anything has moved since the last call (or
+    since a snapshot was taken; see ``Snapshot.fingerprint()``)."""
+    from . import _snapshot
+
+    return _snapshot.changeToken(_getBackend())
+
+
+def pollUntilChanged(interval=0.1, backoff=1.0, maxInterval=None, timeout=None, token=None):
+    """Waits for the visible windows to change and returns a new Snapshot.
+    Each poll only computes ``changeToken()``; the full snapshot is taken
+    once a change is seen. If ``backoff`` is greater than ``1.0``, the delay
+    between polls grows by that factor each time nothing changes, up to
+    ``maxInterval`` seconds. Returns ``None`` if ``timeout`` seconds pass
+    without a change."""
+    from . import _snapshot
+
+    return _snapshot.pollUntilChanged(_getBackend(), interval, backoff, maxInterval, timeout, token)
+
+
+def getMonitors():
+    """Returns a list of Monitor objects, one for each display monitor, with
+    its rect, work area (the part not covered by taskbars and docks), and
+    DPI. The list is cached until the display configuration changes, so
+    calling this often is cheap."""
+    from . import _monitors
+
+    return _monitors.getMonitors(_getBackend())
+
+
+def monitorOf(window, snapshot=None):
+    """Returns the Monitor that most of ``window`` (a Window object or a
+    handle) is on, or the nearest one if it's off-screen. If ``snapshot`` is
+    given, the window's rect is read from it instead of the native API, and
+    the answers for all of the snapshot's windows are computed together."""
+    from . import _monitors
+
+    handle = getattr(window, "_hWnd", window)
+    return _monitors.monitorOf(_getBackend(), handle, snapshot)
+
+
+def windowsOnMonitor(monitor, snapshot=None):
+    """Returns a list of WindowRecords, in z-order, of the windows that are
+    mostly on ``monitor``. They're read from ``snapshot`` (or from a new
+    snapshot, if it is ``None``); no native calls are made per window."""
+    from . import _monitors
+
+    backend = _getBackend()
+    if snapshot is None:
+        snapshot = getSnapshot()
+    return _monitors.windowsOnMonitor(backend, monitor, snapshot)
+
+
+def visibleRegion(window, snapshot=None):
+    """Returns a list of non-overlapping Rects covering the parts of
+    ``window`` (a Window object or a handle) that aren't covered by any
+    window above it in the z-order. Minimized and hidden windows have no
+    visible region. The windows are read from ``snapshot``, or from a new
+    snapshot if it is ``None``."""
+    from . import _occlusion
+
+    if snapshot is None:
+        snapshot = getSnapshot()
+    return _occlusion.visibleRegion(snapshot, getattr(window, "_hWnd", window))
+
+
+def occlusionReport(snapshot=None):
+    """Returns an OrderedDict mapping the handle of every window in
+    ``snapshot`` (or in a new snapshot, if it is ``None``) to an Occlusion
+    tuple of its area, its visible (uncovered) area, and whether it is
+    completely occluded. All the windows are done in a single pass from the
+    top of the z-order down."""
+    from . import _occlusion
+
+    if snapshot is None:
+        snapshot = getSnapshot()
+    return _occlusion.occlusionReport(snapshot)
+
+
+def windowsOfProcess(pid, snapshot=None):
+    """Returns a list of WindowRecords, in z-order, of the windows in
+    ``snapshot`` (or in a new snapshot, if it is ``None``) that belong to the
+    process with ID ``pid``. The process of every window is looked up once
+    per snapshot; after that, each query only costs as much as its result."""
+    from . import _processes
+
+    if snapshot is None:
+        snapshot = getSnapshot()
+    return _processes.windowsOfProcess(_getBackend(), pid, snapshot)
+
+
+def windowsOfExecutable(name, snapshot=None):
+    """Returns a list of WindowRecords, in z-order, of the windows in
+    ``snapshot`` (or in a new snapshot, if it is ``None``) that belong to
+    processes running the executable ``name``, such as ``'notepad.exe'``.
+    The match is case-insensitive and ignores any directory in ``name``."""
+    from . import _processes
+
+    if snapshot is None:
+        snapshot = getSnapshot()
+    return _processes.windowsOfExecutable(_getBackend(), name, snapshot)
+
+
+def captureWindows(windows, numpy=False):
+    """Returns a list of frames, like ``Window.capture()`` returns, of the
+    Window objects in ``windows``. The windows of each backend are captured
+    together into one shared buffer."""
+    from . import _capture
+
+    windows = list(windows)
+    frames = [None] * len(windows)
+    byBackend = collections.OrderedDict()  # Maps each backend to the indexes of its windows.
+    for i, window in enumerate(windows):
+        byBackend.setdefault(window._backend, []).append(i)
+    for backend, indexes in byBackend.items():
+        results = _capture.defaultCapture(backend).captureMany([windows[i] for i in indexes], numpy)
+        for i, frame in zip(indexes, results):
+            frames[i] = frame
+    return frames
+
+
+def displayWindowsUnderMouse(xOffset=0, yOffset=0):
+    """This function is meant to be run from the command line. It will
+    automatically display the location of the mouse cursor and the title of
+    the window under it, until Ctrl-C is pressed."""
+    import time
+
+    from . import _cursor
+
+    print('Press Ctrl-C to quit.')
+    if xOffset != 0 or yOffset != 0:
+        print('xOffset: %s yOffset: %s' % (xOffset, yOffset))
+    backend = _getBackend()
+    tracker = _cursor.CursorTracker(rate=30)
+    tracker.start()
+    previousLength = 0
+    try:
+        while True:
+            time.sleep(0.05)
+            if tracker.position is None:
+                continue
+            x, y = tracker.position
+            title = backend._getWindowTitle(tracker.hovered) if tracker.hovered is not None else ''
+            positionStr = 'X: ' + str(x - xOffset).rjust(4) + ' Y: ' + str(y - yOffset).rjust(4) + '  ' + title
+            # Pad with spaces to erase the rest of a longer previous line.
+            sys.stdout.write(positionStr.ljust(previousLength) + '\b' * max(len(positionStr), previousLength))
+            sys.stdout.flush()
+            previousLength = len(positionStr)
+    except KeyboardInterrupt:
+        sys.stdout.write('\n')
+        sys.stdout.flush()
+    finally:
+        tracker.stop()
+
+
+# Names that are imported from a submodule the first time they're used.
+_LAZY_NAMES = {
+    "Snapshot": "_snapshot",
+    "WindowRecord": "_snapshot",
+    "SnapshotDiff": "_snapshot",
+    "diff": "_snapshot",
+    "Monitor": "_monitors",
+    "Occlusion": "_occlusion",
+    "WindowSet": "_windowset",
+    "SessionRecorder": "_replay",
+    "ReplayBackend": "_replay",
+    "ReplayWindow": "_replay",
+    "WindowHistory": "_history",
+    "FocusTracker": "_focus",
+    "FocusStats": "_focus",
+    "Rule": "_rules",
+    "WindowRules": "_rules",
+    "RuleStats": "_rules",
+    "CursorTracker": "_cursor",
+    "CursorStats": "_cursor",
+    "WindowCapture": "_capture",
+    "CaptureStats": "_capture",
+    "MultiDisplay": "_multidisplay",
+    "LiveModel": "_live",
+    "LiveVersion": "_live",
+    "GeometryStream": "_stream",
+    "StreamStats": "_stream",
+    "DisplayWindow": "_multidisplay",
+}
+
+# Names that are imported from the platform's backend module the first time they're used.
+if sys.platform == "win32":
+    _PLATFORM_MODULE, _PLATFORM_NAMES = "_pygetwindow_win", ("Window", "Win32Window")
+elif sys.platform == "darwin":
+    _PLATFORM_MODULE, _PLATFORM_NAMES = "_pygetwindow_macos", ("Window", "MacOSWindow")
 else:
-    raise NotImplementedError(
-        "PyGetWindow currently does not support Linux. If you have Xlib knowledge, please contribute! https://github.com/asweigart/pygetwindow"
-    )
+    _PLATFORM_MODULE, _PLATFORM_NAMES = "_pygetwindow_linux", ("Window", "X11Window", "X11Backend")
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        moduleName = _LAZY_NAMES[name]
+    elif name in _PLATFORM_NAMES:
+        moduleName = _PLATFORM_MODULE
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    import importlib
+
+    value = getattr(importlib.import_module("." + moduleName, __name__), name)
+    globals()[name] = value  # Later lookups find the name without calling __getattr__().
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES) | set(_PLATFORM_NAMES))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__() needs Python 3.7, so import everything now.
+    for _name in list(_LAZY_NAMES) + list(_PLATFORM_NAMES):
+        __getattr__(_name)
+    del _name
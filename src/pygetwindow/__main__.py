@@ -0,0 +1,235 @@
+# The command-line interface: python -m pygetwindow stats [options]
+#
+# ``stats`` takes snapshots of the live desktop through a profiling wrapper
+# around the backend, which times and counts every primitive call (and adds
+# up the time spent on each window), and reports the results as text or as
+# one JSON object per line. With --watch it reports each change to the
+# windows instead, as it is seen.
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+import pygetwindow
+
+
+# The upper bounds of the title length histogram's buckets; the last bucket has no upper bound.
+_TITLE_LENGTH_BUCKETS = (0, 15, 31, 63, 127)
+
+
+class _ProfilingBackend(object):
+    # Passes primitive calls through to ``backend``, counting and timing them.
+
+    def __init__(self, backend):
+        from pygetwindow._replay import _PRIMITIVES
+
+        self._backend = backend
+        self._primitives = _PRIMITIVES
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def Window(self):
+        return self._backend.Window
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}  # Maps primitive name -> [count, total seconds].
+            self.handleTimes = {}  # Maps handle -> total seconds of the calls about that window.
+
+    def __getattr__(self, name):
+        if name not in self._primitives:
+            raise AttributeError(name)
+        primitive = getattr(self._backend, name)
+
+        def profiledPrimitive(*args):
+            start = time.time()
+            try:
+                return primitive(*args)
+            finally:
+                elapsed = time.time() - start
+                with self._lock:
+                    call = self.calls.setdefault(name, [0, 0.0])
+                    call[0] += 1
+                    call[1] += elapsed
+                    if args and name not in ("_getProcessPath",):
+                        self.handleTimes[args[0]] = self.handleTimes.get(args[0], 0.0) + elapsed
+
+        return profiledPrimitive
+
+
+def _percentile(sortedValues, fraction):
+    if not sortedValues:
+        return None
+    return sortedValues[min(int(len(sortedValues) * fraction), len(sortedValues) - 1)]
+
+
+def _titleLengths(titles):
+    lengths = sorted(len(title) for title in titles)
+    histogram = {}
+    for length in lengths:
+        for bound in _TITLE_LENGTH_BUCKETS:
+            if length <= bound:
+                key = "<=%d" % (bound)
+                break
+        else:
+            key = ">%d" % (_TITLE_LENGTH_BUCKETS[-1])
+        histogram[key] = histogram.get(key, 0) + 1
+    return {
+        "min": lengths[0] if lengths else None,
+        "median": _percentile(lengths, 0.5),
+        "p90": _percentile(lengths, 0.9),
+        "max": lengths[-1] if lengths else None,
+        "empty": lengths.count(0),
+        "histogram": histogram,
+    }
+
+
+def _optional(function):
+    # Returns function() as a list, or None if the backend can't answer.
+    if function is None:
+        return None
+    try:
+        return list(function())
+    except (pygetwindow.PyGetWindowException, NotImplementedError):
+        return None
+
+
+def takeStats(profiler, top=5, workers=None):
+    """Takes a snapshot through ``profiler`` and returns a dict of its
+    statistics, ready to be written as JSON."""
+    from pygetwindow._snapshot import takeSnapshot
+
+    profiler.reset()
+    start = time.time()
+    snapshot = takeSnapshot(profiler, workers)
+    elapsed = time.time() - start
+
+    with profiler._lock:
+        calls = dict((name, {"count": count, "time": total}) for name, (count, total) in profiler.calls.items())
+        handleTimes = dict(profiler.handleTimes)
+    index = snapshot._getIndex()
+    slowest = sorted((handle for handle in handleTimes if handle in index), key=lambda handle: -handleTimes[handle])[:top]
+    backend = profiler._backend
+    return {
+        "timestamp": snapshot.timestamp,
+        "windows": len(snapshot),
+        "visibleWindows": sum(1 for flags in snapshot.flags if flags & pygetwindow.STATE_VISIBLE),
+        "snapshotTime": elapsed,
+        "enumerationTime": calls.get("_enumWindowHandles", {}).get("time", 0.0),
+        "calls": calls,
+        "titleLengths": _titleLengths(snapshot.titles),
+        "slowestWindows": [{"handle": handle, "title": snapshot.titles[index[handle]], "time": handleTimes[handle]} for handle in slowest],
+        "cursor": _optional(getattr(backend, "cursor", None) or getattr(backend, "_getCursorPosition", None)),
+        "resolution": _optional(getattr(backend, "resolution", None)),
+    }, snapshot
+
+
+def _ms(seconds):
+    return "%.2f ms" % (seconds * 1000)
+
+
+def _writeText(out, stats):
+    out.write("Windows: %s (%s visible)\n" % (stats["windows"], stats["visibleWindows"]))
+    out.write("Snapshot: %s (enumeration %s)\n" % (_ms(stats["snapshotTime"]), _ms(stats["enumerationTime"])))
+    out.write("Primitive calls:\n")
+    for name, call in sorted(stats["calls"].items(), key=lambda item: -item[1]["time"]):
+        out.write("  %-24s %6d  %s\n" % (name, call["count"], _ms(call["time"])))
+    lengths = stats["titleLengths"]
+    if stats["windows"]:
+        out.write("Title lengths: min %s, median %s, 90th percentile %s, max %s (%s empty)\n"
+                  % (lengths["min"], lengths["median"], lengths["p90"], lengths["max"], lengths["empty"]))
+    if stats["slowestWindows"]:
+        out.write("Slowest windows:\n")
+        for window in stats["slowestWindows"]:
+            out.write("  %-12s %s  %r\n" % (window["handle"], _ms(window["time"]), window["title"]))
+    if stats["cursor"] is not None:
+        out.write("Cursor: %s, %s\n" % tuple(stats["cursor"]))
+    if stats["resolution"] is not None:
+        out.write("Resolution: %sx%s\n" % tuple(stats["resolution"]))
+
+
+def _changes(oldSnapshot, newSnapshot):
+    # Yields (event, WindowRecord) for each change between two snapshots.
+    from pygetwindow._snapshot import diff
+
+    changes = diff(oldSnapshot, newSnapshot)
+    for handle, record in changes.created.items():
+        yield "created", record
+    for handle, record in changes.destroyed.items():
+        yield "destroyed", record
+    for event in ("moved", "resized", "retitled", "stateChanged"):
+        for handle, (oldRecord, newRecord) in getattr(changes, event).items():
+            yield event, newRecord
+
+
+def _writeJson(out, value):
+    out.write(json.dumps(value, separators=(",", ":"), ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def stats(args, out):
+    profiler = _ProfilingBackend(pygetwindow._getBackend())
+    previous = None
+    sample = 0
+    while True:
+        result, snapshot = takeStats(profiler, args.top, args.workers)
+        if args.watch:
+            if previous is not None:
+                for event, record in _changes(previous, snapshot):
+                    change = {"timestamp": snapshot.timestamp, "event": event, "handle": record.handle, "title": record.title,
+                              "rect": list(record.rect), "flags": record.flags, "snapshotTime": result["snapshotTime"]}
+                    if args.json:
+                        _writeJson(out, change)
+                    else:
+                        out.write("%.3f %-12s %-12s %s %r (snapshot %s)\n" % (change["timestamp"], event, record.handle,
+                                                                             tuple(record.rect), record.title, _ms(result["snapshotTime"])))
+                        out.flush()
+            previous = snapshot
+        elif args.json:
+            _writeJson(out, result)
+        else:
+            if sample:
+                out.write("\n")
+            _writeText(out, result)
+            out.flush()
+        sample += 1
+        if args.count and sample >= args.count:
+            return 0
+        time.sleep(args.interval)
+
+
+def main(argv=None, out=None):
+    """Runs the command line in ``argv`` (``sys.argv[1:]``, if it is
+    ``None``), writing to ``out`` (standard output). Returns the exit code."""
+    parser = argparse.ArgumentParser(prog="python -m pygetwindow", description="Reports on the windows of the desktop.")
+    commands = parser.add_subparsers(dest="command")
+    statsParser = commands.add_parser("stats", help="report enumeration latency, primitive calls, and window statistics")
+    statsParser.add_argument("--json", action="store_true", help="write one JSON object per line")
+    statsParser.add_argument("--watch", action="store_true", help="report each change to the windows as it is seen")
+    statsParser.add_argument("--interval", type=float, default=1.0, help="seconds between samples (default: 1)")
+    statsParser.add_argument("--count", type=int, default=None,
+                             help="number of samples to take, or 0 to keep going (default: 1, or 0 with --watch)")
+    statsParser.add_argument("--top", type=int, default=5, help="number of slowest windows to list (default: 5)")
+    statsParser.add_argument("--workers", type=int, default=None, help="threads to read the windows on (see getSnapshot())")
+    args = parser.parse_args(argv)
+    if out is None:
+        out = sys.stdout
+    if args.command != "stats":
+        parser.print_help(out)
+        return 2
+    if args.count is None:
+        args.count = 0 if args.watch else 1
+    try:
+        return stats(args, out)
+    except KeyboardInterrupt:
+        return 0
+    except (pygetwindow.PyGetWindowException, NotImplementedError) as exc:
+        sys.stderr.write("%s: error: %s\n" % (parser.prog, exc))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# WindowCapture: copies of windows' pixels, without the copies.
+#
+# The backend's capture session has the OS write each window's pixels
+# straight into memory that is shared with this process (a MIT-SHM segment
+# on X11, a file mapping behind a DIB section on Windows), and returns
+# buffers over that memory. Frames are handed out as memoryviews (or NumPy
+# arrays) of those same buffers, so the pixels are never copied in Python.
+# The memory is reused by the next capture, so each capture allocates
+# nothing once the session has seen the window sizes involved.
+
+import collections
+import threading
+import time
+import weakref
+
+import pygetwindow
+
+
+# ``frames`` is the number of capture calls (a batch of windows captured
+# together counts once) and ``windows`` the number of windows captured in
+# them. ``meanFrameTime``, ``maxFrameTime``, and ``lastFrameTime`` are the
+# seconds those calls took.
+CaptureStats = collections.namedtuple("CaptureStats", "frames windows meanFrameTime maxFrameTime lastFrameTime")
+
+
+class WindowCapture(object):
+    """Captures the pixels of windows on ``backend`` (the current backend,
+    if it is ``None``). Each frame is a ``(height, width, 4)`` memoryview of
+    BGRA bytes, or a NumPy array of them if ``numpy`` is true.
+
+    Frames share memory with the capture session, so the next capture
+    overwrites them: copy a frame (such as with ``bytes()`` or
+    ``array.copy()``) to keep it. Raises NotImplementedError if the backend
+    can't capture windows. Call ``close()``, or use a ``with`` statement, to
+    release the shared memory."""
+
+    def __init__(self, backend=None):
+        self._backend = pygetwindow._getBackend() if backend is None else backend
+        if not hasattr(self._backend, "_openCaptureSession"):
+            raise NotImplementedError("%r can't capture windows." % (self._backend,))
+        self._session = None
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._windows = 0
+        self._totalFrameTime = 0.0
+        self._maxFrameTime = 0.0
+        self._lastFrameTime = None
+
+    def __repr__(self):
+        return "%s(frames=%s)" % (self.__class__.__name__, self._frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def capture(self, window, numpy=False):
+        """Returns a frame of ``window`` (a Window object or a handle)."""
+        return self.captureMany([window], numpy)[0]
+
+    def captureMany(self, windows, numpy=False):
+        """Returns a list of frames of ``windows`` (Window objects or
+        handles), in order. The whole batch is captured in one call to the
+        backend, into one shared buffer."""
+        handles = [getattr(window, "_hWnd", window) for window in windows]
+        if numpy:
+            from pygetwindow._windowset import _getNumPy
+
+            np = _getNumPy()
+            if np is None:
+                raise pygetwindow.PyGetWindowException("NumPy is not installed.")
+        with self._lock:
+            start = time.time()
+            if self._session is None:
+                self._session = self._backend._openCaptureSession()
+            results = self._session.capture(handles) if handles else []
+            elapsed = time.time() - start
+            self._frames += 1
+            self._windows += len(handles)
+            self._totalFrameTime += elapsed
+            self._maxFrameTime = max(self._maxFrameTime, elapsed)
+            self._lastFrameTime = elapsed
+
+        if numpy:
+            return [np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4) for pixels, width, height in results]
+        return [memoryview(pixels).cast("B", (height, width, 4)) for pixels, width, height in results]
+
+    def stats(self):
+        """Returns a CaptureStats tuple of the captures so far."""
+        with self._lock:
+            return CaptureStats(self._frames, self._windows,
+                                self._totalFrameTime / self._frames if self._frames else None,
+                                self._maxFrameTime if self._frames else None,
+                                self._lastFrameTime)
+
+    def close(self):
+        """Releases the capture session. Frames that are still in use keep
+        their memory until they are garbage collected."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+# Maps each backend to the WindowCapture used by Window.capture() and
+# captureWindows(), so that they reuse one session's shared memory.
+_defaultCaptures = weakref.WeakKeyDictionary()
+_defaultCapturesLock = threading.Lock()
+
+
+def defaultCapture(backend):
+    with _defaultCapturesLock:
+        capture = _defaultCaptures.get(backend)
+        if capture is None:
+            capture = _defaultCaptures[backend] = WindowCapture(backend)
+        return capture
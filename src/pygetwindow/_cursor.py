@@ -0,0 +1,234 @@
+# CursorTracker: which window is under the mouse cursor, sampled many times
+# a second.
+#
+# Each sample is one native call (the cursor position). The window under the
+# cursor is found in an index of the visible windows' rects in z-order that
+# is kept up to date by the backend's window events: a moved window has its
+# one rect re-read, an activated window moves to the top, and so on. So no
+# sample enumerates the windows, and a sample where neither the cursor nor
+# the index changed does no hit-testing at all. The index is rebuilt from
+# scratch every ``resyncInterval`` seconds in case an event was missed (and
+# that is all that keeps it current on backends without window events).
+
+import collections
+import threading
+import time
+
+import pygetwindow
+from pygetwindow import PyGetWindowException, STATE_VISIBLE, STATE_MINIMIZED
+
+
+# ``samples`` is the number of cursor samples taken and ``hoverChanges`` the
+# number of times the hovered window changed. ``meanSampleTime`` and
+# ``maxSampleTime`` are the seconds each sample took (reading the cursor and
+# finding the window under it), and ``lateSamples`` counts the samples that
+# started more than a full interval late. ``indexUpdates`` and ``resyncs``
+# count the changes made to the index from events and the full rebuilds.
+CursorStats = collections.namedtuple("CursorStats", "samples hoverChanges meanSampleTime maxSampleTime lateSamples indexUpdates resyncs")
+
+
+class CursorTracker(object):
+    """Samples the mouse cursor ``rate`` times a second on a background
+    thread, and calls ``callback(handle, point, timestamp)`` each time the
+    topmost window under it changes (``handle`` is ``None`` when there is no
+    window under it). Use ``start()`` and ``stop()``, or a ``with``
+    statement. ``backend`` is the current backend if it is ``None``."""
+
+    def __init__(self, callback=None, rate=120, resyncInterval=2.0, backend=None):
+        if rate <= 0:
+            raise PyGetWindowException("rate must be greater than 0.")
+        self.callback = callback
+        self.interval = 1.0 / rate
+        self.resyncInterval = resyncInterval
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopSampling = threading.Event()
+        self._stopWatching = None
+
+        self._order = []  # The handles of the visible windows, topmost first.
+        self._rects = {}  # Maps handle -> (left, top, right, bottom), or None if it's minimized.
+        self._generation = 0  # Changes whenever the index does.
+        self._lastResync = None
+
+        self.hovered = None  # The handle of the window under the cursor.
+        self.position = None  # The cursor's position at the last sample.
+        self._lastSample = (None, None)  # The (position, generation) that hovered was found for.
+
+        self._samples = 0
+        self._hoverChanges = 0
+        self._totalSampleTime = 0.0
+        self._maxSampleTime = 0.0
+        self._lateSamples = 0
+        self._indexUpdates = 0
+        self._resyncs = 0
+
+    def __repr__(self):
+        return "%s(rate=%s, hovered=%r)" % (self.__class__.__name__, round(1.0 / self.interval, 3), self.hovered)
+
+    def _getBackend(self):
+        return pygetwindow._getBackend() if self._backend is None else self._backend
+
+    def start(self):
+        """Builds the window index and starts sampling."""
+        if self._thread is not None:
+            raise PyGetWindowException("The CursorTracker has already been started.")
+        backend = self._getBackend()
+        self.resync()
+        if hasattr(backend, "_watchWindowEvents"):
+            self._stopWatching = backend._watchWindowEvents(self._onEvent)
+        self._stopSampling.clear()
+        self._thread = threading.Thread(target=self._run, name="pygetwindow cursor tracker")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops sampling and watching for window events."""
+        if self._stopWatching is not None:
+            self._stopWatching()
+            self._stopWatching = None
+        if self._thread is not None:
+            self._stopSampling.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _run(self):
+        nextSample = time.time()
+        while True:
+            # Samples are scheduled on a fixed grid, so that a slow sample
+            # doesn't shift all the ones after it.
+            delay = nextSample - time.time()
+            if self._stopSampling.wait(max(delay, 0)):
+                return
+            if delay < -self.interval:
+                self._lateSamples += 1
+                nextSample = time.time()
+            nextSample += self.interval
+            try:
+                if time.time() - self._lastResync >= self.resyncInterval:
+                    self.resync()
+                self.sample()
+            except PyGetWindowException:
+                pass  # The cursor couldn't be read (such as while the desktop is locked); try again next time.
+
+    def sample(self):
+        """Reads the cursor position, updates ``hovered``, and calls the
+        callback if it changed. Returns the handle of the hovered window.
+        This is what the background thread calls ``rate`` times a second."""
+        start = time.time()
+        point = self._getBackend()._getCursorPosition()
+        with self._lock:
+            key = (point, self._generation)
+            changed = False
+            if key != self._lastSample:
+                self._lastSample = key
+                handle = self._windowAt(point[0], point[1])
+                changed = handle != self.hovered
+                self.hovered = handle
+            self.position = point
+            handle = self.hovered
+            elapsed = time.time() - start
+            self._samples += 1
+            self._totalSampleTime += elapsed
+            self._maxSampleTime = max(self._maxSampleTime, elapsed)
+            if changed:
+                self._hoverChanges += 1
+        if changed and self.callback is not None:
+            self.callback(handle, point, start)
+        return handle
+
+    def _windowAt(self, x, y):
+        # Like pointInRect(), points on an edge don't count.
+        rects = self._rects
+        for handle in self._order:
+            rect = rects[handle]
+            if rect is not None and rect[0] < x < rect[2] and rect[1] < y < rect[3]:
+                return handle
+        return None
+
+    def windowAt(self, x, y):
+        """Returns the handle of the topmost window in the index that
+        contains the point ``(x, y)``, or ``None``. No native calls are made."""
+        with self._lock:
+            return self._windowAt(x, y)
+
+    def resync(self):
+        """Rebuilds the window index from the backend."""
+        backend = self._getBackend()
+        order = []
+        rects = {}
+        for handle in backend._enumWindowHandles():
+            try:
+                rects[handle] = _shownRect(*backend._getWindowState(handle))
+            except PyGetWindowException:
+                continue  # The window closed after it was enumerated.
+            order.append(handle)
+        with self._lock:
+            self._order = order
+            self._rects = rects
+            self._generation += 1
+            self._resyncs += 1
+            self._lastResync = time.time()
+
+    def _onEvent(self, event, handle, timestamp):
+        backend = self._getBackend()
+        try:
+            if event in ("created", "moved", "activated") and handle is not None:
+                rect = _shownRect(*backend._getWindowState(handle))
+            elif event == "restacked":
+                order = backend._enumWindowHandles()
+                newRects = {}
+                for newHandle in order:
+                    if newHandle not in self._rects:
+                        newRects[newHandle] = _shownRect(*backend._getWindowState(newHandle))
+            elif event != "destroyed":
+                return
+        except PyGetWindowException:
+            if event == "restacked":
+                return  # A window closed in the meantime; the destroyed event will follow.
+            event = "destroyed"  # The window is already gone.
+
+        with self._lock:
+            if event == "restacked":
+                self._rects.update(newRects)
+                for oldHandle in set(self._rects) - set(order):
+                    del self._rects[oldHandle]
+                self._order = order
+            elif event == "destroyed":
+                if handle in self._rects:
+                    del self._rects[handle]
+                    self._order.remove(handle)
+            elif event == "moved":
+                if handle not in self._rects:
+                    return  # Not a visible window.
+                self._rects[handle] = rect
+            else:
+                # Created and activated windows go to the top of the z-order.
+                if handle in self._rects:
+                    self._order.remove(handle)
+                self._order.insert(0, handle)
+                self._rects[handle] = rect
+            self._generation += 1
+            self._indexUpdates += 1
+
+    def stats(self):
+        """Returns a CursorStats tuple of the sampling rate and latency so far."""
+        with self._lock:
+            return CursorStats(self._samples, self._hoverChanges,
+                               self._totalSampleTime / self._samples if self._samples else None,
+                               self._maxSampleTime if self._samples else None,
+                               self._lateSamples, self._indexUpdates, self._resyncs)
+
+
+def _shownRect(rect, flags):
+    # Minimized and hidden windows can't be under the cursor.
+    if flags & STATE_VISIBLE and not flags & STATE_MINIMIZED:
+        return tuple(rect)
+    return None
@@ -0,0 +1,96 @@
+# Fetching window attributes on a bounded pool of threads.
+#
+# Most per-window calls can't be batched into one request (a title is read
+# from each window's own thread on Windows, and a window's children are a
+# separate enumeration), but the native calls release the GIL while they
+# wait, so several of them can be in flight at once. parallelMap() spreads
+# the calls over a few threads that each take the next window from a shared
+# counter, and writes each result into that window's slot, so the results
+# come back in z-order however the calls interleave. With ``workers`` of
+# ``None`` or ``1`` everything runs serially on the calling thread.
+
+import threading
+
+import pygetwindow
+from pygetwindow import PyGetWindowException, WindowState, STATE_ACTIVE
+from pygetwindow._processes import processName
+
+
+def _fetchState(backend, handle, activeHandle):
+    rect, flags = backend._getWindowState(handle)
+    if handle == activeHandle:
+        flags |= STATE_ACTIVE
+    return WindowState(rect, flags)
+
+
+# Maps each attribute that getAllWindows() can fetch to a function of
+# (backend, handle, activeHandle) that reads it.
+_FETCHERS = {
+    "title": lambda backend, handle, activeHandle: backend._getWindowTitle(handle),
+    "rect": lambda backend, handle, activeHandle: backend._getWindowRect(handle),
+    "state": _fetchState,
+    "pid": lambda backend, handle, activeHandle: backend._getWindowPid(handle),
+    "processName": lambda backend, handle, activeHandle: processName(backend, backend._getWindowPid(handle)),
+    "className": lambda backend, handle, activeHandle: backend._getWindowClass(handle),
+    "children": lambda backend, handle, activeHandle: backend._enumChildHandles(handle),
+}
+
+
+def parallelMap(function, items, workers=None):
+    """Returns ``[function(item) for item in items]``, calling ``function``
+    on up to ``workers`` threads at once. If any call raises, the exception
+    from the earliest item is raised once all the calls have finished, the
+    same one that a serial loop would have raised."""
+    items = list(items)
+    if workers is not None and workers < 1:
+        raise PyGetWindowException("workers must be at least 1.")
+    if workers is None or workers == 1 or len(items) < 2:
+        return [function(item) for item in items]
+
+    results = [None] * len(items)
+    errors = {}  # Maps an item's index to the exception its call raised.
+    lock = threading.Lock()
+    nextIndex = [0]
+
+    def work():
+        while True:
+            with lock:
+                i = nextIndex[0]
+                if i >= len(items):
+                    return
+                nextIndex[0] = i + 1
+            try:
+                results[i] = function(items[i])
+            except Exception as exc:
+                errors[i] = exc
+
+    threads = [threading.Thread(target=work, name="pygetwindow fetch worker") for i in range(min(workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[min(errors)]
+    return results
+
+
+def fetchWindows(backend, handles, fetch, workers=None):
+    """Returns a list of Window objects for ``handles``, in order, each with
+    a ``fetched`` dict of the attributes named in ``fetch``. Windows that
+    close before their attributes are read are left out."""
+    fetch = list(fetch)
+    for name in fetch:
+        if name not in _FETCHERS:
+            raise PyGetWindowException("Can't fetch %r; the attributes are %s." % (name, ", ".join(sorted(_FETCHERS))))
+    activeHandle = backend._getActiveWindowHandle() if "state" in fetch else None
+
+    def fetchWindow(handle):
+        try:
+            window = pygetwindow._newWindow(backend, handle)
+            window.fetched = dict((name, _FETCHERS[name](backend, handle, activeHandle)) for name in fetch)
+        except PyGetWindowException:
+            return None  # The window has been closed.
+        return window
+
+    return [window for window in parallelMap(fetchWindow, handles, workers) if window is not None]
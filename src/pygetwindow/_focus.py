@@ -0,0 +1,188 @@
+# FocusTracker: the most-recently-used order of windows, kept up to date by
+# the backend's activation events instead of by polling.
+#
+# The MRU list is a doubly linked list stored in two dicts (_newer and
+# _older map a handle to its neighbors), so moving a window to the front,
+# removing it, and finding the previous window are all constant time.
+# Focus durations are running totals per handle, plus the start time of the
+# current focus, so no query needs to look at the whole history.
+
+import collections
+import threading
+import time
+
+import pygetwindow
+from pygetwindow import PyGetWindowException
+
+
+# ``focusTime`` is the total number of seconds the window has been active
+# (including the current stretch, if it is active now), ``activations`` is
+# how many times it became active, and ``lastActivated`` is the timestamp of
+# the most recent of those.
+FocusStats = collections.namedtuple("FocusStats", "focusTime activations lastActivated")
+
+
+class FocusTracker(object):
+    """Tracks which windows were active, most recent first, and for how
+    long, from the backend's activation events (the current backend, if
+    ``backend`` is ``None``).
+
+    Call ``start()`` (or use it as a context manager) to begin watching.
+    Queries only read the tracker's own data structures, so they make no
+    native calls and don't create Window objects; windows are identified by
+    their handles. Events can also be fed in by hand with ``activated()``."""
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._stopWatching = None
+
+        self._head = None  # The handle of the most recently active window.
+        self._newer = {}  # Maps handle -> the handle before it in the MRU list.
+        self._older = {}  # Maps handle -> the handle after it in the MRU list.
+
+        self._current = None  # The handle of the active window, or None.
+        self._currentSince = None  # When the active window became active.
+        self._focusTimes = {}  # Maps handle -> seconds active, not counting the current stretch.
+        self._activations = {}  # Maps handle -> number of activations.
+        self._lastActivated = {}  # Maps handle -> timestamp of its last activation.
+        self.numEvents = 0
+
+    def __repr__(self):
+        return "%s(windows=%s, current=%r)" % (self.__class__.__name__, len(self), self._current)
+
+    def __len__(self):
+        """Returns the number of windows in the MRU list."""
+        return len(self._older)
+
+    def start(self):
+        """Records the currently active window and starts watching for
+        activation events. Raises NotImplementedError if the backend can't
+        send them."""
+        if self._stopWatching is not None:
+            raise PyGetWindowException("The FocusTracker has already been started.")
+        backend = pygetwindow._getBackend() if self._backend is None else self._backend
+        if not hasattr(backend, "_watchWindowEvents"):
+            raise NotImplementedError("%r can't watch for window events." % (backend,))
+        self._stopWatching = backend._watchWindowEvents(self._onEvent)
+        self.activated(backend._getActiveWindowHandle())
+        return self
+
+    def stop(self):
+        """Stops watching for activation events. The recorded history is kept."""
+        if self._stopWatching is not None:
+            self._stopWatching()
+            self._stopWatching = None
+        with self._lock:
+            self._endFocus(time.time())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _onEvent(self, event, handle, timestamp):
+        if event == "activated":
+            self.activated(handle, timestamp)
+        elif event == "destroyed":
+            self.forget(handle)
+
+    def activated(self, handle, timestamp=None):
+        """Records that the window with ``handle`` became active at
+        ``timestamp`` (or now). A ``handle`` of ``None`` means that no window
+        is active, such as when the desktop is clicked."""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self.numEvents += 1
+            if handle == self._current:
+                return
+            self._endFocus(timestamp)
+            if handle is None:
+                return
+            self._moveToFront(handle)
+            self._current = handle
+            self._currentSince = timestamp
+            self._activations[handle] = self._activations.get(handle, 0) + 1
+            self._lastActivated[handle] = timestamp
+
+    def forget(self, handle):
+        """Removes a window (for example, one that was closed) from the MRU
+        list and the statistics."""
+        with self._lock:
+            if handle == self._current:
+                self._endFocus(time.time())
+            if handle in self._older:
+                self._unlink(handle)
+            self._focusTimes.pop(handle, None)
+            self._activations.pop(handle, None)
+            self._lastActivated.pop(handle, None)
+
+    def _endFocus(self, timestamp):
+        # Adds the current stretch of focus to the active window's total.
+        if self._current is not None:
+            elapsed = max(timestamp - self._currentSince, 0.0)
+            self._focusTimes[self._current] = self._focusTimes.get(self._current, 0.0) + elapsed
+        self._current = None
+        self._currentSince = None
+
+    def _unlink(self, handle):
+        newer = self._newer.pop(handle)
+        older = self._older.pop(handle)
+        if newer is None:
+            self._head = older
+        else:
+            self._older[newer] = older
+        if older is not None:
+            self._newer[older] = newer
+
+    def _moveToFront(self, handle):
+        if handle == self._head:
+            return
+        if handle in self._older:
+            self._unlink(handle)
+        self._newer[handle] = None
+        self._older[handle] = self._head
+        if self._head is not None:
+            self._newer[self._head] = handle
+        self._head = handle
+
+    @property
+    def current(self):
+        """The handle of the active window, or ``None`` if no window is active."""
+        return self._current
+
+    def previous(self):
+        """Returns the handle of the window that was active before the most
+        recent one (the window Alt-Tab would switch to), or ``None``."""
+        with self._lock:
+            if self._head is None:
+                return None
+            return self._older[self._head]
+
+    def mru(self, k=None):
+        """Returns a list of the handles of the ``k`` most recently active
+        windows (or all of them, if ``k`` is ``None``), most recent first."""
+        with self._lock:
+            handles = []
+            handle = self._head
+            while handle is not None and (k is None or len(handles) < k):
+                handles.append(handle)
+                handle = self._older[handle]
+            return handles
+
+    def stats(self, handle, now=None):
+        """Returns a FocusStats tuple for the window with ``handle``. The
+        current stretch of focus is counted up to ``now`` (or the present)."""
+        with self._lock:
+            focusTime = self._focusTimes.get(handle, 0.0)
+            if handle == self._current:
+                focusTime += max((time.time() if now is None else now) - self._currentSince, 0.0)
+            return FocusStats(focusTime, self._activations.get(handle, 0), self._lastActivated.get(handle))
+
+    def focusTimes(self, now=None):
+        """Returns an OrderedDict mapping the handle of every window in the
+        MRU list, most recent first, to the seconds it has been active."""
+        now = time.time() if now is None else now
+        return collections.OrderedDict((handle, self.stats(handle, now).focusTime) for handle in self.mru())
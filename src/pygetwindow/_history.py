@@ -0,0 +1,303 @@
+# WindowHistory keeps a compact, time-ordered log of window changes.
+#
+# Every change is one "event" row in a set of fixed-size ring buffers: a
+# timestamp (array('d')), a handle (array('q')), four int32 rect values
+# (array('i')), an index into the interned title pool (array('i')), and the
+# state flags (array('I')). A per-handle list of event sequence numbers makes
+# "where was window H at time t" a binary search.
+
+import array
+import bisect
+import io
+import mmap
+import os
+import struct
+
+from pygetwindow import PyGetWindowException, Rect
+from pygetwindow._snapshot import WindowRecord, diff, _byteOrder, _pad, _readColumns
+
+
+# Set in the flags column of an event to mean the window was destroyed.
+_DESTROYED = 0x80000000
+
+# The layout of a saved history file. The header is followed by the columns
+# (times, handles, rects, title ids, flags, title offsets) in that order and
+# then the UTF-8 title blob. Every column starts on an 8-byte boundary, so
+# they can be used in place from an mmap.
+_FILE_MAGIC = b"PGWHIST1"
+_FILE_HEADER = struct.Struct("=8sBxxxIIIQ")
+
+
+class WindowHistory(object):
+    """A record of how windows changed over time, kept in ring buffers that
+    hold the most recent ``capacity`` changes.
+
+    Add snapshots with ``append()``; only the windows that differ from the
+    previously appended snapshot use any space. Titles are interned, so a
+    title that stays the same across many changes is stored once."""
+
+    def __init__(self, capacity=65536):
+        if capacity < 1:
+            raise PyGetWindowException("capacity must be at least 1.")
+        self.capacity = capacity
+        self._times = array.array("d", [0.0]) * capacity
+        self._handles = array.array("q", [0]) * capacity
+        self._rects = array.array("i", [0]) * (capacity * 4)
+        self._titleIds = array.array("i", [0]) * capacity
+        self._flags = array.array("I", [0]) * capacity
+        self._next = 0  # The sequence number of the next event. Its slot is _next % capacity.
+
+        self._titles = []  # The interned title pool.
+        self._titleIndex = {}  # Maps title -> its index in _titles.
+        self._byHandle = {}  # Maps handle -> array('q') of its event sequence numbers, oldest first.
+        self._lastSnapshot = None
+        self._readOnly = False
+
+    def __len__(self):
+        """Returns the number of events currently held."""
+        return min(self._next, self.capacity)
+
+    def __repr__(self):
+        return "%s(capacity=%s, events=%s, titles=%s)" % (self.__class__.__name__, self.capacity, len(self), len(self._titles))
+
+    @property
+    def _oldest(self):
+        return max(0, self._next - self.capacity)
+
+    @property
+    def startTime(self):
+        """The timestamp of the oldest event held, or ``None`` if empty."""
+        return self._times[self._oldest % self.capacity] if self._next else None
+
+    @property
+    def endTime(self):
+        """The timestamp of the newest event held, or ``None`` if empty."""
+        return self._times[(self._next - 1) % self.capacity] if self._next else None
+
+    def append(self, snapshot):
+        """Records the windows in ``snapshot`` that were created, changed, or
+        destroyed since the last snapshot that was appended."""
+        if self._readOnly:
+            raise PyGetWindowException("A WindowHistory loaded from a file can't be appended to.")
+        if self._next and snapshot.timestamp < self.endTime:
+            raise PyGetWindowException("Snapshots must be appended in timestamp order.")
+
+        timestamp = snapshot.timestamp
+        if self._lastSnapshot is None:
+            for i in range(len(snapshot)):
+                self._appendEvent(timestamp, snapshot[i], 0)
+        else:
+            changes = diff(self._lastSnapshot, snapshot)
+            changedMaps = (changes.created, changes.moved, changes.resized, changes.retitled, changes.stateChanged)
+            for i, handle in enumerate(snapshot.handles):  # In z-order, one event per window.
+                if any(handle in changed for changed in changedMaps):
+                    self._appendEvent(timestamp, snapshot[i], 0)
+            for handle, record in changes.destroyed.items():
+                self._appendEvent(timestamp, record, _DESTROYED)
+        # Keep a copy, since the caller may refresh() the snapshot in place
+        # before appending it again.
+        self._lastSnapshot = snapshot if snapshot._frozen else snapshot.copy()
+
+    def _appendEvent(self, timestamp, record, extraFlags):
+        seq = self._next
+        slot = seq % self.capacity
+        self._times[slot] = timestamp
+        self._handles[slot] = record.handle
+        self._rects[slot * 4 : slot * 4 + 4] = array.array("i", record.rect)
+        self._titleIds[slot] = self._intern(record.title)
+        self._flags[slot] = record.flags | extraFlags
+        self._byHandle.setdefault(record.handle, array.array("q")).append(seq)
+        self._next += 1
+
+        if self._next % self.capacity == 0:
+            self._compact()
+
+    def _intern(self, title):
+        titleId = self._titleIndex.get(title)
+        if titleId is None:
+            titleId = len(self._titles)
+            self._titles.append(title)
+            self._titleIndex[title] = titleId
+        return titleId
+
+    def _compact(self):
+        # Called each time the ring buffers wrap around: forgets the sequence
+        # numbers of overwritten events, and drops titles that no event uses.
+        oldest = self._oldest
+        for handle in list(self._byHandle):
+            seqs = self._byHandle[handle]
+            numOverwritten = bisect.bisect_left(seqs, oldest)
+            if numOverwritten == len(seqs):
+                del self._byHandle[handle]
+            elif numOverwritten:
+                del seqs[:numOverwritten]
+
+        remap = {}
+        titles = []
+        for slot in range(len(self)):
+            oldId = self._titleIds[slot]
+            newId = remap.get(oldId)
+            if newId is None:
+                newId = remap[oldId] = len(titles)
+                titles.append(self._titles[oldId])
+            self._titleIds[slot] = newId
+        self._titles = titles
+        self._titleIndex = dict((title, i) for i, title in enumerate(titles))
+
+    def _liveSeqs(self, handle):
+        seqs = self._byHandle.get(handle)
+        if not seqs:
+            return seqs, 0
+        return seqs, bisect.bisect_left(seqs, self._oldest)
+
+    def _bisect(self, seqs, lo, hi, t, inclusive):
+        # Returns the first position in seqs[lo:hi] of an event after time t
+        # (or at or after time t, if inclusive is False). If seqs is None, the
+        # positions are sequence numbers in the ring itself.
+        times = self._times
+        capacity = self.capacity
+        while lo < hi:
+            mid = (lo + hi) // 2
+            midTime = times[(mid if seqs is None else seqs[mid]) % capacity]
+            if midTime < t or (inclusive and midTime == t):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _record(self, seq):
+        slot = seq % self.capacity
+        r = self._rects
+        return WindowRecord(
+            self._handles[slot],
+            Rect(r[slot * 4], r[slot * 4 + 1], r[slot * 4 + 2], r[slot * 4 + 3]),
+            self._titles[self._titleIds[slot]],
+            self._flags[slot] & ~_DESTROYED,
+        )
+
+    def recordAt(self, handle, t):
+        """Returns the WindowRecord of the window with ``handle`` as it was at
+        time ``t``, or ``None`` if it didn't exist then (or if that is older
+        than anything still held)."""
+        seqs, lo = self._liveSeqs(handle)
+        if not seqs:
+            return None
+        i = self._bisect(seqs, lo, len(seqs), t, inclusive=True)
+        if i == lo:
+            return None
+        seq = seqs[i - 1]
+        if self._flags[seq % self.capacity] & _DESTROYED:
+            return None
+        return self._record(seq)
+
+    def rectAt(self, handle, t):
+        """Returns the Rect of the window with ``handle`` at time ``t``, or
+        ``None`` if it didn't exist then."""
+        record = self.recordAt(handle, t)
+        return None if record is None else record.rect
+
+    def titleAt(self, handle, t):
+        """Returns the title of the window with ``handle`` at time ``t``, or
+        ``None`` if it didn't exist then."""
+        record = self.recordAt(handle, t)
+        return None if record is None else record.title
+
+    def changes(self, handle, start=None, end=None):
+        """Returns a list of ``(timestamp, record)`` tuples for each change
+        to the window with ``handle`` from time ``start`` up to and including
+        time ``end``. ``record`` is ``None`` when the window was destroyed."""
+        seqs, lo = self._liveSeqs(handle)
+        if not seqs:
+            return []
+        hi = len(seqs)
+        if start is not None:
+            lo = self._bisect(seqs, lo, hi, start, inclusive=False)
+        if end is not None:
+            hi = self._bisect(seqs, lo, hi, end, inclusive=True)
+        results = []
+        for seq in seqs[lo:hi]:
+            slot = seq % self.capacity
+            record = None if self._flags[slot] & _DESTROYED else self._record(seq)
+            results.append((self._times[slot], record))
+        return results
+
+    def events(self, start=None, end=None):
+        """Returns a list of ``(timestamp, handle, record)`` tuples for every
+        change to any window from time ``start`` up to and including time
+        ``end``, oldest first. ``record`` is ``None`` when the window was
+        destroyed."""
+        oldest, newest = self._oldest, self._next
+        lo = oldest if start is None else self._bisect(None, oldest, newest, start, inclusive=False)
+        hi = newest if end is None else self._bisect(None, lo, newest, end, inclusive=True)
+        results = []
+        for seq in range(lo, hi):
+            slot = seq % self.capacity
+            record = None if self._flags[slot] & _DESTROYED else self._record(seq)
+            results.append((self._times[slot], self._handles[slot], record))
+        return results
+
+    def save(self, path):
+        """Writes the events held to a file at ``path`` that ``load()`` can
+        map into memory without copying."""
+        count = len(self)
+        order = [(self._oldest + i) % self.capacity for i in range(count)]
+
+        titleBlob = io.BytesIO()
+        titleOffsets = array.array("I", [0])
+        for title in self._titles:
+            titleBlob.write(title.encode("utf-8"))
+            titleOffsets.append(titleBlob.tell())
+        titleBlob = titleBlob.getvalue()
+
+        rects = array.array("i")
+        for slot in order:
+            rects.extend(self._rects[slot * 4 : slot * 4 + 4])
+
+        with open(path, "wb") as fileObj:
+            fileObj.write(_FILE_HEADER.pack(_FILE_MAGIC, _byteOrder(), count, len(self._titles), self.capacity, len(titleBlob)))
+            for column in (
+                array.array("d", [self._times[slot] for slot in order]),
+                array.array("q", [self._handles[slot] for slot in order]),
+                rects,
+                array.array("i", [self._titleIds[slot] for slot in order]),
+                array.array("I", [self._flags[slot] for slot in order]),
+                titleOffsets,
+            ):
+                column.tofile(fileObj)
+                _pad(fileObj)
+            fileObj.write(titleBlob)
+
+    @classmethod
+    def load(cls, path):
+        """Returns a read-only WindowHistory whose columns are memory-mapped
+        from a file written by ``save()``."""
+        with open(path, "rb") as fileObj:
+            if os.fstat(fileObj.fileno()).st_size < _FILE_HEADER.size:  # This includes empty files, which can't be mapped.
+                raise PyGetWindowException("%s is too short to be a saved WindowHistory." % (path))
+            buffer = mmap.mmap(fileObj.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, byteOrder, count, numTitles, capacity, titleBlobSize = _FILE_HEADER.unpack_from(buffer, 0)
+        if magic != _FILE_MAGIC:
+            raise PyGetWindowException("%s is not a saved WindowHistory." % (path))
+        if byteOrder != _byteOrder():
+            raise PyGetWindowException("%s was saved on a machine with a different byte order." % (path))
+
+        layout = (("d", count), ("q", count), ("i", count * 4), ("i", count), ("I", count), ("I", numTitles + 1))
+        columns, offset = _readColumns(memoryview(buffer), _FILE_HEADER.size, layout)
+        if len(buffer) < offset + titleBlobSize:
+            raise PyGetWindowException("%s ends in the middle of its titles." % (path))
+        blob = buffer[offset : offset + titleBlobSize]
+
+        history = cls.__new__(cls)
+        history.capacity = max(count, 1)
+        history._times, history._handles, history._rects, history._titleIds, history._flags, titleOffsets = columns
+        history._next = count
+        history._titles = [blob[titleOffsets[i] : titleOffsets[i + 1]].decode("utf-8") for i in range(numTitles)]
+        history._titleIndex = dict((title, i) for i, title in enumerate(history._titles))
+        history._byHandle = {}
+        for seq in range(count):
+            history._byHandle.setdefault(history._handles[seq], array.array("q")).append(seq)
+        history._lastSnapshot = None
+        history._readOnly = True
+        history._buffer = buffer  # Keep the mmap open for as long as the columns are in use.
+        return history
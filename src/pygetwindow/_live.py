@@ -0,0 +1,153 @@
+# LiveModel: one thread keeps a snapshot of the windows current, and any
+# number of threads read it.
+#
+# Snapshots are never changed once they are published, so the refresher
+# builds each new one off to the side and then publishes it by assigning a
+# single (generation, snapshot) tuple to an attribute. Assigning and reading
+# an attribute are atomic in Python, so a reader sees either the old tuple or
+# the new one, never a mix of the two, and it never waits for a lock. (This
+# is the read-copy-update pattern: old snapshots stay valid for as long as a
+# reader holds on to them.) The generation only goes up when a refresh found
+# something different, so comparing generations is a cheap way to find out
+# whether anything has changed.
+
+import collections
+import threading
+import time
+
+import pygetwindow
+from pygetwindow import PyGetWindowException
+
+
+# A published version of a LiveModel: the Snapshot and its generation number.
+LiveVersion = collections.namedtuple("LiveVersion", "generation snapshot")
+
+
+class LiveModel(object):
+    """A Snapshot of the windows on ``backend`` (the current backend, if it
+    is ``None``) that a background thread keeps up to date, refreshing it
+    every ``interval`` seconds and as soon as the backend reports a window
+    event. ``workers`` is passed to getSnapshot().
+
+    Reading ``snapshot``, ``generation``, or ``current()`` never blocks.
+    The published snapshots can't be changed with ``Snapshot.refresh()``,
+    since other threads may be reading them (refresh a ``copy()`` instead).
+    Use ``start()`` and ``stop()``, or a ``with`` statement."""
+
+    def __init__(self, interval=0.1, backend=None, workers=None):
+        self.interval = interval
+        self.workers = workers
+        self._backend = backend
+        self._current = LiveVersion(0, None)
+        self._refreshLock = threading.Lock()  # Only taken by refreshes, so that there is one writer at a time.
+        self._published = threading.Condition(threading.Lock())
+        self._wake = threading.Event()
+        self._stopRefreshing = threading.Event()
+        self._thread = None
+        self._stopWatching = None
+        self.numRefreshes = 0
+        self.lastError = None  # The error from the last refresh that failed, if any.
+
+    def __repr__(self):
+        return "%s(generation=%s)" % (self.__class__.__name__, self._current.generation)
+
+    def _getBackend(self):
+        return pygetwindow._getBackend() if self._backend is None else self._backend
+
+    def current(self):
+        """Returns a LiveVersion tuple of the latest snapshot and its
+        generation, which always belong together."""
+        return self._current
+
+    @property
+    def snapshot(self):
+        """The latest Snapshot, or ``None`` before the first refresh."""
+        return self._current.snapshot
+
+    @property
+    def generation(self):
+        """A number that goes up each time a changed snapshot is published."""
+        return self._current.generation
+
+    def refresh(self):
+        """Takes a new snapshot and publishes it if anything is different
+        from the current one. Returns the current LiveVersion."""
+        from pygetwindow._snapshot import takeSnapshot
+
+        with self._refreshLock:
+            snapshot = takeSnapshot(self._getBackend(), self.workers)
+            self.numRefreshes += 1
+            previous = self._current
+            if previous.snapshot is not None and _sameWindows(previous.snapshot, snapshot):
+                return previous
+            snapshot._frozen = True
+            with self._published:
+                self._current = LiveVersion(previous.generation + 1, snapshot)
+                self._published.notify_all()
+            return self._current
+
+    def waitForChange(self, generation, timeout=None):
+        """Waits until the generation is greater than ``generation`` and
+        returns the current LiveVersion, or returns ``None`` if ``timeout``
+        seconds pass first. This is the only method that blocks."""
+        if timeout is not None:
+            deadline = time.time() + timeout
+        with self._published:
+            while self._current.generation <= generation:
+                if timeout is None:
+                    self._published.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._published.wait(remaining)
+            return self._current
+
+    def start(self):
+        """Takes the first snapshot and starts refreshing it."""
+        if self._thread is not None:
+            raise PyGetWindowException("The LiveModel has already been started.")
+        backend = self._getBackend()
+        self.refresh()
+        if hasattr(backend, "_watchWindowEvents"):
+            self._stopWatching = backend._watchWindowEvents(self._onEvent)
+        self._stopRefreshing.clear()
+        self._thread = threading.Thread(target=self._run, name="pygetwindow live model")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops refreshing. The last snapshot stays readable."""
+        if self._stopWatching is not None:
+            self._stopWatching()
+            self._stopWatching = None
+        if self._thread is not None:
+            self._stopRefreshing.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _onEvent(self, event, handle, timestamp):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopRefreshing.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopRefreshing.is_set():
+                return
+            try:
+                self.refresh()
+            except PyGetWindowException as exc:
+                self.lastError = exc  # Usually a window that closed mid-refresh; the next refresh will see it gone.
+
+
+def _sameWindows(a, b):
+    return a.handles == b.handles and a.rects == b.rects and a.titles == b.titles and a.flags == b.flags
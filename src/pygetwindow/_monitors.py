@@ -0,0 +1,117 @@
+# Display monitors, and which monitor each window in a Snapshot is on.
+#
+# Backends provide two primitives for this: _enumMonitors(), which returns a
+# list of Monitor tuples, and _getDisplayGeneration(), which returns a number
+# that changes whenever the monitor layout, work areas, or DPI change (or
+# ``None`` if the backend can't tell, in which case nothing is cached).
+
+import array
+import collections
+import threading
+import weakref
+
+from pygetwindow import PyGetWindowException, Rect
+
+
+# ``rect`` and ``workArea`` are Rects in virtual screen coordinates, ``dpi``
+# is the monitor's DPI (96 is 100% scaling), and ``primary`` is True for the
+# primary monitor. ``handle`` identifies the monitor to the backend.
+Monitor = collections.namedtuple("Monitor", "handle name rect workArea dpi primary")
+
+_cache = weakref.WeakKeyDictionary()  # Maps backend -> (generation, tuple of Monitors).
+_cacheLock = threading.Lock()
+
+
+def getMonitors(backend):
+    """Returns the list of Monitors from ``backend``. The list is cached
+    until the backend reports a display change."""
+    generation = backend._getDisplayGeneration()
+    with _cacheLock:
+        cached = _cache.get(backend)
+    if cached is not None and generation is not None and cached[0] == generation:
+        return list(cached[1])
+
+    monitors = tuple(_toMonitor(monitor) for monitor in backend._enumMonitors())
+    with _cacheLock:
+        _cache[backend] = (generation, monitors)
+    return list(monitors)
+
+
+def _toMonitor(value):
+    # Backends (and recordings) may return plain sequences rather than Monitors.
+    handle, name, rect, workArea, dpi, primary = value
+    return Monitor(handle, name, Rect(*rect), Rect(*workArea), dpi, bool(primary))
+
+
+def _findMonitor(monitors, left, top, right, bottom):
+    # Returns the position in ``monitors`` of the monitor with the largest
+    # overlap with the rect, or of the nearest monitor if none overlap it.
+    # This is what MonitorFromRect() does with MONITOR_DEFAULTTONEAREST.
+    best = -1
+    bestArea = 0
+    for i, monitor in enumerate(monitors):
+        r = monitor.rect
+        width = min(right, r.right) - max(left, r.left)
+        height = min(bottom, r.bottom) - max(top, r.top)
+        if width > 0 and height > 0 and width * height > bestArea:
+            best = i
+            bestArea = width * height
+    if best != -1 or not monitors:
+        return best
+
+    bestDistance = None
+    for i, monitor in enumerate(monitors):
+        r = monitor.rect
+        dx = max(r.left - right, left - r.right, 0)
+        dy = max(r.top - bottom, top - r.bottom, 0)
+        if bestDistance is None or dx * dx + dy * dy < bestDistance:
+            best = i
+            bestDistance = dx * dx + dy * dy
+    return best
+
+
+def _getMonitorIndex(snapshot, monitors):
+    # Returns (monitorOfRow, rowsByMonitor) for the snapshot: an array('i')
+    # of each row's position in ``monitors``, and a list of each monitor's
+    # rows in z-order. It's built once per snapshot and monitor layout.
+    monitors = tuple(monitors)
+    cached = snapshot._monitorIndex
+    if cached is not None and cached[0] == monitors:
+        return cached[1], cached[2]
+
+    r = snapshot.rects
+    monitorOfRow = array.array("i", [-1]) * len(snapshot)
+    rowsByMonitor = [[] for monitor in monitors]
+    for row in range(len(snapshot)):
+        i = _findMonitor(monitors, r[row * 4], r[row * 4 + 1], r[row * 4 + 2], r[row * 4 + 3])
+        monitorOfRow[row] = i
+        if i != -1:
+            rowsByMonitor[i].append(row)
+    snapshot._monitorIndex = (monitors, monitorOfRow, rowsByMonitor)
+    return monitorOfRow, rowsByMonitor
+
+
+def monitorOf(backend, handle, snapshot=None):
+    """Returns the Monitor that most of the window with ``handle`` is on.
+    The window's rect comes from ``snapshot`` if it's in it, so no native
+    calls are made for windows in the snapshot."""
+    monitors = getMonitors(backend)
+    row = -1 if snapshot is None else snapshot.indexOf(handle)
+    if row != -1:
+        i = _getMonitorIndex(snapshot, monitors)[0][row]
+    else:
+        i = _findMonitor(monitors, *backend._getWindowRect(handle))
+    return None if i == -1 else monitors[i]
+
+
+def windowsOnMonitor(backend, monitor, snapshot):
+    """Returns a list of the WindowRecords in ``snapshot`` of the windows
+    that are mostly on ``monitor``, in z-order."""
+    monitors = getMonitors(backend)
+    for i, m in enumerate(monitors):
+        if m.handle == monitor.handle:
+            break
+    else:
+        raise PyGetWindowException("%r is not one of the current monitors." % (monitor,))
+    rowsByMonitor = _getMonitorIndex(snapshot, monitors)[1]
+    return [snapshot[row] for row in rowsByMonitor[i]]
@@ -0,0 +1,119 @@
+# MultiDisplay: queries across many X displays at once.
+#
+# Each display has its own backend, with its own connection and lock, so
+# the queries on different displays don't wait for each other: they run on
+# one thread per display, and Xlib releases the GIL while it waits for each
+# server. The backends are kept open between calls, so a display is only
+# connected to again after it failed.
+
+import collections
+import threading
+
+import pygetwindow
+from pygetwindow import PyGetWindowException
+
+
+# One window found by a MultiDisplay query: the name of the display it is on,
+# and its Window object.
+DisplayWindow = collections.namedtuple("DisplayWindow", "display window")
+
+
+class MultiDisplay(object):
+    """Runs queries on all of the X displays in ``displayNames`` (such as
+    ``[':1', ':2']``) concurrently, on up to ``workers`` threads (one per
+    display, if it is ``None``). Results are in the order of
+    ``displayNames``, and each window is tagged with its display.
+
+    A display that can't be reached is left out of the results, and its
+    error is put in ``errors`` (which only holds the errors of the last
+    query); so is a display whose server went away while connected, with
+    libX11 1.7 or later. ``backendFactory`` creates the backend for a
+    display name; it is X11Backend by default. Call ``close()``, or use a
+    ``with`` statement, to close the connections."""
+
+    def __init__(self, displayNames, workers=None, backendFactory=None):
+        self.displayNames = list(displayNames)
+        if len(set(self.displayNames)) != len(self.displayNames):
+            raise PyGetWindowException("Each display can only be listed once.")
+        self.workers = workers
+        if backendFactory is None:
+            from pygetwindow._pygetwindow_linux import X11Backend as backendFactory
+        self._backendFactory = backendFactory
+        self._backends = {}  # Maps display name -> its open backend.
+        self._lock = threading.Lock()
+        self.errors = collections.OrderedDict()
+
+    def __repr__(self):
+        return "%s(displays=%s, connected=%s)" % (self.__class__.__name__, len(self.displayNames), len(self._backends))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def backend(self, displayName):
+        """Returns the backend for ``displayName``, creating it if it isn't
+        in the pool."""
+        with self._lock:
+            backend = self._backends.get(displayName)
+            if backend is None:
+                backend = self._backends[displayName] = self._backendFactory(displayName)
+            return backend
+
+    def _discard(self, displayName):
+        # Closes a failed display's backend, so the next query reconnects.
+        with self._lock:
+            backend = self._backends.pop(displayName, None)
+        if backend is not None and hasattr(backend, "close"):
+            try:
+                backend.close()
+            except PyGetWindowException:
+                pass
+
+    def run(self, function):
+        """Calls ``function(backend)`` for every display at once, and returns
+        an OrderedDict that maps each display name to its result."""
+        from pygetwindow._fetch import parallelMap
+
+        def call(displayName):
+            try:
+                return function(self.backend(displayName)), None
+            except PyGetWindowException as exc:
+                self._discard(displayName)
+                return None, exc
+
+        workers = len(self.displayNames) if self.workers is None else self.workers
+        results = collections.OrderedDict()
+        errors = collections.OrderedDict()
+        for displayName, (result, error) in zip(self.displayNames, parallelMap(call, self.displayNames, max(workers, 1))):
+            if error is None:
+                results[displayName] = result
+            else:
+                errors[displayName] = error
+        self.errors = errors
+        return results
+
+    def _tagged(self, results):
+        return [DisplayWindow(displayName, window) for displayName, windows in results.items() for window in windows]
+
+    def getAllWindows(self):
+        """Returns a list of DisplayWindows of every display's windows."""
+        return self._tagged(self.run(lambda backend: [pygetwindow._newWindow(backend, handle) for handle in backend._enumWindowHandles()]))
+
+    def getWindowsWithTitle(self, title):
+        """Returns a list of DisplayWindows of the windows, on every display,
+        that substring match ``title`` in their title text."""
+        return self._tagged(self.run(lambda backend: pygetwindow._windowsWithTitle(backend, title)))
+
+    def getSnapshot(self):
+        """Returns an OrderedDict that maps each display's name to a Snapshot
+        of its windows."""
+        from pygetwindow._snapshot import takeSnapshot
+
+        return self.run(takeSnapshot)
+
+    def close(self):
+        """Closes every display's connection."""
+        for displayName in list(self._backends):
+            self._discard(displayName)
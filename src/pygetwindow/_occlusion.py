@@ -0,0 +1,169 @@
+# Occlusion: how much of each window is not covered by the windows above it.
+#
+# The windows of a snapshot are visited from the top of the z-order down,
+# and the area covered so far is kept as a banded region (the representation
+# X11 and pixman use for clip lists): a sorted list of y edges, and for each
+# band between two edges a sorted list of covered x intervals. Finding a
+# window's uncovered area only touches the bands its rect spans, and bisects
+# within each band, so the cost depends on how fragmented the covered area
+# is rather than on how many windows are above the window.
+
+import bisect
+import collections
+
+from pygetwindow import PyGetWindowException, Rect, STATE_VISIBLE, STATE_MINIMIZED
+
+
+# ``area`` is the area of the window's rect, ``visibleArea`` is the part of
+# it not covered by any window above it, and ``occluded`` is True if none of
+# the window can be seen (which includes minimized and hidden windows).
+Occlusion = collections.namedtuple("Occlusion", "area visibleArea occluded")
+
+
+class _Region(object):
+    # A union of rects. _ys is the sorted list of band edges, and _spans[j]
+    # is a flat, sorted list of [left, right) x intervals (left0, right0,
+    # left1, right1, ...) covered between _ys[j] and _ys[j + 1].
+
+    def __init__(self):
+        self._ys = []
+        self._spans = []
+
+    def uncovered(self, left, top, right, bottom, rects=None):
+        """Returns the area of the rect that isn't in the region. If ``rects``
+        is a list, a Rect for each uncovered piece is appended to it."""
+        ys = self._ys
+        spans = self._spans
+        numBands = len(spans)
+        area = 0
+        y = top
+        j = bisect.bisect_right(ys, top) - 1  # The band that contains ``top``, or -1 if it's above them all.
+        while y < bottom:
+            if 0 <= j < numBands:
+                nextY = min(ys[j + 1], bottom)
+                intervals = spans[j]
+            else:
+                nextY = min(ys[0], bottom) if j < 0 and ys else bottom
+                intervals = ()
+            height = nextY - y
+            numIntervals = len(intervals)
+
+            x = left
+            k = bisect.bisect_right(intervals, left)
+            if k % 2 == 1:  # ``left`` is inside a covered interval, so skip to its end.
+                x = intervals[k]
+                k += 1
+            while x < right:
+                end = intervals[k] if k < numIntervals and intervals[k] < right else right
+                if end > x:
+                    area += (end - x) * height
+                    if rects is not None:
+                        rects.append(Rect(x, y, end, nextY))
+                if k >= numIntervals:
+                    break
+                x = intervals[k + 1]
+                k += 2
+
+            y = nextY
+            j += 1
+        return area
+
+    def add(self, left, top, right, bottom):
+        """Adds the rect to the region."""
+        self._split(top)
+        self._split(bottom)
+        ys = self._ys
+        spans = self._spans
+        lo = bisect.bisect_left(ys, top)
+        hi = bisect.bisect_left(ys, bottom)
+        for j in range(lo, hi):
+            _addInterval(spans[j], left, right)
+
+        # Merge the bands in and around the changed range that are now the same.
+        j = max(lo - 1, 0)
+        end = min(hi, len(spans) - 1)
+        while j < end:
+            if spans[j] == spans[j + 1]:
+                del ys[j + 1]
+                del spans[j + 1]
+                end -= 1
+            else:
+                j += 1
+
+    def _split(self, y):
+        # Makes ``y`` one of the band edges.
+        ys = self._ys
+        i = bisect.bisect_left(ys, y)
+        if i < len(ys) and ys[i] == y:
+            return
+        ys.insert(i, y)
+        if len(ys) == 1:
+            return
+        if i == 0:
+            self._spans.insert(0, [])
+        elif i == len(ys) - 1:
+            self._spans.append([])
+        else:
+            self._spans.insert(i, list(self._spans[i - 1]))
+
+
+def _addInterval(intervals, left, right):
+    # Merges [left, right) into a flat, sorted interval list in place.
+    # Intervals that touch are joined.
+    start = bisect.bisect_left(intervals, left)
+    if start % 2 == 1:
+        start -= 1
+        left = intervals[start]
+    end = bisect.bisect_right(intervals, right)
+    if end % 2 == 1:
+        right = intervals[end]
+        end += 1
+    intervals[start:end] = [left, right]
+
+
+def _isShown(flags):
+    return flags & STATE_VISIBLE and not flags & STATE_MINIMIZED
+
+
+def occlusionReport(snapshot):
+    """Returns an OrderedDict that maps the handle of each window in
+    ``snapshot`` (in z-order) to an Occlusion tuple."""
+    region = _Region()
+    r = snapshot.rects
+    flags = snapshot.flags
+    report = collections.OrderedDict()
+    for i, handle in enumerate(snapshot.handles):
+        left, top, right, bottom = r[i * 4 : i * 4 + 4]
+        area = max(right - left, 0) * max(bottom - top, 0)
+        visibleArea = 0
+        if area and _isShown(flags[i]):
+            visibleArea = region.uncovered(left, top, right, bottom)
+            if visibleArea:
+                region.add(left, top, right, bottom)
+        report[handle] = Occlusion(area, visibleArea, visibleArea == 0)
+    return report
+
+
+def visibleRegion(snapshot, handle):
+    """Returns a list of non-overlapping Rects that make up the part of the
+    window with ``handle`` that isn't covered by the windows above it in
+    ``snapshot``."""
+    row = snapshot.indexOf(handle)
+    if row == -1:
+        raise PyGetWindowException("Window %s is not in the snapshot." % (handle))
+    left, top, right, bottom = snapshot.rects[row * 4 : row * 4 + 4]
+    if right <= left or bottom <= top or not _isShown(snapshot.flags[row]):
+        return []
+
+    region = _Region()
+    r = snapshot.rects
+    flags = snapshot.flags
+    for i in range(row):
+        # Only the parts of the windows above that overlap this one matter.
+        clipLeft, clipTop = max(r[i * 4], left), max(r[i * 4 + 1], top)
+        clipRight, clipBottom = min(r[i * 4 + 2], right), min(r[i * 4 + 3], bottom)
+        if clipLeft < clipRight and clipTop < clipBottom and _isShown(flags[i]):
+            region.add(clipLeft, clipTop, clipRight, clipBottom)
+    rects = []
+    region.uncovered(left, top, right, bottom, rects)
+    return rects
@@ -0,0 +1,64 @@
+# Which process owns each window.
+#
+# Backends provide _getWindowPid(handle) and _getProcessPath(pid). The
+# backends cache each process's executable path until the process exits, so
+# looking up the same process again is cheap. The indexes here are built once
+# per snapshot, so that finding the windows of a process only costs as much
+# as the number of windows found.
+
+import os
+
+from pygetwindow import PyGetWindowException
+
+
+def processName(backend, pid):
+    """Returns the file name of the executable of process ``pid``, or
+    ``None`` if it isn't known."""
+    if pid is None:
+        return None
+    path = backend._getProcessPath(pid)
+    return None if path is None else _baseName(path)
+
+
+def _baseName(path):
+    # Paths may come from a recording made on another platform, so both
+    # kinds of separator are handled.
+    return os.path.basename(path.replace("\\", "/"))
+
+
+def _getPidIndex(backend, snapshot):
+    if snapshot._pidIndex is None:
+        index = {}
+        for row, handle in enumerate(snapshot.handles):
+            try:
+                pid = backend._getWindowPid(handle)
+            except PyGetWindowException:
+                pid = None  # The window has been closed since the snapshot was taken.
+            index.setdefault(pid, []).append(row)
+        snapshot._pidIndex = index
+    return snapshot._pidIndex
+
+
+def _getExecutableIndex(backend, snapshot):
+    if snapshot._executableIndex is None:
+        index = {}
+        for pid, rows in _getPidIndex(backend, snapshot).items():
+            name = processName(backend, pid)
+            if name is not None:
+                index.setdefault(name.lower(), []).extend(rows)
+        for rows in index.values():
+            rows.sort()  # Keep z-order when several processes run the same executable.
+        snapshot._executableIndex = index
+    return snapshot._executableIndex
+
+
+def windowsOfProcess(backend, pid, snapshot):
+    """Returns the WindowRecords in ``snapshot`` of the windows of process ``pid``."""
+    return [snapshot[row] for row in _getPidIndex(backend, snapshot).get(pid, ())]
+
+
+def windowsOfExecutable(backend, name, snapshot):
+    """Returns the WindowRecords in ``snapshot`` of the windows of processes
+    running the executable ``name``."""
+    rows = _getExecutableIndex(backend, snapshot).get(_baseName(name).lower(), ())
+    return [snapshot[row] for row in rows]
@@ -0,0 +1,1194 @@
+# The X11 backend. Like the Win32 backend, this calls the native library
+# (libX11) directly through ctypes, and reads window information from the
+# EWMH properties (_NET_CLIENT_LIST_STACKING, _NET_WM_STATE, and so on) that
+# window managers put on the root window and on each client window.
+#
+# Useful info:
+# https://specifications.freedesktop.org/wm-spec/wm-spec-latest.html
+# https://tronche.com/gui/x/xlib/
+
+import collections
+import ctypes
+import ctypes.util
+import os
+import select
+import threading
+import time
+
+from pygetwindow import PyGetWindowException, BaseWindow, Rect, Point, Size, STATE_VISIBLE, STATE_MINIMIZED, STATE_MAXIMIZED
+
+
+# Xlib constants, from X.h and Xlib.h:
+NONE = 0
+FALSE = 0
+TRUE = 1
+SUCCESS = 0
+ANY_PROPERTY_TYPE = 0
+IS_UNMAPPED = 0
+IS_VIEWABLE = 2
+CONFIGURE_NOTIFY = 22
+PROPERTY_NOTIFY = 28
+CLIENT_MESSAGE = 33
+STRUCTURE_NOTIFY_MASK = 1 << 17
+SUBSTRUCTURE_NOTIFY_MASK = 1 << 19
+SUBSTRUCTURE_REDIRECT_MASK = 1 << 20
+PROPERTY_CHANGE_MASK = 1 << 22
+REVERT_TO_PARENT = 2
+CURRENT_TIME = 0
+
+ZPIXMAP = 2
+ALL_PLANES = ctypes.c_ulong(-1).value
+
+# System V shared memory constants, from sys/ipc.h:
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+# RandR constants, from randr.h:
+RR_SCREEN_CHANGE_NOTIFY_MASK = 1 << 0
+RR_CRTC_CHANGE_NOTIFY_MASK = 1 << 1
+RR_OUTPUT_CHANGE_NOTIFY_MASK = 1 << 2
+RR_NUMBER_EVENTS = 2
+
+# _NET_RESTACK_WINDOW stacking modes, from X.h:
+ABOVE = 0
+BELOW = 1
+
+# _NET_WM_STATE client message actions:
+_NET_WM_STATE_REMOVE = 0
+_NET_WM_STATE_ADD = 1
+
+# The longest property (in 32-bit units) read by _getProperty().
+MAX_PROPERTY_LENGTH = 1 << 20
+
+
+XID = ctypes.c_ulong
+Atom = ctypes.c_ulong
+
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [('x', ctypes.c_int),
+                ('y', ctypes.c_int),
+                ('width', ctypes.c_int),
+                ('height', ctypes.c_int),
+                ('border_width', ctypes.c_int),
+                ('depth', ctypes.c_int),
+                ('visual', ctypes.c_void_p),
+                ('root', XID),
+                ('class_', ctypes.c_int),
+                ('bit_gravity', ctypes.c_int),
+                ('win_gravity', ctypes.c_int),
+                ('backing_store', ctypes.c_int),
+                ('backing_planes', ctypes.c_ulong),
+                ('backing_pixel', ctypes.c_ulong),
+                ('save_under', ctypes.c_int),
+                ('colormap', XID),
+                ('map_installed', ctypes.c_int),
+                ('map_state', ctypes.c_int),
+                ('all_event_masks', ctypes.c_long),
+                ('your_event_mask', ctypes.c_long),
+                ('do_not_propagate_mask', ctypes.c_long),
+                ('override_redirect', ctypes.c_int),
+                ('screen', ctypes.c_void_p)]
+
+
+class XClientMessageEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('window', XID),
+                ('message_type', Atom),
+                ('format', ctypes.c_int),
+                ('data', ctypes.c_long * 5)]
+
+
+class XPropertyEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('window', XID),
+                ('atom', Atom),
+                ('time', ctypes.c_ulong),
+                ('state', ctypes.c_int)]
+
+
+class XConfigureEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('event', XID),
+                ('window', XID),
+                ('x', ctypes.c_int),
+                ('y', ctypes.c_int),
+                ('width', ctypes.c_int),
+                ('height', ctypes.c_int),
+                ('border_width', ctypes.c_int),
+                ('above', XID),
+                ('override_redirect', ctypes.c_int)]
+
+
+class XEvent(ctypes.Union):
+    _fields_ = [('type', ctypes.c_int),
+                ('xclient', XClientMessageEvent),
+                ('xproperty', XPropertyEvent),
+                ('xconfigure', XConfigureEvent),
+                ('pad', ctypes.c_long * 24)]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('resourceid', XID),
+                ('serial', ctypes.c_ulong),
+                ('error_code', ctypes.c_ubyte),
+                ('request_code', ctypes.c_ubyte),
+                ('minor_code', ctypes.c_ubyte)]
+
+
+class XRRMonitorInfo(ctypes.Structure):
+    _fields_ = [('name', Atom),
+                ('primary', ctypes.c_int),
+                ('automatic', ctypes.c_int),
+                ('noutput', ctypes.c_int),
+                ('x', ctypes.c_int),
+                ('y', ctypes.c_int),
+                ('width', ctypes.c_int),
+                ('height', ctypes.c_int),
+                ('mwidth', ctypes.c_int),
+                ('mheight', ctypes.c_int),
+                ('outputs', ctypes.POINTER(XID))]
+
+
+class XImage(ctypes.Structure):
+    _fields_ = [('width', ctypes.c_int),
+                ('height', ctypes.c_int),
+                ('xoffset', ctypes.c_int),
+                ('format', ctypes.c_int),
+                ('data', ctypes.c_void_p),
+                ('byte_order', ctypes.c_int),
+                ('bitmap_unit', ctypes.c_int),
+                ('bitmap_bit_order', ctypes.c_int),
+                ('bitmap_pad', ctypes.c_int),
+                ('depth', ctypes.c_int),
+                ('bytes_per_line', ctypes.c_int),
+                ('bits_per_pixel', ctypes.c_int),
+                ('red_mask', ctypes.c_ulong),
+                ('green_mask', ctypes.c_ulong),
+                ('blue_mask', ctypes.c_ulong),
+                ('obdata', ctypes.c_void_p),
+                ('f', ctypes.c_void_p * 6)]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [('shmseg', XID),
+                ('shmid', ctypes.c_int),
+                ('shmaddr', ctypes.c_void_p),
+                ('readOnly', ctypes.c_int)]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+XIOErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p)
+XIOErrorExitHandler = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+
+
+def _loadXlib():
+    xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library('X11') or 'libX11.so.6')
+
+    def prototype(name, restype, *argtypes):
+        function = getattr(xlib, name)
+        function.restype = restype
+        function.argtypes = argtypes
+
+    d = ctypes.c_void_p
+    prototype('XInitThreads', ctypes.c_int)
+    prototype('XOpenDisplay', d, ctypes.c_char_p)
+    prototype('XCloseDisplay', ctypes.c_int, d)
+    prototype('XConnectionNumber', ctypes.c_int, d)
+    prototype('XDefaultRootWindow', XID, d)
+    prototype('XDefaultScreen', ctypes.c_int, d)
+    prototype('XDisplayWidth', ctypes.c_int, d, ctypes.c_int)
+    prototype('XDisplayHeight', ctypes.c_int, d, ctypes.c_int)
+    prototype('XDisplayWidthMM', ctypes.c_int, d, ctypes.c_int)
+    prototype('XInternAtom', Atom, d, ctypes.c_char_p, ctypes.c_int)
+    prototype('XGetAtomName', ctypes.c_void_p, d, Atom)
+    prototype('XGetWindowProperty', ctypes.c_int, d, XID, Atom, ctypes.c_long, ctypes.c_long, ctypes.c_int, Atom,
+              ctypes.POINTER(Atom), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+              ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p))
+    prototype('XGetWindowAttributes', ctypes.c_int, d, XID, ctypes.POINTER(XWindowAttributes))
+    prototype('XTranslateCoordinates', ctypes.c_int, d, XID, XID, ctypes.c_int, ctypes.c_int,
+              ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(XID))
+    prototype('XQueryTree', ctypes.c_int, d, XID, ctypes.POINTER(XID), ctypes.POINTER(XID),
+              ctypes.POINTER(ctypes.POINTER(XID)), ctypes.POINTER(ctypes.c_uint))
+    prototype('XQueryPointer', ctypes.c_int, d, XID, ctypes.POINTER(XID), ctypes.POINTER(XID),
+              ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+              ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_uint))
+    prototype('XGetInputFocus', ctypes.c_int, d, ctypes.POINTER(XID), ctypes.POINTER(ctypes.c_int))
+    prototype('XSendEvent', ctypes.c_int, d, XID, ctypes.c_int, ctypes.c_long, ctypes.POINTER(XEvent))
+    prototype('XSelectInput', ctypes.c_int, d, XID, ctypes.c_long)
+    prototype('XPending', ctypes.c_int, d)
+    prototype('XNextEvent', ctypes.c_int, d, ctypes.POINTER(XEvent))
+    prototype('XMoveResizeWindow', ctypes.c_int, d, XID, ctypes.c_int, ctypes.c_int, ctypes.c_uint, ctypes.c_uint)
+    prototype('XIconifyWindow', ctypes.c_int, d, XID, ctypes.c_int)
+    prototype('XMapWindow', ctypes.c_int, d, XID)
+    prototype('XUnmapWindow', ctypes.c_int, d, XID)
+    prototype('XRaiseWindow', ctypes.c_int, d, XID)
+    prototype('XLowerWindow', ctypes.c_int, d, XID)
+    prototype('XSetInputFocus', ctypes.c_int, d, XID, ctypes.c_int, ctypes.c_ulong)
+    prototype('XSync', ctypes.c_int, d, ctypes.c_int)
+    prototype('XFlush', ctypes.c_int, d)
+    prototype('XFree', ctypes.c_int, ctypes.c_void_p)
+    prototype('XGetImage', ctypes.POINTER(XImage), d, XID, ctypes.c_int, ctypes.c_int, ctypes.c_uint, ctypes.c_uint,
+              ctypes.c_ulong, ctypes.c_int)
+    prototype('XDestroyImage', ctypes.c_int, ctypes.POINTER(XImage))
+    prototype('XSetErrorHandler', ctypes.c_void_p, XErrorHandler)
+    prototype('XSetIOErrorHandler', ctypes.c_void_p, XIOErrorHandler)
+    if hasattr(xlib, 'XSetIOErrorExitHandler'): # Added in libX11 1.7.
+        prototype('XSetIOErrorExitHandler', None, d, XIOErrorExitHandler, ctypes.c_void_p)
+
+    # Xlib must be told that it will be called from more than one thread
+    # before any other Xlib call is made.
+    xlib.XInitThreads()
+    xlib.XSetErrorHandler(_errorHandler)
+    xlib.XSetIOErrorHandler(_ioErrorHandler)
+    return xlib
+
+
+# Xlib's default error handler exits the process, so errors (such as a
+# BadWindow error for a window that has since been closed) are recorded here
+# instead, keyed by the Display pointer, and raised by _checkError().
+_lastErrors = {}
+
+def _handleError(display, errorEvent):
+    _lastErrors[display] = (errorEvent.contents.error_code, errorEvent.contents.request_code)
+    return 0
+
+_errorHandler = XErrorHandler(_handleError) # Keep a reference so this isn't garbage collected.
+
+
+# When the connection to an X server is lost (for example, because the Xvfb
+# server was killed), Xlib calls the IO error handler and then the display's
+# exit handler, which exits the process by default. The exit handler that
+# _openDisplay() installs returns instead, which leaves the Display unusable
+# but the process running, and _checkError() raises for the lost displays
+# recorded here. libX11 older than 1.7 has no exit handlers, so there a lost
+# connection still exits the process.
+_lostDisplays = set()
+
+def _handleIOError(display):
+    _lostDisplays.add(display)
+    return 0
+
+def _handleIOErrorExit(display, userData):
+    _lostDisplays.add(display)
+
+_ioErrorHandler = XIOErrorHandler(_handleIOError)
+_ioErrorExitHandler = XIOErrorExitHandler(_handleIOErrorExit)
+
+
+def _openDisplay(displayName):
+    # Returns a new connection to the X display ``displayName``.
+    display = xlib.XOpenDisplay(displayName.encode('utf-8') or None)
+    if not display:
+        raise PyGetWindowException('Could not open the X display %r.' % (displayName))
+    if hasattr(xlib, 'XSetIOErrorExitHandler'):
+        xlib.XSetIOErrorExitHandler(display, _ioErrorExitHandler, None)
+    return display
+
+
+def _closeDisplay(display):
+    xlib.XCloseDisplay(display)
+    _lastErrors.pop(display, None)
+    _lostDisplays.discard(display)
+
+
+class _LazyXlib(object):
+    # Stands in for the Xlib library until the first call through it, so that
+    # importing this module doesn't load libX11. After loading, it replaces
+    # itself with the library so later calls don't go through __getattr__.
+    def __getattr__(self, name):
+        global xlib
+        with _loadLock:
+            if xlib is self:
+                xlib = _loadXlib()
+        return getattr(xlib, name)
+
+_loadLock = threading.Lock()
+xlib = _LazyXlib()
+
+
+_xrandr = None
+_xrandrLoaded = False
+
+def _getXrandr():
+    # Returns libXrandr, or None if it (or the RandR 1.5 XRRGetMonitors()
+    # function) isn't available. It's only loaded once monitors are needed.
+    global _xrandr, _xrandrLoaded
+    with _loadLock:
+        if not _xrandrLoaded:
+            _xrandrLoaded = True
+            try:
+                _xrandr = ctypes.cdll.LoadLibrary(ctypes.util.find_library('Xrandr') or 'libXrandr.so.2')
+                d = ctypes.c_void_p
+                for name, restype, argtypes in (
+                        ('XRRQueryExtension', ctypes.c_int, (d, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int))),
+                        ('XRRSelectInput', None, (d, XID, ctypes.c_int)),
+                        ('XRRGetMonitors', ctypes.POINTER(XRRMonitorInfo), (d, XID, ctypes.c_int, ctypes.POINTER(ctypes.c_int))),
+                        ('XRRFreeMonitors', None, (ctypes.POINTER(XRRMonitorInfo),))):
+                    function = getattr(_xrandr, name)
+                    function.restype = restype
+                    function.argtypes = argtypes
+            except (OSError, AttributeError):
+                _xrandr = None
+    return _xrandr
+
+
+_xext = None
+_xextLoaded = False
+
+def _getXext():
+    # Returns libXext for its MIT-SHM functions, or None if it isn't installed.
+    global _xext, _xextLoaded
+    with _loadLock:
+        if not _xextLoaded:
+            _xextLoaded = True
+            try:
+                _xext = ctypes.cdll.LoadLibrary(ctypes.util.find_library('Xext') or 'libXext.so.6')
+                d = ctypes.c_void_p
+                for name, restype, argtypes in (
+                        ('XShmQueryExtension', ctypes.c_int, (d,)),
+                        ('XShmCreateImage', ctypes.POINTER(XImage), (d, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+                                                                     ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint)),
+                        ('XShmAttach', ctypes.c_int, (d, ctypes.POINTER(XShmSegmentInfo))),
+                        ('XShmDetach', ctypes.c_int, (d, ctypes.POINTER(XShmSegmentInfo))),
+                        ('XShmGetImage', ctypes.c_int, (d, XID, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong))):
+                    function = getattr(_xext, name)
+                    function.restype = restype
+                    function.argtypes = argtypes
+            except (OSError, AttributeError):
+                _xext = None
+    return _xext
+
+
+_libc = None
+
+def _getLibc():
+    global _libc
+    with _loadLock:
+        if _libc is None:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.shmget.restype = ctypes.c_int
+            libc.shmget.argtypes = (ctypes.c_int, ctypes.c_size_t, ctypes.c_int)
+            libc.shmat.restype = ctypes.c_void_p
+            libc.shmat.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_int)
+            libc.shmdt.restype = ctypes.c_int
+            libc.shmdt.argtypes = (ctypes.c_void_p,)
+            libc.shmctl.restype = ctypes.c_int
+            libc.shmctl.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_void_p)
+            _libc = libc
+    return _libc
+
+
+class _SharedSegment(object):
+    # A System V shared memory segment, attached to this process. It's
+    # detached once nothing uses it: the ctypes arrays returned by view()
+    # (and any memoryviews or NumPy arrays of them) hold a reference to it.
+
+    def __init__(self, size):
+        libc = _getLibc()
+        self.size = size
+        self.shmid = libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if self.shmid == -1:
+            raise PyGetWindowException('shmget() failed: %s' % (os.strerror(ctypes.get_errno())))
+        self.address = libc.shmat(self.shmid, None, 0)
+        if self.address in (None, ctypes.c_void_p(-1).value):
+            error = ctypes.get_errno()
+            self.address = None
+            self.remove()
+            raise PyGetWindowException('shmat() failed: %s' % (os.strerror(error)))
+
+    def remove(self):
+        # Marks the segment to be destroyed once everyone has detached from
+        # it, so that it can't outlive this process. On Linux, the X server
+        # can still attach to it after this.
+        if self.shmid != -1:
+            _getLibc().shmctl(self.shmid, IPC_RMID, None)
+            self.shmid = -1
+
+    def view(self, offset, size):
+        array = (ctypes.c_ubyte * size).from_address(self.address + offset)
+        array.segment = self
+        return array
+
+    def __del__(self):
+        if self.address is not None:
+            _getLibc().shmdt(self.address)
+            self.address = None
+        self.remove()
+
+
+# Frames start on a 64-byte boundary in a capture session's segment.
+_FRAME_ALIGNMENT = 64
+
+
+def _destroySharedImage(image):
+    image.contents.data = None # The pixels belong to the shared memory segment, so XDestroyImage() mustn't free them.
+    xlib.XDestroyImage(image)
+
+
+class _X11CaptureSession(object):
+    # Captures windows with MIT-SHM's XShmGetImage(), which has the X server
+    # write the pixels straight into a shared memory segment. The segment is
+    # reused for every capture (a batch of windows gets one region of it per
+    # window) and only replaced when a capture needs more room, and an
+    # XImage is kept for each region, until a window of a different size or
+    # format is captured into it. Without MIT-SHM (such as on a remote
+    # display), XGetImage() is used and its pixels are copied into a reused
+    # buffer instead.
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._segment = None
+        self._shmInfo = None
+        self._images = {} # Maps a region's offset -> ((visual, depth, width, height), XImage pointer).
+        self._buffer = None # The buffer used without MIT-SHM.
+        xext = _getXext()
+        with backend._lock:
+            self._useShm = xext is not None and bool(xext.XShmQueryExtension(backend.display))
+
+    def capture(self, windows):
+        backend = self._backend
+        layouts = []
+        offset = 0
+        for window in windows:
+            attributes = backend._getAttributes(window)
+            if attributes.map_state != IS_VIEWABLE:
+                raise PyGetWindowException('Window %s is not viewable, so it can\'t be captured.' % (window))
+            if attributes.depth not in (24, 32):
+                raise PyGetWindowException('Window %s has an unsupported depth of %s bits.' % (window, attributes.depth))
+            size = attributes.width * attributes.height * 4
+            layouts.append((window, offset, attributes))
+            offset += -(-size // _FRAME_ALIGNMENT) * _FRAME_ALIGNMENT
+        if self._useShm:
+            return self._captureShm(layouts, offset)
+        return self._captureCopy(layouts, offset)
+
+    def _captureShm(self, layouts, totalSize):
+        backend = self._backend
+        xext = _getXext()
+        if self._segment is None or self._segment.size < totalSize:
+            self._attachSegment(max(totalSize, 2 * self._segment.size if self._segment is not None else 0))
+        frames = []
+        with backend._lock:
+            for window, offset, attributes in layouts:
+                layout = (attributes.visual, attributes.depth, attributes.width, attributes.height)
+                image = None
+                if offset in self._images:
+                    cachedLayout, cachedImage = self._images[offset]
+                    if cachedLayout == layout:
+                        image = cachedImage
+                    else:
+                        del self._images[offset]
+                        _destroySharedImage(cachedImage)
+                if image is None:
+                    image = xext.XShmCreateImage(backend.display, attributes.visual, attributes.depth, ZPIXMAP, None,
+                                                 ctypes.byref(self._shmInfo), attributes.width, attributes.height)
+                    if not image:
+                        raise PyGetWindowException('XShmCreateImage() failed.')
+                    image.contents.data = self._segment.address + offset
+                    self._images[offset] = (layout, image)
+                    if image.contents.bytes_per_line != attributes.width * 4:
+                        raise PyGetWindowException('Window %s has an unsupported pixel format.' % (window))
+                status = xext.XShmGetImage(backend.display, window, image, 0, 0, ALL_PLANES)
+                backend._checkError(status == 0)
+                frames.append(self._segment.view(offset, attributes.width * attributes.height * 4))
+        return [(frame, attributes.width, attributes.height) for frame, (window, offset, attributes) in zip(frames, layouts)]
+
+    def _attachSegment(self, size):
+        # Replaces the segment with a bigger one. Frames already returned
+        # from the old one keep it attached to this process until they're
+        # garbage collected.
+        backend = self._backend
+        xext = _getXext()
+        self._detachSegment()
+        segment = _SharedSegment(size)
+        shmInfo = XShmSegmentInfo()
+        shmInfo.shmid = segment.shmid
+        shmInfo.shmaddr = segment.address
+        shmInfo.readOnly = FALSE
+        with backend._lock:
+            status = xext.XShmAttach(backend.display, ctypes.byref(shmInfo))
+            xlib.XSync(backend.display, FALSE)
+            try:
+                backend._checkError(status == 0)
+            finally:
+                segment.remove()
+        self._segment = segment
+        self._shmInfo = shmInfo
+
+    def _detachSegment(self):
+        backend = self._backend
+        with backend._lock:
+            for layout, image in self._images.values():
+                _destroySharedImage(image)
+            self._images.clear()
+            if self._shmInfo is not None:
+                _getXext().XShmDetach(backend.display, ctypes.byref(self._shmInfo))
+                xlib.XSync(backend.display, FALSE)
+                _lastErrors.pop(backend.display, None)
+        self._segment = None
+        self._shmInfo = None
+
+    def _captureCopy(self, layouts, totalSize):
+        backend = self._backend
+        if self._buffer is None or len(self._buffer) < totalSize:
+            self._buffer = (ctypes.c_ubyte * max(totalSize, 2 * len(self._buffer) if self._buffer is not None else 0))()
+        results = []
+        for window, offset, attributes in layouts:
+            with backend._lock:
+                image = xlib.XGetImage(backend.display, window, 0, 0, attributes.width, attributes.height, ALL_PLANES, ZPIXMAP)
+                backend._checkError(not image)
+            try:
+                size = attributes.width * attributes.height * 4
+                if image.contents.bytes_per_line != attributes.width * 4:
+                    raise PyGetWindowException('Window %s has an unsupported pixel format.' % (window))
+                ctypes.memmove(ctypes.addressof(self._buffer) + offset, image.contents.data, size)
+            finally:
+                xlib.XDestroyImage(image)
+            frame = (ctypes.c_ubyte * size).from_buffer(self._buffer, offset)
+            results.append((frame, attributes.width, attributes.height))
+        return results
+
+    def close(self):
+        if self._useShm and self._backend._display is not None:
+            self._detachSegment()
+
+
+# Maps pid -> (executable path, pidfd, start time) for _getProcessPath(),
+# least recently used first. An entry is dropped once its process exits: a
+# pidfd becomes readable when its process exits, and without pidfds (before
+# Linux 5.3 or Python 3.9) a changed start time in /proc/<pid>/stat means the
+# PID has been reused. Only the _MAX_PROCESS_PATHS most recently used entries
+# are kept, so that the pidfds of processes that are never asked about again
+# are closed.
+_MAX_PROCESS_PATHS = 256
+_processPaths = collections.OrderedDict()
+_processPathsLock = threading.Lock()
+
+
+def _getProcessStartTime(pid):
+    # Returns field 22 of /proc/<pid>/stat. The fields after the command
+    # name start at field 3, and the name itself may contain spaces.
+    with open('/proc/%d/stat' % (pid), 'rb') as fileObj:
+        stat = fileObj.read()
+    return int(stat[stat.rindex(b')') + 2:].split()[19])
+
+
+def _processExited(pid, pidfd, startTime):
+    if pidfd is not None:
+        # poll() rather than select(), which can't take file descriptors of 1024 or more.
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        return bool(poller.poll(0))
+    try:
+        return _getProcessStartTime(pid) != startTime
+    except (IOError, OSError, ValueError):
+        return True
+
+
+def _dropProcessPath(pid):
+    path, pidfd, startTime = _processPaths.pop(pid)
+    if pidfd is not None:
+        os.close(pidfd)
+
+
+def _getProcessPath(pid):
+    """Returns the path of the process's executable from /proc, or ``None``
+    if it can't be read. (This is only meaningful for local X displays.)"""
+    with _processPathsLock:
+        entry = _processPaths.get(pid)
+        if entry is not None:
+            if not _processExited(pid, entry[1], entry[2]):
+                _processPaths[pid] = _processPaths.pop(pid)  # Now the most recently used.
+                return entry[0]
+            _dropProcessPath(pid)
+
+        pidfd = startTime = None
+        try:
+            # Open the pidfd before reading the path, so that the path can't
+            # belong to a later process that reused the PID.
+            if hasattr(os, 'pidfd_open'):
+                pidfd = os.pidfd_open(pid)
+            else:
+                startTime = _getProcessStartTime(pid)
+            try:
+                path = os.readlink('/proc/%d/exe' % (pid))
+            except OSError:
+                # Other users' processes can't be read, but their names can.
+                with open('/proc/%d/comm' % (pid)) as fileObj:
+                    path = fileObj.read().strip()
+        except (IOError, OSError, ValueError):
+            if pidfd is not None:
+                os.close(pidfd)
+            return None
+        _processPaths[pid] = (path, pidfd, startTime)
+        while len(_processPaths) > _MAX_PROCESS_PATHS:
+            _dropProcessPath(next(iter(_processPaths)))
+        return path
+
+
+def _dpi(pixels, millimeters):
+    # X reports each monitor's physical size, so its DPI can be worked out.
+    return int(round(pixels * 25.4 / millimeters)) if millimeters > 0 else 96
+
+
+def _clipRect(rect, bounds):
+    # Returns the part of ``rect`` inside ``bounds``, or ``bounds`` if they don't overlap.
+    if rect is None:
+        return bounds
+    clipped = Rect(max(rect.left, bounds.left), max(rect.top, bounds.top), min(rect.right, bounds.right), min(rect.bottom, bounds.bottom))
+    if clipped.left >= clipped.right or clipped.top >= clipped.bottom:
+        return bounds
+    return clipped
+
+
+class X11Backend(object):
+    """The backend for one X display. ``displayName`` is a display string
+    such as ``':0'``; if it is ``None``, the ``DISPLAY`` environment variable
+    is used. The connection is opened the first time it is needed."""
+
+    def __init__(self, displayName=None):
+        self.displayName = displayName if displayName is not None else os.environ.get('DISPLAY', '')
+        self._display = None
+        self._lock = threading.RLock()
+        self._atoms = {}
+        self._eventDisplay = None # A second connection that display change events are read from.
+        self._displayGeneration = 0
+
+    def __repr__(self):
+        return '%s(displayName=%r)' % (self.__class__.__name__, self.displayName)
+
+    @property
+    def display(self):
+        """The ctypes pointer to this backend's Xlib Display."""
+        if self._display is None:
+            with self._lock:
+                if self._display is None:
+                    display = _openDisplay(self.displayName)
+                    self._root = xlib.XDefaultRootWindow(display)
+                    self._screen = xlib.XDefaultScreen(display)
+                    self._display = display
+        return self._display
+
+    def close(self):
+        """Closes the connection to the X display."""
+        with self._lock:
+            if self._display is not None:
+                _closeDisplay(self._display)
+                self._display = None
+            if self._eventDisplay is not None:
+                _closeDisplay(self._eventDisplay)
+                self._eventDisplay = None
+
+    def _atom(self, name):
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self._atoms[name] = xlib.XInternAtom(self.display, name.encode('ascii'), FALSE)
+        return atom
+
+    def _checkError(self, failed=False):
+        # Raises PyGetWindowException if Xlib reported an error (or if the
+        # calling function's return value says it failed).
+        if self.display in _lostDisplays:
+            raise PyGetWindowException('Lost the connection to the X display %r.' % (self.displayName))
+        error = _lastErrors.pop(self.display, None)
+        if error is not None:
+            raise PyGetWindowException('Error code from X server: %s (request code %s)' % error)
+        if failed:
+            raise PyGetWindowException('The Xlib call failed.')
+
+    def _getProperty(self, window, name, propertyType=ANY_PROPERTY_TYPE):
+        """Returns a list of the items in the ``name`` property of ``window``
+        (ints for 32-bit properties, or a bytes object for 8-bit ones), or
+        ``None`` if the window doesn't have the property."""
+        actualType = Atom()
+        actualFormat = ctypes.c_int()
+        numItems = ctypes.c_ulong()
+        bytesAfter = ctypes.c_ulong()
+        data = ctypes.c_void_p()
+        with self._lock:
+            status = xlib.XGetWindowProperty(self.display, window, self._atom(name), 0, MAX_PROPERTY_LENGTH, FALSE,
+                                             propertyType, ctypes.byref(actualType), ctypes.byref(actualFormat),
+                                             ctypes.byref(numItems), ctypes.byref(bytesAfter), ctypes.byref(data))
+            self._checkError(status != SUCCESS)
+        try:
+            if actualType.value == NONE:
+                return None
+            if actualFormat.value == 8:
+                return ctypes.string_at(data, numItems.value)
+            if actualFormat.value == 16:
+                return list(ctypes.cast(data, ctypes.POINTER(ctypes.c_short))[:numItems.value])
+            # Xlib returns 32-bit properties as an array of C longs.
+            return list(ctypes.cast(data, ctypes.POINTER(ctypes.c_ulong))[:numItems.value])
+        finally:
+            if data:
+                xlib.XFree(data)
+
+    def _sendClientMessage(self, window, messageType, data):
+        # Sends a client message to the root window, the way EWMH asks
+        # pagers and other tools to request changes from the window manager.
+        event = XEvent()
+        event.xclient.type = CLIENT_MESSAGE
+        event.xclient.send_event = TRUE
+        event.xclient.window = window
+        event.xclient.message_type = self._atom(messageType)
+        event.xclient.format = 32
+        for i, value in enumerate(data):
+            event.xclient.data[i] = value
+        with self._lock:
+            xlib.XSendEvent(self.display, self._root, FALSE, SUBSTRUCTURE_REDIRECT_MASK | SUBSTRUCTURE_NOTIFY_MASK, ctypes.byref(event))
+            xlib.XSync(self.display, FALSE)
+            self._checkError()
+
+    def _hasWindowManager(self):
+        return self._getProperty(self._rootWindow(), '_NET_SUPPORTING_WM_CHECK') is not None
+
+    def _rootWindow(self):
+        self.display # Opening the display sets _root.
+        return self._root
+
+    def _getAttributes(self, window):
+        attributes = XWindowAttributes()
+        with self._lock:
+            status = xlib.XGetWindowAttributes(self.display, window, ctypes.byref(attributes))
+            self._checkError(status == 0)
+        return attributes
+
+    def _getRect(self, window, attributes):
+        # The rect includes the window manager's frame, like GetWindowRect()
+        # does on Windows.
+        x = ctypes.c_int()
+        y = ctypes.c_int()
+        child = XID()
+        with self._lock:
+            status = xlib.XTranslateCoordinates(self.display, window, self._root, 0, 0, ctypes.byref(x), ctypes.byref(y), ctypes.byref(child))
+            self._checkError(status == 0)
+        frameLeft, frameRight, frameTop, frameBottom = self._getFrameExtents(window)
+        return Rect(x.value - frameLeft,
+                    y.value - frameTop,
+                    x.value + attributes.width + frameRight,
+                    y.value + attributes.height + frameBottom)
+
+    def _getFrameExtents(self, window):
+        extents = self._getProperty(window, '_NET_FRAME_EXTENTS')
+        if not extents or len(extents) != 4:
+            return (0, 0, 0, 0)
+        return tuple(extents)
+
+    def _getStateFlags(self, window, attributes):
+        flags = 0
+        netWmState = self._getProperty(window, '_NET_WM_STATE') or ()
+        if self._atom('_NET_WM_STATE_HIDDEN') in netWmState:
+            flags |= STATE_MINIMIZED
+        if self._atom('_NET_WM_STATE_MAXIMIZED_VERT') in netWmState and self._atom('_NET_WM_STATE_MAXIMIZED_HORZ') in netWmState:
+            flags |= STATE_MAXIMIZED
+        # Minimized windows are unmapped, but are still "visible" in the sense
+        # that IsWindowVisible() uses on Windows.
+        if attributes.map_state == IS_VIEWABLE or flags & STATE_MINIMIZED:
+            flags |= STATE_VISIBLE
+        return flags
+
+    # The backend primitives. See pygetwindow.useBackend().
+
+    def _enumWindowHandles(self):
+        """Returns the windows managed by the window manager, topmost first. If
+        there is no (EWMH-compliant) window manager, returns the mapped
+        children of the root window instead."""
+        root = self._rootWindow()
+        stacking = self._getProperty(root, '_NET_CLIENT_LIST_STACKING')
+        if stacking is None:
+            stacking = self._getProperty(root, '_NET_CLIENT_LIST')
+        if stacking is None:
+            stacking = [window for window in self._queryTree(root) if self._getAttributes(window).map_state == IS_VIEWABLE]
+        return list(reversed(stacking)) # X11 lists windows bottommost first.
+
+    def _queryTree(self, window):
+        root = XID()
+        parent = XID()
+        children = ctypes.POINTER(XID)()
+        numChildren = ctypes.c_uint()
+        with self._lock:
+            status = xlib.XQueryTree(self.display, window, ctypes.byref(root), ctypes.byref(parent), ctypes.byref(children), ctypes.byref(numChildren))
+            self._checkError(status == 0)
+        try:
+            return children[:numChildren.value]
+        finally:
+            if children:
+                xlib.XFree(children)
+
+    def _enumChildHandles(self, window):
+        """Returns the window's direct children from XQueryTree(), topmost first."""
+        return list(reversed(self._queryTree(window)))
+
+    def _getWindowPid(self, window):
+        """Returns the _NET_WM_PID of the window, or ``None`` if the client didn't set it."""
+        pid = self._getProperty(window, '_NET_WM_PID')
+        return pid[0] if pid else None
+
+    def _getProcessPath(self, pid):
+        return _getProcessPath(pid)
+
+    def _getActiveWindowHandle(self):
+        active = self._getProperty(self._rootWindow(), '_NET_ACTIVE_WINDOW')
+        if active is not None:
+            return active[0] or None
+        focus = XID()
+        revertTo = ctypes.c_int()
+        with self._lock:
+            xlib.XGetInputFocus(self.display, ctypes.byref(focus), ctypes.byref(revertTo))
+        return focus.value if focus.value > 1 else None # 0 is None and 1 is PointerRoot.
+
+    def _getWindowRect(self, window):
+        return self._getRect(window, self._getAttributes(window))
+
+    def _getWindowTitle(self, window):
+        title = self._getProperty(window, '_NET_WM_NAME', self._atom('UTF8_STRING'))
+        if title is not None:
+            return title.decode('utf-8', 'replace')
+        title = self._getProperty(window, 'WM_NAME')
+        if title is not None:
+            return title.decode('latin-1')
+        return ''
+
+    def _getWindowClass(self, window):
+        """Returns the class part of the window's WM_CLASS property (such as
+        ``'Firefox'``), or ``''`` if it isn't set."""
+        wmClass = self._getProperty(window, 'WM_CLASS')
+        if not wmClass:
+            return ''
+        parts = wmClass.split(b'\0') # The instance name and then the class name, each null-terminated.
+        return (parts[1] if len(parts) > 1 else parts[0]).decode('latin-1')
+
+    def _getWindowFlags(self, window):
+        return self._getStateFlags(window, self._getAttributes(window))
+
+    def _getWindowState(self, window):
+        # The attributes give both the map state and the size, so one
+        # XGetWindowAttributes() and one _NET_WM_STATE read cover everything
+        # except the position and frame.
+        attributes = self._getAttributes(window)
+        return self._getRect(window, attributes), self._getStateFlags(window, attributes)
+
+    def _setWindowGeometry(self, window, left, top, width, height):
+        # With the default NorthWest gravity, the window manager places the
+        # frame's top-left corner at (left, top); the width and height passed
+        # to Xlib are for the client area inside the frame.
+        frameLeft, frameRight, frameTop, frameBottom = self._getFrameExtents(window)
+        with self._lock:
+            xlib.XMoveResizeWindow(self.display, window, left, top,
+                                   max(1, width - frameLeft - frameRight), max(1, height - frameTop - frameBottom))
+            xlib.XSync(self.display, FALSE)
+            self._checkError()
+
+    def _showWindow(self, window, command):
+        if command == 'minimize':
+            with self._lock:
+                xlib.XIconifyWindow(self.display, window, self._screen)
+        elif command in ('maximize', 'restore'):
+            action = _NET_WM_STATE_ADD if command == 'maximize' else _NET_WM_STATE_REMOVE
+            self._sendClientMessage(window, '_NET_WM_STATE', [action, self._atom('_NET_WM_STATE_MAXIMIZED_VERT'), self._atom('_NET_WM_STATE_MAXIMIZED_HORZ'), 1])
+            if command == 'restore':
+                with self._lock:
+                    xlib.XMapWindow(self.display, window) # Mapping an iconic window de-iconifies it.
+        elif command == 'show':
+            with self._lock:
+                xlib.XMapWindow(self.display, window)
+        elif command == 'hide':
+            with self._lock:
+                xlib.XUnmapWindow(self.display, window)
+        else:
+            raise PyGetWindowException('Unknown show command: %r' % (command))
+        with self._lock:
+            xlib.XSync(self.display, FALSE)
+            self._checkError()
+
+    def _setWindowZOrder(self, window, position):
+        if position not in ('top', 'bottom'):
+            raise PyGetWindowException('Unknown z-order position: %r' % (position))
+        if self._hasWindowManager():
+            # The window manager restacks the frame, which raising the client window wouldn't do.
+            self._sendClientMessage(window, '_NET_RESTACK_WINDOW', [2, NONE, ABOVE if position == 'top' else BELOW])
+        else:
+            with self._lock:
+                if position == 'top':
+                    xlib.XRaiseWindow(self.display, window)
+                else:
+                    xlib.XLowerWindow(self.display, window)
+                xlib.XSync(self.display, FALSE)
+                self._checkError()
+
+    def _activateWindow(self, window):
+        if self._hasWindowManager():
+            self._sendClientMessage(window, '_NET_ACTIVE_WINDOW', [2, CURRENT_TIME, 0]) # 2 means the request is from a pager.
+        else:
+            with self._lock:
+                xlib.XRaiseWindow(self.display, window)
+                xlib.XSetInputFocus(self.display, window, REVERT_TO_PARENT, CURRENT_TIME)
+                xlib.XSync(self.display, FALSE)
+                self._checkError()
+
+    def _closeWindow(self, window):
+        if self._hasWindowManager():
+            self._sendClientMessage(window, '_NET_CLOSE_WINDOW', [CURRENT_TIME, 2])
+        else:
+            # Without a window manager, ask the client directly (ICCCM WM_DELETE_WINDOW).
+            event = XEvent()
+            event.xclient.type = CLIENT_MESSAGE
+            event.xclient.window = window
+            event.xclient.message_type = self._atom('WM_PROTOCOLS')
+            event.xclient.format = 32
+            event.xclient.data[0] = self._atom('WM_DELETE_WINDOW')
+            event.xclient.data[1] = CURRENT_TIME
+            with self._lock:
+                xlib.XSendEvent(self.display, window, FALSE, 0, ctypes.byref(event))
+                xlib.XSync(self.display, FALSE)
+                self._checkError()
+
+    def _getAtomName(self, atom):
+        with self._lock:
+            name = xlib.XGetAtomName(self.display, atom)
+            self._checkError(not name)
+        try:
+            return ctypes.string_at(name).decode('utf-8', 'replace')
+        finally:
+            xlib.XFree(name)
+
+    def _getWorkArea(self):
+        # Returns the work area of the current desktop from _NET_WORKAREA, or
+        # None if the window manager doesn't set it.
+        root = self._rootWindow()
+        workAreas = self._getProperty(root, '_NET_WORKAREA')
+        if not workAreas or len(workAreas) < 4:
+            return None
+        desktop = self._getProperty(root, '_NET_CURRENT_DESKTOP')
+        i = desktop[0] if desktop and (desktop[0] + 1) * 4 <= len(workAreas) else 0
+        x, y, width, height = workAreas[i * 4 : i * 4 + 4]
+        return Rect(x, y, x + width, y + height)
+
+    def _enumMonitors(self):
+        """Returns a list of Monitors from RandR's XRRGetMonitors(), or one
+        Monitor for the whole screen if RandR 1.5 isn't available. EWMH has a
+        single work area for all monitors, so each monitor's work area is the
+        part of it that is on that monitor."""
+        from pygetwindow._monitors import Monitor
+
+        display = self.display
+        workArea = self._getWorkArea()
+        monitors = []
+        xrandr = _getXrandr()
+        if xrandr is not None:
+            count = ctypes.c_int()
+            with self._lock:
+                infos = xrandr.XRRGetMonitors(display, self._root, TRUE, ctypes.byref(count))
+                self._checkError()
+            try:
+                for i in range(count.value if infos else 0):
+                    info = infos[i]
+                    rect = Rect(info.x, info.y, info.x + info.width, info.y + info.height)
+                    monitors.append(Monitor(info.name, self._getAtomName(info.name), rect, _clipRect(workArea, rect),
+                                            _dpi(info.width, info.mwidth), bool(info.primary)))
+            finally:
+                if infos:
+                    xrandr.XRRFreeMonitors(infos)
+
+        if not monitors:
+            width = xlib.XDisplayWidth(display, self._screen)
+            rect = Rect(0, 0, width, xlib.XDisplayHeight(display, self._screen))
+            monitors.append(Monitor(self._screen, self.displayName, rect, _clipRect(workArea, rect),
+                                    _dpi(width, xlib.XDisplayWidthMM(display, self._screen)), True))
+        elif not any(monitor.primary for monitor in monitors):
+            monitors[0] = monitors[0]._replace(primary=True)
+        return monitors
+
+    def _getDisplayGeneration(self):
+        """Returns a count of the display changes seen so far: root window
+        resizes, RandR notifications, and changes to the work area. The events
+        are read from a second connection that only listens for them."""
+        with self._lock:
+            if self._eventDisplay is None:
+                self._openEventDisplay()
+            display = self._eventDisplay
+            watchedAtoms = (self._atom('_NET_WORKAREA'), self._atom('_NET_CURRENT_DESKTOP'))
+            event = XEvent()
+            while xlib.XPending(display):
+                xlib.XNextEvent(display, ctypes.byref(event))
+                if event.type == CONFIGURE_NOTIFY or (event.type == PROPERTY_NOTIFY and event.xproperty.atom in watchedAtoms) or (
+                        self._rrEventBase is not None and self._rrEventBase <= event.type < self._rrEventBase + RR_NUMBER_EVENTS):
+                    self._displayGeneration += 1
+            if display in _lostDisplays:
+                raise PyGetWindowException('Lost the connection to the X display %r.' % (self.displayName))
+            return self._displayGeneration
+
+    def _openEventDisplay(self):
+        display = _openDisplay(self.displayName)
+        root = xlib.XDefaultRootWindow(display)
+        xlib.XSelectInput(display, root, STRUCTURE_NOTIFY_MASK | PROPERTY_CHANGE_MASK)
+        self._rrEventBase = None
+        xrandr = _getXrandr()
+        if xrandr is not None:
+            eventBase = ctypes.c_int()
+            errorBase = ctypes.c_int()
+            if xrandr.XRRQueryExtension(display, ctypes.byref(eventBase), ctypes.byref(errorBase)):
+                xrandr.XRRSelectInput(display, root, RR_SCREEN_CHANGE_NOTIFY_MASK | RR_CRTC_CHANGE_NOTIFY_MASK | RR_OUTPUT_CHANGE_NOTIFY_MASK)
+                self._rrEventBase = eventBase.value
+        xlib.XFlush(display)
+        self._eventDisplay = display
+
+    def _watchWindowEvents(self, callback):
+        """Calls ``callback(event, window, timestamp)`` from a background
+        thread each time a window event happens, until the returned function
+        is called. ``event`` is ``'activated'`` when the window manager
+        changes _NET_ACTIVE_WINDOW (``window`` is ``None`` if no window is
+        active), and ``'created'`` or ``'destroyed'`` when a window is added
+        to or removed from _NET_CLIENT_LIST. ``'moved'`` comes from the
+        ConfigureNotify events that window managers send to clients whose
+        frames are moved or resized, and ``'restacked'`` (with ``window``
+        ``None``) means _NET_CLIENT_LIST_STACKING changed. Each watcher reads
+        events from its own connection."""
+        display = _openDisplay(self.displayName)
+        xlib.XSelectInput(display, xlib.XDefaultRootWindow(display), PROPERTY_CHANGE_MASK)
+        xlib.XFlush(display)
+        activeWindowAtom = self._atom('_NET_ACTIVE_WINDOW')
+        clientListAtom = self._atom('_NET_CLIENT_LIST')
+        stackingAtom = self._atom('_NET_CLIENT_LIST_STACKING')
+        clients = set(self._getProperty(self._rootWindow(), '_NET_CLIENT_LIST') or ())
+        for window in clients:
+            xlib.XSelectInput(display, window, STRUCTURE_NOTIFY_MASK)
+        xlib.XFlush(display)
+        stopReader, stopWriter = os.pipe()
+
+        def watch():
+            event = XEvent()
+            connection = xlib.XConnectionNumber(display)
+            try:
+                while True:
+                    while xlib.XPending(display):
+                        xlib.XNextEvent(display, ctypes.byref(event))
+                        if event.type == CONFIGURE_NOTIFY:
+                            if event.xconfigure.window in clients:
+                                callback('moved', event.xconfigure.window, time.time())
+                            continue
+                        if event.type != PROPERTY_NOTIFY:
+                            continue
+                        if event.xproperty.atom == stackingAtom:
+                            callback('restacked', None, time.time())
+                        elif event.xproperty.atom == activeWindowAtom:
+                            callback('activated', self._getActiveWindowHandle(), time.time())
+                        elif event.xproperty.atom == clientListAtom:
+                            newClients = self._getProperty(self._rootWindow(), '_NET_CLIENT_LIST') or []
+                            timestamp = time.time()
+                            for window in newClients: # _NET_CLIENT_LIST is in the order the windows were mapped.
+                                if window not in clients:
+                                    xlib.XSelectInput(display, window, STRUCTURE_NOTIFY_MASK)
+                                    callback('created', window, timestamp)
+                            newClientSet = set(newClients)
+                            for window in clients - newClientSet:
+                                callback('destroyed', window, timestamp)
+                            clients.clear()
+                            clients.update(newClientSet)
+                    _lastErrors.pop(display, None) # BadWindow errors from windows that closed before XSelectInput().
+                    if display in _lostDisplays or stopReader in select.select([connection, stopReader], [], [])[0]:
+                        break
+            finally:
+                _closeDisplay(display)
+                os.close(stopReader)
+
+        watcher = threading.Thread(target=watch, name='pygetwindow event watcher')
+        watcher.daemon = True
+        watcher.start()
+
+        def stop():
+            os.write(stopWriter, b'x')
+            os.close(stopWriter)
+            watcher.join()
+        return stop
+
+    def _openCaptureSession(self):
+        """Returns an object whose ``capture(windows)`` method returns a list
+        of ``(pixels, width, height)`` tuples, where ``pixels`` is a buffer of
+        each window's BGRA pixels. See _X11CaptureSession."""
+        return _X11CaptureSession(self)
+
+    def cursor(self):
+        """Returns the current xy coordinates of the mouse cursor as a Point."""
+        root = XID()
+        child = XID()
+        rootX = ctypes.c_int()
+        rootY = ctypes.c_int()
+        winX = ctypes.c_int()
+        winY = ctypes.c_int()
+        mask = ctypes.c_uint()
+        with self._lock:
+            xlib.XQueryPointer(self.display, self._root, ctypes.byref(root), ctypes.byref(child), ctypes.byref(rootX),
+                               ctypes.byref(rootY), ctypes.byref(winX), ctypes.byref(winY), ctypes.byref(mask))
+        return Point(x=rootX.value, y=rootY.value)
+
+    _getCursorPosition = cursor # The backend primitive for the cursor's position.
+
+    def resolution(self):
+        """Returns the width and height of the default screen as a Size."""
+        display = self.display
+        return Size(width=xlib.XDisplayWidth(display, self._screen), height=xlib.XDisplayHeight(display, self._screen))
+
+
+class X11Window(BaseWindow):
+    def __init__(self, hWnd, backend=None):
+        self._hWnd = hWnd
+        self._backend = _getDefaultBackend() if backend is None else backend
+        self._setupRectProperties()
+
+    def show(self):
+        """If hidden or showing, shows (maps) the window."""
+        self._backend._showWindow(self._hWnd, 'show')
+
+    def hide(self):
+        """If hidden or showing, hides (unmaps) the window."""
+        self._backend._showWindow(self._hWnd, 'hide')
+
+    resize = BaseWindow.resizeRel # resize is an alias for the resizeRel() method.
+    move = BaseWindow.moveRel # move is an alias for the moveRel() method.
+
+
+X11Backend.Window = X11Window # The Window class of this backend.
+Window = X11Window
+
+
+_defaultBackend = None
+
+def _getDefaultBackend():
+    """Returns the X11Backend for the ``DISPLAY`` environment variable."""
+    global _defaultBackend
+    if _defaultBackend is None:
+        _defaultBackend = X11Backend()
+    return _defaultBackend
+
+
+def cursor():
+    """Returns the current xy coordinates of the mouse cursor as a two-integer
+    tuple by calling the XQueryPointer() Xlib function.
+
+    Returns:
+      (x, y) tuple of the current xy coordinates of the mouse cursor.
+    """
+    return _getDefaultBackend().cursor()
+
+
+def resolution():
+    """Returns the width and height of the screen as a two-integer tuple.
+
+    Returns:
+      (width, height) tuple of the screen size, in pixels.
+    """
+    return _getDefaultBackend().resolution()
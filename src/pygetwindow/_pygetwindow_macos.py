@@ -1,174 +1,207 @@
-import Quartz
-import pygetwindow
+# The macOS backend, built on Quartz's CGWindowListCopyWindowInfo().
+#
+# One call to CGWindowListCopyWindowInfo() returns a dictionary for every
+# window, and decodeWindowList() turns that list into a Snapshot (plus the
+# owner columns a Snapshot doesn't have) in a single pass. The primitive
+# functions below are all answered from the most recently decoded list, so
+# a whole getSnapshot() or getWindowsWithTitle() costs one Quartz call. The
+# list is decoded again by every _enumWindowHandles() call, and by any other
+# primitive once it is more than _MAX_LIST_AGE seconds old.
+#
+# A window's title is its application's name and its own name, such as
+# "Safari Apple", as it always has been on macOS. Window names are empty
+# unless the app has Screen Recording permission, so the application's name
+# is what searches like getWindowsWithTitle('Safari') usually match.
+#
+# Quartz (from pyobjc) is imported the first time it's needed, so that this
+# module can be imported (and tested, with a stand-in Quartz module) anywhere.
+#
+# Moving, resizing, and activating windows need the Accessibility API, which
+# isn't wrapped yet, so those primitives raise NotImplementedError. Notes:
+# Source: https://stackoverflow.com/questions/7460092/nswindow-makekeyandorderfront-makes-window-appear-but-not-key-or-front?rq=1
+# Source: https://stackoverflow.com/questions/4905024/is-it-possible-to-bring-window-to-front-without-taking-focus?rq=1
+
+import array
+import sys
+import threading
+import time
+
+from pygetwindow import PyGetWindowException, BaseWindow, STATE_VISIBLE, STATE_ACTIVE
+
+
+# How many seconds a decoded window list answers the per-window primitives
+# for, before they ask Quartz again.
+_MAX_LIST_AGE = 0.1
+
+_quartz = None
+
+
+def _getQuartz():
+    global _quartz
+    if _quartz is None:
+        import Quartz as _quartz
+    return _quartz
+
+
+class _WindowList(object):
+    # A decoded CGWindowListCopyWindowInfo() result: ``snapshot`` holds the
+    # handles (kCGWindowNumber), rects, titles, and flags in front-to-back
+    # order, ``pids`` and ``owners`` are the owning applications' process
+    # IDs and names, and ``activeHandle`` is the frontmost normal window.
+
+    def __init__(self, snapshot, pids, owners, activeHandle):
+        self.snapshot = snapshot
+        self.pids = pids
+        self.owners = owners
+        self.activeHandle = activeHandle
+
+
+def decodeWindowList(windowInfos, timestamp=None):
+    """Returns a _WindowList of the window-info dictionaries in
+    ``windowInfos``, as returned by CGWindowListCopyWindowInfo()."""
+    from pygetwindow._snapshot import Snapshot
+
+    handles = []
+    rects = array.array('i')
+    titles = []
+    flags = array.array('I')
+    pids = array.array('i')
+    owners = []
+    activeHandle = None
+    for info in windowInfos:
+        # pyobjc's kCGWindow* constants are these same strings, so they're
+        # used directly rather than looked up on the Quartz module each time.
+        handle = int(info['kCGWindowNumber'])
+        bounds = info['kCGWindowBounds']
+        left = int(bounds['X'])
+        top = int(bounds['Y'])
+        handles.append(handle)
+        rects.extend((left, top, left + int(bounds['Width']), top + int(bounds['Height'])))
+        owner = info.get('kCGWindowOwnerName') or ''
+        titles.append('%s %s' % (owner, info.get('kCGWindowName') or ''))
+        windowFlags = 0
+        if info.get('kCGWindowIsOnscreen', True) and info.get('kCGWindowAlpha', 1.0) != 0.0:
+            windowFlags = STATE_VISIBLE
+        # Source: https://stackoverflow.com/questions/5286274/front-most-window-using-cgwindowlistcopywindowinfo
+        if activeHandle is None and info.get('kCGWindowLayer', 0) == 0:
+            activeHandle = handle
+            windowFlags |= STATE_ACTIVE
+        flags.append(windowFlags)
+        pids.append(int(info.get('kCGWindowOwnerPID', 0)))
+        owners.append(owner)
+    return _WindowList(Snapshot(handles, rects, titles, flags, timestamp), pids, owners, activeHandle)
+
 
+_current = None  # The most recently decoded _WindowList.
+_lock = threading.Lock()
 
-def getAllTitles():
-    """Returns a list of strings of window titles for all visible windows.
-    """
 
-    # Source: https://stackoverflow.com/questions/53237278/obtain-list-of-all-window-titles-on-macos-from-a-python-script/53985082#53985082
-    windows = Quartz.CGWindowListCopyWindowInfo(Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID)
-    return ['%s %s' % (win[Quartz.kCGWindowOwnerName], win.get(Quartz.kCGWindowName, '')) for win in windows]
+def _copyWindowList():
+    global _current
+    Quartz = _getQuartz()
+    timestamp = time.time()
+    windowInfos = Quartz.CGWindowListCopyWindowInfo(Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly,
+                                                    Quartz.kCGNullWindowID)
+    windowList = decodeWindowList(windowInfos, timestamp)
+    with _lock:
+        if _current is None or _current.snapshot.timestamp <= timestamp:
+            _current = windowList
+    return windowList
 
 
-def getActiveWindow():
-    """Returns a Window object of the currently active Window."""
+def _getWindowList(handle=None):
+    # Returns a recent enough _WindowList, one that has ``handle`` in it if
+    # it's given (the window may be newer than the list).
+    windowList = _current
+    if windowList is None or time.time() - windowList.snapshot.timestamp > _MAX_LIST_AGE or \
+            (handle is not None and handle not in windowList.snapshot):
+        windowList = _copyWindowList()
+    return windowList
 
-    # Source: https://stackoverflow.com/questions/5286274/front-most-window-using-cgwindowlistcopywindowinfo
-    windows = Quartz.CGWindowListCopyWindowInfo(Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID)
-    for win in windows:
-        if win['kCGWindowLayer'] == 0:
-            return '%s %s' % (win[Quartz.kCGWindowOwnerName], win.get(Quartz.kCGWindowName, '')) # Temporary. For now, we'll just return the title of the active window.
-    raise Exception('Could not find an active window.') # Temporary hack.
 
+def _row(handle):
+    windowList = _getWindowList(handle)
+    i = windowList.snapshot.indexOf(handle)
+    if i == -1:
+        raise PyGetWindowException('There is no window with the number %s.' % (handle))
+    return windowList, i
 
-def getWindowsAt(x, y):
-    windows = Quartz.CGWindowListCopyWindowInfo(Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID)
-    matches = []
-    for win in windows:
-        w = win['kCGWindowBounds']
-        if pygetwindow.pointInRect(x, y, w['X'], w['Y'], w['Width'], w['Height']):
-            matches.append('%s %s' % (win[Quartz.kCGWindowOwnerName], win.get(Quartz.kCGWindowName, '')))
-    return matches
 
+def _enumWindowHandles():
+    """Returns a list of the window numbers of the windows on screen, front to back."""
+    return list(_copyWindowList().snapshot.handles)
 
 
-def activate():
-    # TEMP - this is not a real api, I'm just using this name to store these notes for now.
+def _getActiveWindowHandle():
+    """Returns the window number of the frontmost normal window, or None."""
+    return _getWindowList().activeHandle
 
-    # Source: https://stackoverflow.com/questions/7460092/nswindow-makekeyandorderfront-makes-window-appear-but-not-key-or-front?rq=1
-    # Source: https://stackoverflow.com/questions/4905024/is-it-possible-to-bring-window-to-front-without-taking-focus?rq=1
-    pass
 
+def _getWindowRect(handle):
+    windowList, i = _row(handle)
+    return windowList.snapshot.rect(i)
 
-def getWindowGeometry(title):
-    # TEMP - this is not a real api, I'm just using this name to stoe these notes for now.
-    windows = Quartz.CGWindowListCopyWindowInfo(Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID)
-    for win in windows:
-        if title in '%s %s' % (win[Quartz.kCGWindowOwnerName], win.get(Quartz.kCGWindowName, '')):
-            w = win['kCGWindowBounds']
-            return (w['X'], w['Y'], w['Width'], w['Height'])
 
+def _getWindowTitle(handle):
+    windowList, i = _row(handle)
+    return windowList.snapshot.titles[i]
 
-def isVisible(title):
-    # TEMP - this is not a real api, I'm just using this name to stoe these notes for now.
-    windows = Quartz.CGWindowListCopyWindowInfo(Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID)
-    for win in windows:
-        if title in '%s %s' % (win[Quartz.kCGWindowOwnerName], win.get(Quartz.kCGWindowName, '')):
-            return win['kCGWindowAlpha'] != 0.0
-
-def isMinimized():
-    # TEMP - this is not a real api, I'm just using this name to stoe these notes for now.
-    # Source: https://stackoverflow.com/questions/10258676/how-to-know-whether-a-window-is-minimised-or-not
-    # Use the kCGWindowIsOnscreen to check this. Minimized windows are considered to not be on the screen. (But I'm not sure if there are other situations where a window is "off screen".)
-
-    # I'm not sure how kCGWindowListOptionOnScreenOnly interferes with this.
-    pass
-
-# TODO: This class doesn't work yet. I've copied the Win32Window class and will make adjustments as needed here.
-
-class MacOSWindow():
-    def __init__(self, hWnd):
-        self._hWnd = hWnd # TODO fix this, this is a LP_c_long insead of an int.
-
-        def _onRead(attrName):
-            r = self._getWindowRect(_hWnd)
-            self._rect._left = r.left # Setting _left directly to skip the onRead.
-            self._rect._top = r.top # Setting _top directly to skip the onRead.
-            self._rect._width = r.right - r.left # Setting _width directly to skip the onRead.
-            self._rect._height = r.bottom - r.top # Setting _height directly to skip the onRead.
-
-        def _onChange(oldBox, newBox):
-            self.moveTo(newBox.left, newBox.top)
-            self.resizeTo(newBox.width, newBox.height)
-
-        r = self._getWindowRect(_hWnd)
-        self._rect = pyrect.Rect(r.left, r.top, r.right - r.left, r.bottom - r.top, onChange=_onChange, onRead=_onRead)
-
-    def __str__(self):
-        r = self._getWindowRect(_hWnd)
-        width = r.right - r.left
-        height = r.bottom - r.top
-        return '<%s left="%s", top="%s", width="%s", height="%s", title="%s">' % (self.__class__.__name__, r.left, r.top, width, height, self.title)
 
+def _getWindowFlags(handle):
+    windowList, i = _row(handle)
+    return windowList.snapshot.flags[i] & ~STATE_ACTIVE
 
-    def __repr__(self):
-        return '%s(hWnd=%s)' % (self.__class__.__name__, self._hWnd)
 
+def _getWindowState(handle):
+    windowList, i = _row(handle)
+    return windowList.snapshot.rect(i), windowList.snapshot.flags[i] & ~STATE_ACTIVE
 
-    def __eq__(self, other):
-        return isinstance(other, MacOSWindow) and self._hWnd == other._hWnd
 
+def _getWindowPid(handle):
+    windowList, i = _row(handle)
+    return windowList.pids[i] or None
 
-    def close(self):
-        """Closes this window. This may trigger "Are you sure you want to
-        quit?" dialogs or other actions that prevent the window from
-        actually closing. This is identical to clicking the X button on the
-        window."""
-        raise NotImplementedError
 
-    def minimize(self):
-        """Minimizes this window."""
-        raise NotImplementedError
+def _getProcessPath(pid):
+    """Returns the name of the application with process ID ``pid`` (Quartz
+    reports application names rather than executable paths), or None."""
+    windowList = _getWindowList()
+    for i, windowPid in enumerate(windowList.pids):
+        if windowPid == pid:
+            return windowList.owners[i]
+    return None
 
 
-    def maximize(self):
-        """Maximizes this window."""
-        raise NotImplementedError
+def _getWindowClass(handle):
+    # macOS windows have no class name; the owning application's name is the closest thing.
+    windowList, i = _row(handle)
+    return windowList.owners[i]
 
 
-    def restore(self):
-        """If maximized or minimized, restores the window to it's normal size."""
-        raise NotImplementedError
+def _getDisplayGeneration():
+    return 0
 
 
-    def activate(self):
-        """Activate this window and make it the foreground window."""
-        raise NotImplementedError
+def _notSupported(*args):
+    raise NotImplementedError('PyGetWindow can only read windows on macOS so far. If you have Appkit/Cocoa knowledge, please contribute! https://github.com/asweigart/pygetwindow')
 
 
-    def resizeRel(self, widthOffset, heightOffset):
-        """Resizes the window relative to its current size."""
-        raise NotImplementedError
+_setWindowGeometry = _showWindow = _activateWindow = _closeWindow = _setWindowZOrder = _notSupported
+_enumMonitors = _enumChildHandles = _getCursorPosition = _notSupported
 
 
-    def resizeTo(self, newWidth, newHeight):
-        """Resizes the window to a new width and height."""
-        raise NotImplementedError
+_thisModule = sys.modules[__name__]
 
 
-    def moveRel(self, xOffset, yOffset):
-        """Moves the window relative to its current position."""
-        raise NotImplementedError
+class MacOSWindow(BaseWindow):
+    def __init__(self, hWnd, backend=None):
+        self._hWnd = hWnd # The window's kCGWindowNumber.
+        self._backend = _thisModule if backend is None else backend
+        self._setupRectProperties()
 
-
-    def moveTo(self, newLeft, newTop):
-        """Moves the window to new coordinates on the screen."""
-        raise NotImplementedError
-
-
-    @property
-    def isMinimized(self):
-        """Returns True if the window is currently minimized."""
-        raise NotImplementedError
-
-    @property
-    def isMaximized(self):
-        """Returns True if the window is currently maximized."""
-        raise NotImplementedError
-
-    @property
-    def isActive(self):
-        """Returns True if the window is currently the active, foreground window."""
-        raise NotImplementedError
-
-    @property
-    def title(self):
-        """Returns the window title as a string."""
-        raise NotImplementedError
-
-    @property
-    def visible(self):
-        raise NotImplementedError
+    # Minimized windows aren't in the on-screen window list at all, so
+    # isMinimized is always False for now.
+    # Source: https://stackoverflow.com/questions/10258676/how-to-know-whether-a-window-is-minimised-or-not
 
 
+Window = MacOSWindow # The Window class of this backend.
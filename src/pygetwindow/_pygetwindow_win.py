@@ -1,7 +1,11 @@
+import collections
 import ctypes
+import sys
+import threading
+import time
 from ctypes import wintypes # We can't use ctypes.wintypes, we must import wintypes this way.
 
-from pygetwindow import PyGetWindowException, pointInRect, BaseWindow, Rect, Point, Size
+from pygetwindow import PyGetWindowException, BaseWindow, Rect, Point, Size, STATE_VISIBLE, STATE_MINIMIZED, STATE_MAXIMIZED
 
 
 NULL = 0 # Used to match the Win32 API value of "null".
@@ -20,11 +24,61 @@ SW_HIDE = 0
 SW_SHOW = 5
 SW_RESTORE = 9
 
+# These SW_SHOW constants are the showCmd values returned by GetWindowPlacement().
+SW_SHOWMINIMIZED = 2
+SW_SHOWMAXIMIZED = 3
+
+# GetWindow() constants:
+GW_HWNDNEXT = 2
+GW_CHILD = 5
+
+# GetAncestor() constants:
+GA_ROOT = 2
+
 # SetWindowPos constants:
 HWND_TOP = 0
+HWND_BOTTOM = 1
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_NOACTIVATE = 0x0010
 
 # Window Message constants:
 WM_CLOSE = 0x0010
+WM_QUIT = 0x0012
+WM_SETTINGCHANGE = 0x001A
+WM_DISPLAYCHANGE = 0x007E
+WM_DPICHANGED = 0x02E0
+
+# The wParam of the WM_SETTINGCHANGE message sent when the work area changes.
+SPI_SETWORKAREA = 0x002F
+
+# SetWinEventHook() constants:
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_SYSTEM_MINIMIZESTART = 0x0016
+EVENT_SYSTEM_MINIMIZEEND = 0x0017
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+
+# OpenProcess() access rights and WaitForSingleObject() results:
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+SYNCHRONIZE = 0x00100000
+WAIT_OBJECT_0 = 0
+
+# Window capture constants:
+PAGE_READWRITE = 0x04
+FILE_MAP_WRITE = 0x0002
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+PW_RENDERFULLCONTENT = 0x00000002
+
+# GetMonitorInfo() and GetDpiForMonitor() constants:
+MONITORINFOF_PRIMARY = 0x1
+MDT_EFFECTIVE_DPI = 0
+LOGPIXELSX = 88
 
 # This ctypes structure is for a Win32 POINT structure,
 # which is documented here: http://msdn.microsoft.com/en-us/library/windows/desktop/dd162805(v=vs.85).aspx
@@ -33,11 +87,23 @@ class POINT(ctypes.Structure):
     _fields_ = [("x", ctypes.c_long),
                 ("y", ctypes.c_long)]
 
-enumWindows = ctypes.windll.user32.EnumWindows
-enumWindowsProc = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
-getWindowText = ctypes.windll.user32.GetWindowTextW
-getWindowTextLength = ctypes.windll.user32.GetWindowTextLengthW
-isWindowVisible = ctypes.windll.user32.IsWindowVisible
+class WINDOWPLACEMENT(ctypes.Structure):
+    """The WINDOWPLACEMENT structure used by GetWindowPlacement().
+
+    Microsoft Documentation:
+    https://docs.microsoft.com/en-us/windows/desktop/api/winuser/ns-winuser-windowplacement
+    """
+    _fields_ = [('length', ctypes.c_uint),
+                ('flags', ctypes.c_uint),
+                ('showCmd', ctypes.c_uint),
+                ('ptMinPosition', POINT),
+                ('ptMaxPosition', POINT),
+                ('rcNormalPosition', ctypes.c_long * 4)]
+
+# The EnumWindows() callback type. Created by _enumWindowHandles() on first
+# use; user32 functions are likewise looked up through ctypes.windll when
+# they are called, so importing this module makes no native calls.
+enumWindowsProc = None
 
 
 class RECT(ctypes.Structure):
@@ -52,20 +118,31 @@ class RECT(ctypes.Structure):
                 ('bottom', ctypes.c_long)]
 
 
-def _getAllTitles():
-    # This code taken from https://sjohannes.wordpress.com/2012/03/23/win32-python-getting-all-window-titles/
-    # A correction to this code (for enumWindowsProc) is here: http://makble.com/the-story-of-lpclong
-    titles = []
-    def foreach_window(hWnd, lParam):
-        if isWindowVisible(hWnd):
-            length = getWindowTextLength(hWnd)
-            buff = ctypes.create_unicode_buffer(length + 1)
-            getWindowText(hWnd, buff, length + 1)
-            titles.append((hWnd, buff.value))
-        return True
-    enumWindows(enumWindowsProc(foreach_window), 0)
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [('biSize', wintypes.DWORD),
+                ('biWidth', wintypes.LONG),
+                ('biHeight', wintypes.LONG),
+                ('biPlanes', wintypes.WORD),
+                ('biBitCount', wintypes.WORD),
+                ('biCompression', wintypes.DWORD),
+                ('biSizeImage', wintypes.DWORD),
+                ('biXPelsPerMeter', wintypes.LONG),
+                ('biYPelsPerMeter', wintypes.LONG),
+                ('biClrUsed', wintypes.DWORD),
+                ('biClrImportant', wintypes.DWORD)]
+
 
-    return titles
+class MONITORINFOEXW(ctypes.Structure):
+    """The MONITORINFOEXW structure used by GetMonitorInfoW().
+
+    Microsoft Documentation:
+    https://docs.microsoft.com/en-us/windows/desktop/api/winuser/ns-winuser-monitorinfoexw
+    """
+    _fields_ = [('cbSize', wintypes.DWORD),
+                ('rcMonitor', RECT),
+                ('rcWork', RECT),
+                ('dwFlags', wintypes.DWORD),
+                ('szDevice', wintypes.WCHAR * 32)]
 
 
 def _formatMessage(errorCode):
@@ -99,210 +176,565 @@ def _raiseWithLastError():
     raise PyGetWindowException('Error code from Windows: %s - %s' % (errorCode, _formatMessage(errorCode)))
 
 
-def getActiveWindow():
-    """Returns a Window object of the currently active (focused) Window."""
-    hWnd = ctypes.windll.user32.GetForegroundWindow()
-    if hWnd == 0:
-        # TODO - raise error instead
-        return None # Note that this function doesn't use GetLastError().
-    else:
-        return Win32Window(hWnd)
-
-
-def getActiveWindowTitle():
-    """Returns a string of the title text of the currently active (focused) Window."""
-    # NOTE - This function isn't threadsafe because it relies on a global variable. I don't use nonlocal because I want this to work on Python 2.
-
-    global activeWindowTitle
-    activeWindowHwnd = ctypes.windll.user32.GetForegroundWindow()
-    if activeWindowHwnd == 0:
-        # TODO - raise error instead
-        return None # Note that this function doesn't use GetLastError().
+# The following "primitive" functions are the small set of native calls that
+# platform-independent code (such as pygetwindow.getSnapshot()) is built on.
+# They take and return plain handles, so no Win32Window objects are created.
 
+def _enumWindowHandles():
+    """Returns a list of the hWnds of all visible top-level windows, in z-order."""
+    # This code taken from https://sjohannes.wordpress.com/2012/03/23/win32-python-getting-all-window-titles/
+    # A correction to this code (for enumWindowsProc) is here: http://makble.com/the-story-of-lpclong
+    global enumWindowsProc
+    if enumWindowsProc is None:
+        enumWindowsProc = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
+    isWindowVisible = ctypes.windll.user32.IsWindowVisible
+    hWnds = []
     def foreach_window(hWnd, lParam):
-        global activeWindowTitle
-        if hWnd == activeWindowHwnd:
-            length = getWindowTextLength(hWnd)
-            buff = ctypes.create_unicode_buffer(length + 1)
-            getWindowText(hWnd, buff, length + 1)
-            activeWindowTitle =  buff.value
+        if isWindowVisible(hWnd) != 0:
+            hWnds.append(hWnd)
         return True
-    enumWindows(enumWindowsProc(foreach_window), 0)
+    ctypes.windll.user32.EnumWindows(enumWindowsProc(foreach_window), 0)
+    return hWnds
+
+
+def _enumChildHandles(hWnd):
+    """Returns a list of the hWnds of the window's direct children, topmost
+    first. This follows GetWindow(GW_CHILD) and GetWindow(GW_HWNDNEXT)
+    rather than calling EnumChildWindows(), which would walk every
+    descendant instead of just the one level."""
+    getWindow = ctypes.windll.user32.GetWindow
+    hWnds = []
+    seen = set() # Guards against looping if the children are reordered during the walk.
+    child = getWindow(hWnd, GW_CHILD)
+    while child and child not in seen:
+        hWnds.append(child)
+        seen.add(child)
+        child = getWindow(child, GW_HWNDNEXT)
+    return hWnds
+
+
+def _getActiveWindowHandle():
+    """Returns the hWnd of the foreground window, or ``None`` if there isn't one."""
+    hWnd = ctypes.windll.user32.GetForegroundWindow()
+    return hWnd if hWnd != 0 else None
 
-    return activeWindowTitle
 
+def _getWindowRect(hWnd):
+    """A nice wrapper for GetWindowRect(). Returns a Rect of the window's
+    position in screen coordinates.
 
-def getWindowsAt(x, y):
-    """Returns a list of Window objects whose windows contain the point ``(x, y)``.
+    Syntax:
+    BOOL GetWindowRect(
+      HWND   hWnd,
+      LPRECT lpRect
+    );
 
-    * ``x`` (int, optional): The x position of the window(s).
-    * ``y`` (int, optional): The y position of the window(s)."""
-    windowsAtXY = []
-    for window in getAllWindows():
-        if pointInRect(x, y, window.left, window.top, window.width, window.height):
-            windowsAtXY.append(window)
-    return windowsAtXY
+    Microsoft Documentation:
+    https://docs.microsoft.com/en-us/windows/desktop/api/winuser/nf-winuser-getwindowrect
+    """
+    rect = RECT()
+    result = ctypes.windll.user32.GetWindowRect(hWnd, ctypes.byref(rect))
+    if result != 0:
+        return Rect(rect.left, rect.top, rect.right, rect.bottom)
+    else:
+        _raiseWithLastError()
 
 
-def getWindowsWithTitle(title):
-    """Returns a list of Window objects that substring match ``title`` in their title text."""
-    hWndsAndTitles = _getAllTitles()
-    windowObjs = []
-    for hWnd, winTitle in hWndsAndTitles:
-        if title.upper() in winTitle.upper(): # do a case-insensitive match
-            windowObjs.append(Win32Window(hWnd))
-    return windowObjs
+def _getWindowTitle(hWnd):
+    """Returns the title text of the window as a string."""
+    textLenInCharacters = ctypes.windll.user32.GetWindowTextLengthW(hWnd)
+    stringBuffer = ctypes.create_unicode_buffer(textLenInCharacters + 1) # +1 for the \0 at the end of the null-terminated string.
+    ctypes.windll.user32.GetWindowTextW(hWnd, stringBuffer, textLenInCharacters + 1)
 
+    # TODO it's ambiguous if an error happened or the title text is just empty. Look into this later.
+    return stringBuffer.value
 
-def getAllTitles():
-    """Returns a list of strings of window titles for all visible windows.
-    """
-    return [window.title for window in getAllWindows()]
 
+def _getWindowClass(hWnd):
+    """Returns the window's class name, from GetClassNameW()."""
+    stringBuffer = ctypes.create_unicode_buffer(257) # Class names are at most 256 characters.
+    if ctypes.windll.user32.GetClassNameW(hWnd, stringBuffer, len(stringBuffer)) == 0:
+        _raiseWithLastError()
+    return stringBuffer.value
 
-def getAllWindows():
-    """Returns a list of Window objects for all visible windows.
-    """
-    windowObjs = []
-    def foreach_window(hWnd, lParam):
-        if ctypes.windll.user32.IsWindowVisible(hWnd) != 0:
-            windowObjs.append(Win32Window(hWnd))
-        return True
-    enumWindows(enumWindowsProc(foreach_window), 0)
 
-    return windowObjs
+def _getWindowFlags(hWnd):
+    """Returns the STATE_VISIBLE, STATE_MINIMIZED, and STATE_MAXIMIZED bits
+    for the window. (STATE_ACTIVE is left to the caller, since it only
+    needs one GetForegroundWindow() call for all windows.)
 
+    GetWindowPlacement() reports both the minimized and maximized state, so
+    this takes two calls instead of IsWindowVisible(), IsIconic(), and IsZoomed()."""
+    flags = 0
+    if ctypes.windll.user32.IsWindowVisible(hWnd) != 0:
+        flags |= STATE_VISIBLE
 
-class Win32Window(BaseWindow):
-    def __init__(self, hWnd):
-        self._hWnd = hWnd # TODO fix this, this is a LP_c_long insead of an int.
-        self._setupRectProperties()
+    placement = WINDOWPLACEMENT()
+    placement.length = ctypes.sizeof(WINDOWPLACEMENT)
+    if ctypes.windll.user32.GetWindowPlacement(hWnd, ctypes.byref(placement)) == 0:
+        _raiseWithLastError()
+    if placement.showCmd == SW_SHOWMINIMIZED:
+        flags |= STATE_MINIMIZED
+    elif placement.showCmd == SW_SHOWMAXIMIZED:
+        flags |= STATE_MAXIMIZED
+    return flags
 
 
-    def _getWindowRect(self):
-        """A nice wrapper for GetWindowRect(). TODO
+def _getWindowState(hWnd):
+    """Returns a (Rect, flags) tuple of the window's geometry and its
+    _getWindowFlags() bits."""
+    return _getWindowRect(hWnd), _getWindowFlags(hWnd)
 
-        Syntax:
-        BOOL GetWindowRect(
-          HWND   hWnd,
-          LPRECT lpRect
-        );
 
-        Microsoft Documentation:
-        https://docs.microsoft.com/en-us/windows/desktop/api/winuser/nf-winuser-getwindowrect
-        """
-        rect = RECT()
-        result = ctypes.windll.user32.GetWindowRect(self._hWnd, ctypes.byref(rect))
-        if result != 0:
-            return Rect(rect.left, rect.top, rect.right, rect.bottom)
-        else:
-            _raiseWithLastError()
+# Maps the commands used by _showWindow() to ShowWindow()'s nCmdShow values.
+_SHOW_COMMANDS = {'minimize': SW_MINIMIZE,
+                  'maximize': SW_MAXIMIZE,
+                  'restore': SW_RESTORE,
+                  'show': SW_SHOW,
+                  'hide': SW_HIDE}
 
 
-    def __repr__(self):
-        return '%s(hWnd=%s)' % (self.__class__.__name__, self._hWnd)
+def _setWindowGeometry(hWnd, left, top, width, height):
+    """Moves and resizes the window with a single SetWindowPos() call."""
+    result = ctypes.windll.user32.SetWindowPos(hWnd, HWND_TOP, left, top, width, height, 0)
+    if result == 0:
+        _raiseWithLastError()
 
 
-    def __eq__(self, other):
-        return isinstance(other, Win32Window) and self._hWnd == other._hWnd
+def _showWindow(hWnd, command):
+    """Calls ShowWindow() with the nCmdShow value for ``command``, which is
+    one of ``'minimize'``, ``'maximize'``, ``'restore'``, ``'show'``, or ``'hide'``."""
+    ctypes.windll.user32.ShowWindow(hWnd, _SHOW_COMMANDS[command])
 
 
-    def close(self):
-        """Closes this window. This may trigger "Are you sure you want to
-        quit?" dialogs or other actions that prevent the window from
-        actually closing. This is identical to clicking the X button on the
-        window."""
-        result = ctypes.windll.user32.PostMessageA(self._hWnd, WM_CLOSE, 0, 0)
-        if result == 0:
-            _raiseWithLastError()
+def _setWindowZOrder(hWnd, position):
+    """Moves the window to the top or bottom of the z-order (``position`` is
+    ``'top'`` or ``'bottom'``) without moving, resizing, or activating it."""
+    if position not in ('top', 'bottom'):
+        raise PyGetWindowException('Unknown z-order position: %r' % (position))
+    result = ctypes.windll.user32.SetWindowPos(hWnd, HWND_TOP if position == 'top' else HWND_BOTTOM, 0, 0, 0, 0,
+                                               SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE)
+    if result == 0:
+        _raiseWithLastError()
 
 
-    def minimize(self):
-        """Minimizes this window."""
-        ctypes.windll.user32.ShowWindow(self._hWnd, SW_MINIMIZE)
+def _activateWindow(hWnd):
+    """Makes the window the foreground window with SetForegroundWindow()."""
+    result = ctypes.windll.user32.SetForegroundWindow(hWnd)
+    if result == 0:
+        _raiseWithLastError()
 
 
-    def maximize(self):
-        """Maximizes this window."""
-        ctypes.windll.user32.ShowWindow(self._hWnd, SW_MAXIMIZE)
+def _closeWindow(hWnd):
+    """Posts a WM_CLOSE message to the window."""
+    result = ctypes.windll.user32.PostMessageA(hWnd, WM_CLOSE, 0, 0)
+    if result == 0:
+        _raiseWithLastError()
 
 
-    def restore(self):
-        """If maximized or minimized, restores the window to it's normal size."""
-        ctypes.windll.user32.ShowWindow(self._hWnd, SW_RESTORE)
-        
-    def show(self):
-        """If hidden or showing, shows the window on screen and in title bar."""
-        ctypes.windll.user32.ShowWindow(self._hWnd,SW_SHOW)
+def _enumMonitors():
+    """Returns a list of Monitors, using EnumDisplayMonitors() and GetMonitorInfoW().
 
-    def hide(self):
-        """If hidden or showing, hides the window from screen and title bar."""
-        ctypes.windll.user32.ShowWindow(self._hWnd,SW_HIDE)
+    Microsoft Documentation:
+    https://docs.microsoft.com/en-us/windows/desktop/api/winuser/nf-winuser-enumdisplaymonitors
+    """
+    from pygetwindow._monitors import Monitor
 
-    def activate(self):
-        """Activate this window and make it the foreground (focused) window."""
-        result = ctypes.windll.user32.SetForegroundWindow(self._hWnd)
-        if result == 0:
+    monitorEnumProc = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(RECT), wintypes.LPARAM)
+    hMonitors = []
+    def foreach_monitor(hMonitor, hdc, rect, lParam):
+        hMonitors.append(hMonitor)
+        return True
+    if ctypes.windll.user32.EnumDisplayMonitors(None, None, monitorEnumProc(foreach_monitor), 0) == 0:
+        _raiseWithLastError()
+
+    monitors = []
+    for hMonitor in hMonitors:
+        info = MONITORINFOEXW()
+        info.cbSize = ctypes.sizeof(MONITORINFOEXW)
+        if ctypes.windll.user32.GetMonitorInfoW(wintypes.HMONITOR(hMonitor), ctypes.byref(info)) == 0:
             _raiseWithLastError()
+        r, w = info.rcMonitor, info.rcWork
+        monitors.append(Monitor(hMonitor, info.szDevice,
+                                Rect(r.left, r.top, r.right, r.bottom), Rect(w.left, w.top, w.right, w.bottom),
+                                _getMonitorDpi(hMonitor), bool(info.dwFlags & MONITORINFOF_PRIMARY)))
+    return monitors
 
 
-    def resize(self, widthOffset, heightOffset):
-        """Resizes the window relative to its current size."""
-        result = ctypes.windll.user32.SetWindowPos(self._hWnd, HWND_TOP, self.left, self.top, self.width + widthOffset, self.height + heightOffset, 0)
-        if result == 0:
-            _raiseWithLastError()
-    resizeRel = resize # resizeRel is an alias for the resize() method.
+def _getMonitorDpi(hMonitor):
+    """Returns the effective DPI of the monitor from GetDpiForMonitor(), or
+    the system DPI on versions of Windows before 8.1, which don't have it."""
+    dpiX, dpiY = wintypes.UINT(), wintypes.UINT()
+    try:
+        if ctypes.windll.shcore.GetDpiForMonitor(wintypes.HMONITOR(hMonitor), MDT_EFFECTIVE_DPI, ctypes.byref(dpiX), ctypes.byref(dpiY)) == 0:
+            return dpiX.value
+    except (OSError, AttributeError):
+        pass
+    hdc = ctypes.windll.user32.GetDC(None)
+    try:
+        return ctypes.windll.gdi32.GetDeviceCaps(hdc, LOGPIXELSX)
+    finally:
+        ctypes.windll.user32.ReleaseDC(None, hdc)
+
+
+# Display changes are counted by a hidden window on a background thread,
+# which receives the WM_DISPLAYCHANGE and WM_SETTINGCHANGE messages that are
+# broadcast to every top-level window. (Message-only windows don't receive
+# broadcasts.) The thread is started by the first _getDisplayGeneration() call.
+_displayGeneration = 0
+_displayWatcher = None
+_displayWatcherLock = threading.Lock()
+
+
+def _getDisplayGeneration():
+    """Returns a number that changes each time the monitor layout, a work
+    area, or a DPI setting changes, or ``None`` if changes can't be watched."""
+    global _displayWatcher
+    with _displayWatcherLock:
+        if _displayWatcher is None:
+            ready = threading.Event()
+            _displayWatcher = threading.Thread(target=_watchDisplayChanges, args=(ready,), name='pygetwindow display watcher')
+            _displayWatcher.daemon = True
+            _displayWatcher.failed = False
+            _displayWatcher.start()
+            ready.wait(5)
+    if _displayWatcher.failed or not _displayWatcher.is_alive():
+        return None
+    return _displayGeneration
+
+
+def _watchDisplayChanges(ready):
+    # Runs on the display watcher thread. Private prototypes are used (rather
+    # than setting argtypes on ctypes.windll.user32's shared function objects)
+    # so that other ctypes users in the process aren't affected.
+    LRESULT = ctypes.c_ssize_t
+    WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+    class WNDCLASSW(ctypes.Structure):
+        _fields_ = [('style', wintypes.UINT),
+                    ('lpfnWndProc', WNDPROC),
+                    ('cbClsExtra', ctypes.c_int),
+                    ('cbWndExtra', ctypes.c_int),
+                    ('hInstance', wintypes.HINSTANCE),
+                    ('hIcon', wintypes.HICON),
+                    ('hCursor', wintypes.HANDLE),
+                    ('hbrBackground', wintypes.HBRUSH),
+                    ('lpszMenuName', wintypes.LPCWSTR),
+                    ('lpszClassName', wintypes.LPCWSTR)]
+
+    user32, kernel32 = ctypes.windll.user32, ctypes.windll.kernel32
+    defWindowProc = WNDPROC(('DefWindowProcW', user32))
+    getModuleHandle = ctypes.WINFUNCTYPE(wintypes.HMODULE, wintypes.LPCWSTR)(('GetModuleHandleW', kernel32))
+    registerClass = ctypes.WINFUNCTYPE(wintypes.ATOM, ctypes.POINTER(WNDCLASSW))(('RegisterClassW', user32))
+    createWindowEx = ctypes.WINFUNCTYPE(wintypes.HWND, wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+                                        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.HWND,
+                                        wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID)(('CreateWindowExW', user32))
+    getMessage = ctypes.WINFUNCTYPE(wintypes.BOOL, ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT)(('GetMessageW', user32))
+    dispatchMessage = ctypes.WINFUNCTYPE(LRESULT, ctypes.POINTER(wintypes.MSG))(('DispatchMessageW', user32))
+
+    def windowProc(hWnd, message, wParam, lParam):
+        global _displayGeneration
+        if message in (WM_DISPLAYCHANGE, WM_DPICHANGED) or (message == WM_SETTINGCHANGE and wParam == SPI_SETWORKAREA):
+            _displayGeneration += 1
+        return defWindowProc(hWnd, message, wParam, lParam)
 
-    def resizeTo(self, newWidth, newHeight):
-        """Resizes the window to a new width and height."""
-        result = ctypes.windll.user32.SetWindowPos(self._hWnd, HWND_TOP, self.left, self.top, newWidth, newHeight, 0)
-        if result == 0:
-            _raiseWithLastError()
+    try:
+        windowClass = WNDCLASSW()
+        windowClass.lpfnWndProc = WNDPROC(windowProc)
+        windowClass.hInstance = getModuleHandle(None)
+        windowClass.lpszClassName = 'PyGetWindowDisplayWatcher'
+        if not registerClass(ctypes.byref(windowClass)) or not createWindowEx(
+                0, windowClass.lpszClassName, windowClass.lpszClassName, 0, 0, 0, 0, 0, None, None, windowClass.hInstance, None):
+            threading.current_thread().failed = True
+    except Exception:
+        threading.current_thread().failed = True
+    ready.set()
+    if threading.current_thread().failed:
+        return
+
+    msg = wintypes.MSG()
+    while getMessage(ctypes.byref(msg), None, 0, 0) > 0:
+        dispatchMessage(ctypes.byref(msg))
+
+
+def _watchWindowEvents(callback):
+    """Calls ``callback(event, hWnd, timestamp)`` from a background thread
+    each time a window event happens, until the returned function is called.
+    ``event`` is ``'activated'`` when a window becomes the foreground window,
+    ``'created'`` when a top-level window that wasn't visible when watching
+    started is shown for the first time, and ``'destroyed'`` when one of
+    those windows (or a window that was visible) is destroyed. ``'moved'``
+    means one of them was moved, resized, minimized, or restored. The events
+    come from out-of-context SetWinEventHook() hooks, which need their own
+    thread with a message loop."""
+    ready = threading.Event()
+    watcher = threading.Thread(target=_watchWinEvents, args=(callback, ready), name='pygetwindow event watcher')
+    watcher.daemon = True
+    watcher.failed = False
+    watcher.threadId = None
+    watcher.start()
+    ready.wait(5)
+    if watcher.failed or watcher.threadId is None:
+        raise PyGetWindowException('Could not install the window event hook.')
+
+    def stop():
+        ctypes.windll.user32.PostThreadMessageW(watcher.threadId, WM_QUIT, 0, 0)
+        watcher.join()
+    return stop
+
+
+def _watchWinEvents(callback, ready):
+    # Runs on an event watcher thread. The hook's callbacks are delivered
+    # through this thread's message loop.
+    WINEVENTPROC = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG,
+                                      wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+    user32 = ctypes.windll.user32
+    setWinEventHook = ctypes.WINFUNCTYPE(wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WINEVENTPROC,
+                                         wintypes.DWORD, wintypes.DWORD, wintypes.DWORD)(('SetWinEventHook', user32))
+    unhookWinEvent = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HANDLE)(('UnhookWinEvent', user32))
+    getMessage = ctypes.WINFUNCTYPE(wintypes.BOOL, ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT)(('GetMessageW', user32))
+    dispatchMessage = ctypes.WINFUNCTYPE(ctypes.c_ssize_t, ctypes.POINTER(wintypes.MSG))(('DispatchMessageW', user32))
+
+    seen = set(_enumWindowHandles()) # The top-level windows that have been reported, or that were already visible.
+
+    def eventProc(hWinEventHook, event, hWnd, idObject, idChild, eventThread, eventTime):
+        if idObject != OBJID_WINDOW or idChild != CHILDID_SELF or not hWnd:
+            return
+        if event == EVENT_SYSTEM_FOREGROUND:
+            callback('activated', hWnd, time.time())
+        elif event == EVENT_OBJECT_SHOW:
+            if hWnd not in seen and user32.GetAncestor(hWnd, GA_ROOT) == hWnd:
+                seen.add(hWnd)
+                callback('created', hWnd, time.time())
+        elif event == EVENT_OBJECT_DESTROY and hWnd in seen:
+            seen.discard(hWnd)
+            callback('destroyed', hWnd, time.time())
+        elif event in (EVENT_OBJECT_LOCATIONCHANGE, EVENT_SYSTEM_MINIMIZESTART, EVENT_SYSTEM_MINIMIZEEND) and hWnd in seen:
+            callback('moved', hWnd, time.time())
+
+    thread = threading.current_thread()
+    eventProc = WINEVENTPROC(eventProc) # Keep a reference for as long as the hooks are installed.
+    hooks = [setWinEventHook(EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None, eventProc, 0, 0, WINEVENT_OUTOFCONTEXT),
+             setWinEventHook(EVENT_SYSTEM_MINIMIZESTART, EVENT_SYSTEM_MINIMIZEEND, None, eventProc, 0, 0, WINEVENT_OUTOFCONTEXT),
+             setWinEventHook(EVENT_OBJECT_DESTROY, EVENT_OBJECT_SHOW, None, eventProc, 0, 0, WINEVENT_OUTOFCONTEXT),
+             setWinEventHook(EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_LOCATIONCHANGE, None, eventProc, 0, 0, WINEVENT_OUTOFCONTEXT)]
+    if not all(hooks):
+        for hook in hooks:
+            if hook:
+                unhookWinEvent(hook)
+        thread.failed = True
+        ready.set()
+        return
+    msg = wintypes.MSG()
+    user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, 0) # Creates this thread's message queue for PostThreadMessageW().
+    thread.threadId = ctypes.windll.kernel32.GetCurrentThreadId()
+    ready.set()
+    try:
+        while getMessage(ctypes.byref(msg), None, 0, 0) > 0:
+            dispatchMessage(ctypes.byref(msg))
+    finally:
+        for hook in hooks:
+            unhookWinEvent(hook)
+
+
+def _getWindowPid(hWnd):
+    """Returns the ID of the process that created the window, from
+    GetWindowThreadProcessId(), or ``None`` if the window doesn't exist."""
+    pid = wintypes.DWORD()
+    ctypes.windll.user32.GetWindowThreadProcessId(hWnd, ctypes.byref(pid))
+    return pid.value or None
+
+
+# Maps pid -> (executable path, process handle), least recently used first.
+# Holding the process handle open stops Windows from reusing the PID, and the
+# handle becomes signaled when the process exits, which is when the entry is
+# dropped. Only the _MAX_PROCESS_PATHS most recently used entries are kept,
+# so that the handles of processes that are never asked about again are closed.
+_MAX_PROCESS_PATHS = 256
+_processPaths = collections.OrderedDict()
+_processPathsLock = threading.Lock()
+
+
+def _dropProcessPath(pid):
+    path, hProcess = _processPaths.pop(pid)
+    ctypes.windll.kernel32.CloseHandle(wintypes.HANDLE(hProcess))
+
+
+def _getProcessPath(pid):
+    """Returns the full path of the process's executable, from
+    QueryFullProcessImageNameW(), or ``None`` if it can't be opened."""
+    kernel32 = ctypes.windll.kernel32
+    with _processPathsLock:
+        entry = _processPaths.get(pid)
+        if entry is not None:
+            path, hProcess = entry
+            if kernel32.WaitForSingleObject(wintypes.HANDLE(hProcess), 0) != WAIT_OBJECT_0:
+                _processPaths[pid] = _processPaths.pop(pid) # Now the most recently used.
+                return path
+            _dropProcessPath(pid) # The process has exited.
+
+        openProcess = ctypes.WINFUNCTYPE(wintypes.HANDLE, wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)(('OpenProcess', kernel32))
+        hProcess = openProcess(PROCESS_QUERY_LIMITED_INFORMATION | SYNCHRONIZE, False, pid)
+        if not hProcess:
+            return None
+        stringBuffer = ctypes.create_unicode_buffer(32768)
+        size = wintypes.DWORD(len(stringBuffer))
+        if kernel32.QueryFullProcessImageNameW(wintypes.HANDLE(hProcess), 0, stringBuffer, ctypes.byref(size)) == 0:
+            kernel32.CloseHandle(wintypes.HANDLE(hProcess))
+            return None
+        _processPaths[pid] = (stringBuffer.value, hProcess)
+        while len(_processPaths) > _MAX_PROCESS_PATHS:
+            _dropProcessPath(next(iter(_processPaths)))
+        return stringBuffer.value
 
 
-    def move(self, xOffset, yOffset):
-        """Moves the window relative to its current position."""
-        result = ctypes.windll.user32.SetWindowPos(self._hWnd, HWND_TOP, self.left + xOffset, self.top + yOffset, self.width, self.height, 0)
-        if result == 0:
+class _FileMapping(object):
+    # A section of pagefile-backed memory, mapped into this process. It's
+    # unmapped once nothing uses it: the ctypes arrays returned by view()
+    # (and any memoryviews or NumPy arrays of them) hold a reference to it.
+
+    def __init__(self, size):
+        kernel32 = ctypes.windll.kernel32
+        createFileMapping = ctypes.WINFUNCTYPE(wintypes.HANDLE, wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD, wintypes.DWORD,
+                                               wintypes.DWORD, wintypes.LPCWSTR)(('CreateFileMappingW', kernel32))
+        mapViewOfFile = ctypes.WINFUNCTYPE(wintypes.LPVOID, wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+                                           ctypes.c_size_t)(('MapViewOfFile', kernel32))
+        self.size = size
+        self.address = None
+        self.handle = createFileMapping(wintypes.HANDLE(-1), None, PAGE_READWRITE, size >> 32, size & 0xFFFFFFFF, None)
+        if not self.handle:
+            _raiseWithLastError()
+        self.address = mapViewOfFile(self.handle, FILE_MAP_WRITE, 0, 0, size)
+        if not self.address:
             _raiseWithLastError()
-    moveRel = move # moveRel is an alias for the move() method.
 
-    def moveTo(self, newLeft, newTop):
-        """Moves the window to new coordinates on the screen."""
-        result = ctypes.windll.user32.SetWindowPos(self._hWnd, HWND_TOP, newLeft, newTop, self.width, self.height, 0)
-        if result == 0:
+    def view(self, offset, size):
+        array = (ctypes.c_ubyte * size).from_address(self.address + offset)
+        array.mapping = self
+        return array
+
+    def __del__(self):
+        kernel32 = ctypes.windll.kernel32
+        if self.address:
+            kernel32.UnmapViewOfFile(wintypes.LPVOID(self.address))
+            self.address = None
+        if self.handle:
+            kernel32.CloseHandle(wintypes.HANDLE(self.handle))
+            self.handle = None
+
+
+# Frames start on a 64-byte boundary in a capture session's file mapping.
+_FRAME_ALIGNMENT = 64
+
+
+class _Win32CaptureSession(object):
+    # Captures windows with PrintWindow(), which also works for windows that
+    # are covered by other windows. Each window is drawn into a top-down
+    # 32-bit DIB section whose pixels live in one shared file mapping (a
+    # batch of windows gets one region of it per window), so the pixels are
+    # never copied. The file mapping is reused for every capture and only
+    # replaced when a capture needs more room, and a DIB section is kept for
+    # each layout.
+
+    def __init__(self):
+        gdi32 = ctypes.windll.gdi32
+        self._createCompatibleDC = ctypes.WINFUNCTYPE(wintypes.HDC, wintypes.HDC)(('CreateCompatibleDC', gdi32))
+        self._createDIBSection = ctypes.WINFUNCTYPE(wintypes.HBITMAP, wintypes.HDC, ctypes.POINTER(BITMAPINFOHEADER), wintypes.UINT,
+                                                    ctypes.POINTER(wintypes.LPVOID), wintypes.HANDLE, wintypes.DWORD)(('CreateDIBSection', gdi32))
+        self._selectObject = ctypes.WINFUNCTYPE(wintypes.HGDIOBJ, wintypes.HDC, wintypes.HGDIOBJ)(('SelectObject', gdi32))
+        self._deleteObject = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HGDIOBJ)(('DeleteObject', gdi32))
+        self._printWindow = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.HDC, wintypes.UINT)(('PrintWindow', ctypes.windll.user32))
+        self._dc = self._createCompatibleDC(None)
+        if not self._dc:
             _raiseWithLastError()
+        self._mapping = None
+        self._bitmaps = {} # Maps (offset, width, height) -> HBITMAP.
+
+    def capture(self, hWnds):
+        layouts = []
+        offset = 0
+        for hWnd in hWnds:
+            rect = _getWindowRect(hWnd)
+            width, height = rect.right - rect.left, rect.bottom - rect.top
+            if width <= 0 or height <= 0:
+                raise PyGetWindowException('Window %s has no area to capture.' % (hWnd))
+            layouts.append((hWnd, offset, width, height))
+            offset += -(-(width * height * 4) // _FRAME_ALIGNMENT) * _FRAME_ALIGNMENT
+
+        if self._mapping is None or self._mapping.size < offset:
+            self._deleteBitmaps()
+            self._mapping = _FileMapping(max(offset, 2 * self._mapping.size if self._mapping is not None else 0))
+
+        results = []
+        for hWnd, offset, width, height in layouts:
+            bitmap = self._bitmaps.get((offset, width, height))
+            if bitmap is None:
+                header = BITMAPINFOHEADER()
+                header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+                header.biWidth = width
+                header.biHeight = -height # Negative for a top-down bitmap, with the first row at the top.
+                header.biPlanes = 1
+                header.biBitCount = 32
+                header.biCompression = BI_RGB
+                bits = wintypes.LPVOID()
+                bitmap = self._createDIBSection(self._dc, ctypes.byref(header), DIB_RGB_COLORS, ctypes.byref(bits),
+                                                self._mapping.handle, offset)
+                if not bitmap:
+                    _raiseWithLastError()
+                self._bitmaps[(offset, width, height)] = bitmap
+            previous = self._selectObject(self._dc, bitmap)
+            try:
+                if not self._printWindow(hWnd, self._dc, PW_RENDERFULLCONTENT):
+                    _raiseWithLastError()
+            finally:
+                self._selectObject(self._dc, previous)
+            results.append((self._mapping.view(offset, width * height * 4), width, height))
+        ctypes.windll.gdi32.GdiFlush() # Make sure GDI has finished writing the pixels.
+        return results
+
+    def _deleteBitmaps(self):
+        for bitmap in self._bitmaps.values():
+            self._deleteObject(bitmap)
+        self._bitmaps.clear()
+
+    def close(self):
+        self._deleteBitmaps()
+        self._mapping = None
+        if self._dc:
+            ctypes.windll.gdi32.DeleteDC(wintypes.HDC(self._dc))
+            self._dc = None
 
 
-    @property
-    def isMinimized(self):
-        """Returns ``True`` if the window is currently minimized."""
-        return ctypes.windll.user32.IsIconic(self._hWnd) != 0
+def _openCaptureSession():
+    """Returns an object whose ``capture(hWnds)`` method returns a list of
+    ``(pixels, width, height)`` tuples, where ``pixels`` is a buffer of each
+    window's BGRA pixels. See _Win32CaptureSession."""
+    return _Win32CaptureSession()
 
-    @property
-    def isMaximized(self):
-        """Returns ``True`` if the window is currently maximized."""
-        return ctypes.windll.user32.IsZoomed(self._hWnd) != 0
 
-    @property
-    def isActive(self):
-        """Returns ``True`` if the window is currently the active, foreground window."""
-        return getActiveWindow() == self
+_thisModule = sys.modules[__name__] # This module is the backend that Win32Window objects use by default.
 
-    @property
-    def title(self):
-        """Returns the window title as a string."""
-        textLenInCharacters = ctypes.windll.user32.GetWindowTextLengthW(self._hWnd)
-        stringBuffer = ctypes.create_unicode_buffer(textLenInCharacters + 1) # +1 for the \0 at the end of the null-terminated string.
-        ctypes.windll.user32.GetWindowTextW(self._hWnd, stringBuffer, textLenInCharacters + 1)
 
-        # TODO it's ambiguous if an error happened or the title text is just empty. Look into this later.
-        return stringBuffer.value
+class Win32Window(BaseWindow):
+    def __init__(self, hWnd, backend=None):
+        self._hWnd = hWnd # TODO fix this, this is a LP_c_long insead of an int.
+        self._backend = _thisModule if backend is None else backend
+        self._setupRectProperties()
 
-    @property
-    def visible(self):
-        """Return ``True`` if the window is currently visible."""
-        return isWindowVisible(self._hWnd)
+
+    def show(self):
+        """If hidden or showing, shows the window on screen and in title bar."""
+        self._backend._showWindow(self._hWnd, 'show')
+
+    def hide(self):
+        """If hidden or showing, hides the window from screen and title bar."""
+        self._backend._showWindow(self._hWnd, 'hide')
+
+    resize = BaseWindow.resizeRel # resize is an alias for the resizeRel() method.
+    move = BaseWindow.moveRel # move is an alias for the moveRel() method.
+
+
+Window = Win32Window # The Window class of this backend.
 
 
 def cursor():
@@ -317,6 +749,8 @@ def cursor():
     ctypes.windll.user32.GetCursorPos(ctypes.byref(cursor))
     return Point(x=cursor.x, y=cursor.y)
 
+_getCursorPosition = cursor # The backend primitive for the cursor's position.
+
 
 def resolution():
     """Returns the width and height of the screen as a two-integer tuple.
@@ -325,27 +759,3 @@ def resolution():
       (width, height) tuple of the screen size, in pixels.
     """
     return Size(width=ctypes.windll.user32.GetSystemMetrics(0), height=ctypes.windll.user32.GetSystemMetrics(1))
-
-'''
-def displayWindowsUnderMouse(xOffset=0, yOffset=0):
-    """This function is meant to be run from the command line. It will
-    automatically display the location and RGB of the mouse cursor."""
-    print('Press Ctrl-C to quit.')
-    if xOffset != 0 or yOffset != 0:
-        print('xOffset: %s yOffset: %s' % (xOffset, yOffset))
-    resolution = size()
-    try:
-        while True:
-            # Get and print the mouse coordinates.
-            x, y = position()
-            positionStr = 'X: ' + str(x - xOffset).rjust(4) + ' Y: ' + str(y - yOffset).rjust(4)
-
-            # TODO - display windows under the mouse
-
-            sys.stdout.write(positionStr)
-            sys.stdout.write('\b' * len(positionStr))
-            sys.stdout.flush()
-    except KeyboardInterrupt:
-        sys.stdout.write('\n')
-        sys.stdout.flush()
-'''
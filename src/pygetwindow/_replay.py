@@ -0,0 +1,268 @@
+# Recording and replaying of backend primitive calls.
+#
+# A recording is a text file of JSON lines. The first line is a header
+# object, and every line after it is one primitive call:
+#
+#     [secondsSinceStart, "primitiveName", [args...], result]
+#     [secondsSinceStart, "primitiveName", [args...], null, "error message"]
+#
+# Lines are only ever appended, and each one is flushed as it is written, so
+# a recording of a long session can be inspected (or replayed) while it is
+# still being written. Paths that end with ".gz" are gzip-compressed; those
+# recordings are only complete once the recorder is closed.
+
+import gzip
+import io
+import json
+import threading
+import time
+import sys
+
+import pygetwindow
+from pygetwindow import PyGetWindowException, BaseWindow, Rect, Point, _monitors
+
+
+RECORDING_FORMAT = "pygetwindow-session"
+RECORDING_VERSION = 1
+
+# The primitive functions that a backend provides. See pygetwindow.useBackend().
+_PRIMITIVES = (
+    "_enumWindowHandles",
+    "_getActiveWindowHandle",
+    "_getWindowRect",
+    "_getWindowTitle",
+    "_getWindowFlags",
+    "_getWindowState",
+    "_setWindowGeometry",
+    "_showWindow",
+    "_activateWindow",
+    "_closeWindow",
+    "_enumMonitors",
+    "_getDisplayGeneration",
+    "_enumChildHandles",
+    "_getWindowPid",
+    "_getProcessPath",
+    "_getWindowClass",
+    "_setWindowZOrder",
+    "_getCursorPosition",
+)
+
+# Converts the JSON form of a recorded result back into what the primitive returns.
+_RESULT_TYPES = {
+    "_enumWindowHandles": list,
+    "_enumChildHandles": list,
+    "_getWindowRect": lambda value: Rect(*value),
+    "_getWindowState": lambda value: (Rect(*value[0]), value[1]),
+    "_enumMonitors": lambda value: [_monitors._toMonitor(monitor) for monitor in value],
+    "_getCursorPosition": lambda value: Point(*value),
+}
+
+
+def _openRecording(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return io.open(path, mode, buffering=1, encoding="utf-8")  # Line-buffered, so each line is flushed.
+
+
+class SessionRecorder(object):
+    """Records every primitive call made to a backend, along with its result
+    and a timestamp, to the file at ``path``. Calls are passed through to the
+    wrapped backend (the current backend, if ``backend`` is ``None``), so
+    PyGetWindow keeps working normally while it is being recorded.
+
+    Use it as a context manager to record everything PyGetWindow does inside
+    the ``with`` block::
+
+        with pygetwindow.SessionRecorder('session.jsonl.gz'):
+            pygetwindow.getWindowsWithTitle('Notepad')[0].moveTo(10, 10)
+
+    The recording can be played back with ReplayBackend."""
+
+    def __init__(self, path, backend=None):
+        self._backend = pygetwindow._getBackend() if backend is None else backend
+        self._lock = threading.Lock()
+        self._file = _openRecording(path, "a")
+        self._start = time.time()
+        self._previousBackend = None
+        self._write(
+            {"format": RECORDING_FORMAT, "version": RECORDING_VERSION, "platform": sys.platform, "start": self._start}
+        )
+
+    @property
+    def Window(self):
+        return self._backend.Window
+
+    def __getattr__(self, name):
+        if name not in _PRIMITIVES:
+            raise AttributeError(name)
+        primitive = getattr(self._backend, name)
+
+        def recordedPrimitive(*args):
+            timestamp = round(time.time() - self._start, 6)
+            try:
+                result = primitive(*args)
+            except PyGetWindowException as exc:
+                self._write([timestamp, name, list(args), None, str(exc)])
+                raise
+            self._write([timestamp, name, list(args), result])
+            return result
+
+        return recordedPrimitive
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        """Flushes and closes the recording file."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        self._previousBackend = pygetwindow.useBackend(self)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        pygetwindow.useBackend(self._previousBackend)
+        self.close()
+
+
+class ReplayWindow(BaseWindow):
+    """The Window class used by ReplayBackend."""
+
+    def __init__(self, hWnd, backend):
+        self._hWnd = hWnd
+        self._backend = backend
+        self._setupRectProperties()
+
+
+class ReplayBackend(object):
+    """A backend that answers primitive calls from a SessionRecorder
+    recording, so PyGetWindow can be run (and benchmarked) against a real
+    session's windows on any platform.
+
+    Replay is deterministic: the results recorded for each distinct call
+    (the primitive name and its arguments) are returned in the order they
+    were recorded, and the last one is repeated once they run out. Calls that
+    never appear in the recording raise PyGetWindowException."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._results = {}  # Maps (name, args) to a list of (result, error) tuples.
+        self._positions = {}  # Maps (name, args) to the index of the next result to replay.
+        self._previousBackend = None
+        self.numCalls = 0
+        self.duration = 0.0
+
+        with _openRecording(path, "r") as fileObj:
+            header = json.loads(fileObj.readline() or "null")
+            if not isinstance(header, dict) or header.get("format") != RECORDING_FORMAT:
+                raise PyGetWindowException("%s is not a PyGetWindow session recording." % (path))
+            if header.get("version", 0) > RECORDING_VERSION:
+                raise PyGetWindowException("%s was recorded by a newer version of PyGetWindow." % (path))
+            self.platform = header.get("platform")
+
+            for line in fileObj:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if isinstance(entry, dict):
+                    continue  # A header from a later session appended to the same file.
+                timestamp, name, args, result = entry[:4]
+                error = entry[4] if len(entry) > 4 else None
+                self._results.setdefault((name, _hashable(args)), []).append((result, error))
+                self.numCalls += 1
+                self.duration = max(self.duration, timestamp)
+
+    Window = ReplayWindow
+
+    def rewind(self):
+        """Starts replaying every call's results from the beginning again."""
+        with self._lock:
+            self._positions.clear()
+
+    def _replay(self, name, args):
+        key = (name, args)
+        with self._lock:
+            results = self._results.get(key)
+            if results is None:
+                raise PyGetWindowException("The recording has no %s%r call to replay." % (name, args))
+            position = self._positions.get(key, 0)
+            if position < len(results) - 1:
+                self._positions[key] = position + 1
+        result, error = results[position]
+        if error is not None:
+            raise PyGetWindowException(error)
+        if result is not None and name in _RESULT_TYPES:
+            result = _RESULT_TYPES[name](result)
+        return result
+
+    def _enumWindowHandles(self):
+        return self._replay("_enumWindowHandles", ())
+
+    def _getActiveWindowHandle(self):
+        return self._replay("_getActiveWindowHandle", ())
+
+    def _getWindowRect(self, handle):
+        return self._replay("_getWindowRect", (handle,))
+
+    def _getWindowTitle(self, handle):
+        return self._replay("_getWindowTitle", (handle,))
+
+    def _getWindowFlags(self, handle):
+        return self._replay("_getWindowFlags", (handle,))
+
+    def _getWindowState(self, handle):
+        return self._replay("_getWindowState", (handle,))
+
+    def _setWindowGeometry(self, handle, left, top, width, height):
+        return self._replay("_setWindowGeometry", (handle, left, top, width, height))
+
+    def _showWindow(self, handle, command):
+        return self._replay("_showWindow", (handle, command))
+
+    def _activateWindow(self, handle):
+        return self._replay("_activateWindow", (handle,))
+
+    def _closeWindow(self, handle):
+        return self._replay("_closeWindow", (handle,))
+
+    def _enumMonitors(self):
+        return self._replay("_enumMonitors", ())
+
+    def _getDisplayGeneration(self):
+        return self._replay("_getDisplayGeneration", ())
+
+    def _enumChildHandles(self, handle):
+        return self._replay("_enumChildHandles", (handle,))
+
+    def _getWindowPid(self, handle):
+        return self._replay("_getWindowPid", (handle,))
+
+    def _getProcessPath(self, pid):
+        return self._replay("_getProcessPath", (pid,))
+
+    def _getWindowClass(self, handle):
+        return self._replay("_getWindowClass", (handle,))
+
+    def _setWindowZOrder(self, handle, position):
+        return self._replay("_setWindowZOrder", (handle, position))
+
+    def _getCursorPosition(self):
+        return self._replay("_getCursorPosition", ())
+
+    def __enter__(self):
+        self._previousBackend = pygetwindow.useBackend(self)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        pygetwindow.useBackend(self._previousBackend)
+
+
+def _hashable(value):
+    # JSON turns tuples into lists, so turn them back into tuples for use as dict keys.
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
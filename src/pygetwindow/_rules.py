@@ -0,0 +1,358 @@
+# Window rules: declarative placement of new windows as they are created.
+#
+# All of the rules are compiled into one matcher. Each rule is a bit in an
+# int, and the exact class and process names map to the mask of the rules
+# they satisfy, so those criteria are two dict lookups no matter how many
+# rules there are. The rules that are left are then matched against the
+# title by a single regular expression that is an alternation of their
+# title patterns (compiled once per distinct mask, and cached). Patterns
+# that can't be part of an alternation, such as ones with global inline
+# flags like "(?i)" or group names that another pattern also uses, are
+# searched for on their own instead.
+#
+# Each property is only read from the window if a rule that is still in the
+# running looks at it, so a window that no rule can match costs as few
+# native calls as possible.
+
+import collections
+import re
+import threading
+import time
+
+import pygetwindow
+from pygetwindow import PyGetWindowException
+from pygetwindow._processes import _baseName
+
+
+# ``matches`` is the number of windows the rule was applied to, ``failures``
+# the number of those where applying it raised an error (usually because the
+# window closed first), and ``meanLatency`` and ``maxLatency`` are the
+# seconds from each window's creation event until it had been placed.
+RuleStats = collections.namedtuple("RuleStats", "matches failures meanLatency maxLatency")
+
+# Finds numbered backreferences (and conditionals), whose numbers would be
+# wrong inside the alternation. An escaped backslash before a digit is a
+# false positive, which only means that pattern is searched for on its own.
+_NUMBERED_REFERENCE = re.compile(r"\\[1-9]|\(\?\(\d")
+
+_STATES = ("minimize", "maximize", "restore", "hide")
+_Z_ORDERS = ("top", "bottom")
+
+
+class Rule(object):
+    """A rule for placing windows. Windows match if they meet all of the
+    criteria given:
+
+    * ``title``: a string that appears in the title (case-insensitive).
+    * ``titleRegex``: a regular expression that is searched for in the title
+      (case-insensitive).
+    * ``className``: the window class (case-insensitive), such as
+      ``'Notepad'`` on Windows or ``'firefox'`` on X11 (from WM_CLASS).
+    * ``process``: the name of the process's executable (case-insensitive),
+      such as ``'notepad.exe'``.
+
+    A rule with no criteria matches every window. Matching windows get the
+    actions given:
+
+    * ``position``: an ``(x, y)`` tuple for the window's top-left corner.
+    * ``size``: a ``(width, height)`` tuple.
+    * ``state``: ``'minimize'``, ``'maximize'``, ``'restore'``, or ``'hide'``.
+    * ``zOrder``: ``'top'`` or ``'bottom'``.
+
+    ``name`` is only used to identify the rule in ``repr()``."""
+
+    def __init__(self, title=None, titleRegex=None, className=None, process=None,
+                 position=None, size=None, state=None, zOrder=None, name=None):
+        if title is not None and titleRegex is not None:
+            raise PyGetWindowException("A rule can have a title or a titleRegex, not both.")
+        if state is not None and state not in _STATES:
+            raise PyGetWindowException("state must be one of %s, not %r." % (", ".join(_STATES), state))
+        if zOrder is not None and zOrder not in _Z_ORDERS:
+            raise PyGetWindowException("zOrder must be 'top' or 'bottom', not %r." % (zOrder,))
+        self.title = title
+        self.titleRegex = titleRegex
+        self.className = className
+        self.process = process
+        self.position = None if position is None else tuple(position)
+        self.size = None if size is None else tuple(size)
+        self.state = state
+        self.zOrder = zOrder
+        self.name = name
+
+    def __repr__(self):
+        fields = ("name", "title", "titleRegex", "className", "process", "position", "size", "state", "zOrder")
+        return "%s(%s)" % (self.__class__.__name__,
+                           ", ".join("%s=%r" % (field, getattr(self, field)) for field in fields if getattr(self, field) is not None))
+
+    @property
+    def _titlePattern(self):
+        if self.title is not None:
+            return re.escape(self.title)
+        return self.titleRegex
+
+
+class _Matcher(object):
+    # All of the rules' criteria, compiled into masks and title regexes. See
+    # the top of this file.
+
+    def __init__(self, rules):
+        self.allRules = (1 << len(rules)) - 1
+        self.classMasks, self.anyClass = {}, 0
+        self.processMasks, self.anyProcess = {}, 0
+        self.anyTitle = 0
+        self.titlePatterns = []
+        self.separate = 0  # The rules whose title patterns are searched for on their own.
+        self.separateRegexes = {}  # Maps the index of each of those rules to its compiled pattern.
+        groupNames = set()  # The group names used by the patterns in the alternation.
+        for i, rule in enumerate(rules):
+            bit = 1 << i
+            if rule.className is None:
+                self.anyClass |= bit
+            else:
+                key = rule.className.lower()
+                self.classMasks[key] = self.classMasks.get(key, 0) | bit
+            if rule.process is None:
+                self.anyProcess |= bit
+            else:
+                key = _baseName(rule.process).lower()
+                self.processMasks[key] = self.processMasks.get(key, 0) | bit
+            pattern = rule._titlePattern
+            self.titlePatterns.append(pattern)
+            if pattern is None:
+                self.anyTitle |= bit
+                continue
+            regex = re.compile(pattern, re.IGNORECASE)  # Raises re.error now for a bad pattern, rather than when a window appears.
+            names = set(regex.groupindex)
+            if names & groupNames or any(re.match(r"r\d+$", name) for name in names) or \
+                    _NUMBERED_REFERENCE.search(pattern) or not _canAlternate([(i, pattern)]):
+                self.separate |= bit
+                self.separateRegexes[i] = regex
+            else:
+                groupNames.update(names)
+        alternated = [(i, pattern) for i, pattern in enumerate(self.titlePatterns) if (self.anyTitle | self.separate) >> i & 1 == 0]
+        if not _canAlternate(alternated):
+            # Not expected after the checks above, but searching for each pattern on its own is always correct.
+            for i, pattern in alternated:
+                self.separate |= 1 << i
+                self.separateRegexes[i] = re.compile(pattern, re.IGNORECASE)
+        self._titleRegexes = {}  # Maps a mask of rules to (compiled regex, {group number: rule index}).
+        self._lock = threading.Lock()
+
+    def classMask(self, className):
+        return self.classMasks.get(className.lower(), 0) | self.anyClass
+
+    def processMask(self, processName):
+        return self.processMasks.get((processName or "").lower(), 0) | self.anyProcess
+
+    def titledMask(self, mask):
+        # Returns the rules in ``mask`` whose titles need to be checked: the
+        # ones with a title pattern that come before the first rule in
+        # ``mask`` without one (which matches any title).
+        untitled = mask & self.anyTitle
+        if untitled:
+            mask &= (untitled & -untitled) - 1
+        return mask & ~self.anyTitle
+
+    def firstTitleMatch(self, titled, title):
+        # Returns the index of the first rule in ``titled`` whose title
+        # pattern matches ``title``, or -1.
+        best = self.firstAlternationMatch(titled & ~self.separate, title) if titled & ~self.separate else -1
+        separate = titled & self.separate
+        while separate:
+            i = _lowestBit(separate)
+            if best != -1 and i > best:
+                break
+            if self.separateRegexes[i].search(title):
+                return i
+            separate &= separate - 1
+        return best
+
+    def firstAlternationMatch(self, titled, title):
+        # Like firstTitleMatch(), for rules that aren't searched for
+        # separately. The regex is an alternation of the rules' patterns in
+        # order, tried at every position of the title: at each position it
+        # finds the first rule that matches there, so the lowest of those is
+        # the first rule that matches anywhere.
+        with self._lock:
+            compiled = self._titleRegexes.get(titled)
+            if compiled is None:
+                if len(self._titleRegexes) >= 256:
+                    self._titleRegexes.clear()
+                indexes = [i for i in range(len(self.titlePatterns)) if titled >> i & 1]
+                regex = re.compile(_alternation([(i, self.titlePatterns[i]) for i in indexes]), re.IGNORECASE)
+                compiled = self._titleRegexes[titled] = (regex, dict((regex.groupindex["r%d" % (i)], i) for i in indexes))
+        regex, ruleOfGroup = compiled
+        first = _lowestBit(titled)
+        best = -1
+        for match in regex.finditer(title):
+            # lastindex is the rule's group, since it encloses any groups in the rule's own pattern.
+            i = ruleOfGroup[match.lastindex]
+            if best == -1 or i < best:
+                best = i
+                if i == first:
+                    break
+        return best
+
+    def first(self, mask, title):
+        # Returns the index of the first rule in ``mask`` that matches ``title``, or -1.
+        titled = self.titledMask(mask)
+        untitled = mask & self.anyTitle
+        if titled:
+            i = self.firstTitleMatch(titled, title)
+            if i != -1:
+                return i
+        return _lowestBit(untitled) if untitled else -1
+
+
+def _alternation(patterns):
+    # Returns a lookahead that is an alternation of the (rule index, pattern)
+    # pairs in ``patterns``, each in a group named after its rule.
+    return "(?=%s)" % ("|".join("(?P<r%d>%s)" % (i, pattern) for i, pattern in patterns))
+
+
+def _canAlternate(patterns):
+    # Returns True if the (rule index, pattern) pairs in ``patterns`` can be compiled together by _alternation().
+    try:
+        re.compile(_alternation(patterns), re.IGNORECASE)
+    except re.error:
+        return False
+    return True
+
+
+def _lowestBit(mask):
+    # Returns the index of the lowest set bit, which is the first matching rule.
+    return (mask & -mask).bit_length() - 1
+
+
+class WindowRules(object):
+    """Places windows according to a list of Rules (or of dicts of Rule
+    arguments, such as rules loaded from a JSON file) as soon as they are
+    created. When more than one rule matches a window, the first one is
+    applied. Use ``start()`` (or a ``with`` statement) to start watching
+    for new windows on ``backend`` (the current backend, if it is ``None``)."""
+
+    def __init__(self, rules, backend=None):
+        self.rules = [rule if isinstance(rule, Rule) else Rule(**rule) for rule in rules]
+        self._backend = backend
+        self._matcher = _Matcher(self.rules)
+        self._lock = threading.Lock()
+        self._stopWatching = None
+        self._matches = [0] * len(self.rules)
+        self._failures = [0] * len(self.rules)
+        self._totalLatency = [0.0] * len(self.rules)
+        self._maxLatency = [0.0] * len(self.rules)
+
+    def __repr__(self):
+        return "%s(rules=%s)" % (self.__class__.__name__, len(self.rules))
+
+    def _getBackend(self):
+        return pygetwindow._getBackend() if self._backend is None else self._backend
+
+    def start(self):
+        """Starts applying the rules to windows as they are created. Raises
+        NotImplementedError if the backend can't report window events."""
+        if self._stopWatching is not None:
+            raise PyGetWindowException("The WindowRules have already been started.")
+        backend = self._getBackend()
+        if not hasattr(backend, "_watchWindowEvents"):
+            raise NotImplementedError("%r can't watch for window events." % (backend,))
+        self._stopWatching = backend._watchWindowEvents(self._onEvent)
+        return self
+
+    def stop(self):
+        """Stops watching for new windows."""
+        if self._stopWatching is not None:
+            self._stopWatching()
+            self._stopWatching = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _onEvent(self, event, handle, timestamp):
+        if event == "created":
+            try:
+                self.apply(handle, timestamp)
+            except (PyGetWindowException, re.error):
+                pass  # The window was closed before it could be matched. An error here must not stop the event watcher.
+
+    def match(self, title="", className="", processName=None):
+        """Returns the first Rule that matches a window with these
+        properties, or ``None``. This makes no native calls."""
+        matcher = self._matcher
+        i = matcher.first(matcher.allRules & matcher.classMask(className) & matcher.processMask(processName), title)
+        return None if i == -1 else self.rules[i]
+
+    def apply(self, handle, timestamp=None):
+        """Applies the first matching rule to the window with ``handle`` and
+        returns it, or returns ``None`` if no rule matches. ``timestamp`` is
+        when the window was created, for the latency statistics."""
+        if timestamp is None:
+            timestamp = time.time()
+        backend = self._getBackend()
+        matcher = self._matcher
+        mask = matcher.allRules
+        if matcher.classMasks:
+            mask &= matcher.classMask(backend._getWindowClass(handle))
+        if mask and matcher.processMasks:
+            pid = backend._getWindowPid(handle)
+            path = None if pid is None else backend._getProcessPath(pid)
+            mask &= matcher.processMask(None if path is None else _baseName(path))
+        i = matcher.first(mask, backend._getWindowTitle(handle) if matcher.titledMask(mask) else "")
+        if i == -1:
+            return None
+
+        rule = self.rules[i]
+        try:
+            _applyActions(backend, handle, rule)
+        except PyGetWindowException:
+            with self._lock:
+                self._matches[i] += 1
+                self._failures[i] += 1
+            raise
+        latency = time.time() - timestamp
+        with self._lock:
+            self._matches[i] += 1
+            self._totalLatency[i] += latency
+            self._maxLatency[i] = max(self._maxLatency[i], latency)
+        return rule
+
+    def applyToAll(self):
+        """Applies the rules to every window that exists now, and returns the
+        number of windows that a rule was applied to."""
+        count = 0
+        for handle in self._getBackend()._enumWindowHandles():
+            try:
+                if self.apply(handle) is not None:
+                    count += 1
+            except PyGetWindowException:
+                pass
+        return count
+
+    def stats(self):
+        """Returns a list of RuleStats, one for each rule, in order."""
+        with self._lock:
+            results = []
+            for i in range(len(self.rules)):
+                succeeded = self._matches[i] - self._failures[i]
+                meanLatency = self._totalLatency[i] / succeeded if succeeded else None
+                results.append(RuleStats(self._matches[i], self._failures[i], meanLatency,
+                                         self._maxLatency[i] if succeeded else None))
+            return results
+
+
+def _applyActions(backend, handle, rule):
+    if rule.position is not None or rule.size is not None:
+        if rule.position is None or rule.size is None:
+            rect = backend._getWindowRect(handle)
+        left, top = rule.position if rule.position is not None else (rect.left, rect.top)
+        width, height = rule.size if rule.size is not None else (rect.right - rect.left, rect.bottom - rect.top)
+        # The geometry is set first, so that it becomes the restored geometry
+        # of a window that the rule also maximizes or minimizes.
+        backend._setWindowGeometry(handle, left, top, width, height)
+    if rule.state is not None:
+        backend._showWindow(handle, rule.state)
+    if rule.zOrder is not None:
+        backend._setWindowZOrder(handle, rule.zOrder)
@@ -0,0 +1,573 @@
+# Snapshots record the state of every visible top-level window at one moment
+# in time, so that the window set can be queried and compared without making
+# any more native calls.
+
+import array
+import collections
+import io
+import mmap
+import os
+import struct
+import sys
+import time
+
+import pygetwindow
+from pygetwindow import PyGetWindowException, Rect, STATE_ACTIVE
+
+
+# A single row of a Snapshot. ``rect`` is a Rect named tuple and ``flags`` is
+# a combination of the STATE_* bits.
+WindowRecord = collections.namedtuple("WindowRecord", "handle rect title flags")
+
+# The result of diff(). Each field is a dict keyed by window handle, in the
+# z-order of the snapshot the windows were found in. ``created`` maps to the
+# new WindowRecord, ``destroyed`` maps to the old WindowRecord, and the rest
+# map to (oldRecord, newRecord) tuples.
+SnapshotDiff = collections.namedtuple("SnapshotDiff", "created destroyed moved resized retitled stateChanged")
+
+# The fields that Snapshot.refresh() can read again.
+FIELDS = ("rect", "title", "flags")
+
+# The binary format written by Snapshot.toBytes(). The header (magic, format
+# version, byte order, window count, title blob size, and timestamp) is
+# followed by the columns (handles as int64, rects as int32, flags as uint32,
+# and count + 1 title offsets as uint32) and then the UTF-8 title blob. Title
+# i is blob[offsets[i]:offsets[i + 1]]. Every column starts on an 8-byte
+# boundary, so they can be used in place from an mmap.
+_FORMAT_MAGIC = b"PGWSNAPS"
+_FORMAT_VERSION = 1
+_FORMAT_HEADER = struct.Struct("=8sBBxxIQd")
+
+
+class Snapshot(object):
+    """A columnar record of the visible top-level windows.
+
+    The windows are stored in z-order (the order they were enumerated in)
+    across parallel columns: ``handles`` and ``titles`` are lists, ``rects``
+    is a flat ``array('i')`` of left, top, right, bottom values (four per
+    window), and ``flags`` is an ``array('I')`` of STATE_* bits. Lookups by
+    handle use an index that is built on first use.
+
+    A snapshot never changes, except when ``refresh()`` is called on it to
+    read some of its fields again in place. Snapshots that other threads
+    share (those published by a LiveModel) can't be refreshed: refresh a
+    ``copy()`` of them instead."""
+
+    def __init__(self, handles, rects, titles, flags, timestamp=None):
+        self.handles = list(handles)
+        self.rects = array.array("i", rects)
+        self.titles = list(titles)
+        self.flags = array.array("I", flags)
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+        numWindows = len(self.handles)
+        if len(self.rects) != numWindows * 4 or len(self.titles) != numWindows or len(self.flags) != numWindows:
+            raise PyGetWindowException("Snapshot columns must all describe the same number of windows.")
+
+        self._index = None  # Maps handle -> row number. Built by _getIndex().
+        self._monitorIndex = None  # Which monitor each row is on. Built by _monitors._getMonitorIndex().
+        self._children = {}  # Maps handle -> tuple of child handles, filled in by Window.children().
+        self._pidIndex = None  # Maps pid -> list of rows. Built by _processes._getPidIndex().
+        self._executableIndex = None  # Maps executable name -> list of rows. Built by _processes._getExecutableIndex().
+        self._backend = None  # The backend the snapshot was taken from, for refresh().
+        self._readTimes = {}  # Maps field -> array('d') of when each row's field was last read, once refresh() has changed it.
+        self._dirty = {}  # Maps handle -> set of fields marked by markDirty().
+        self._frozen = False  # Set on snapshots that refresh() must not change.
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __iter__(self):
+        for i in range(len(self.handles)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.handles)
+        return WindowRecord(self.handles[i], self.rect(i), self.titles[i], self.flags[i])
+
+    def __contains__(self, handle):
+        return handle in self._getIndex()
+
+    def __repr__(self):
+        return "%s(windows=%s, timestamp=%s)" % (self.__class__.__name__, len(self.handles), self.timestamp)
+
+    def copy(self):
+        """Returns a new Snapshot with copies of this one's columns, which
+        can be refreshed without changing this one."""
+        snapshot = Snapshot(self.handles, self.rects, self.titles, self.flags, self.timestamp)
+        snapshot._backend = self._backend
+        snapshot._readTimes = dict((field, array.array("d", readTimes)) for field, readTimes in self._readTimes.items())
+        snapshot._dirty = dict((handle, set(fields)) for handle, fields in self._dirty.items())
+        return snapshot
+
+    def rect(self, i):
+        """Returns the Rect of the window in row ``i``."""
+        r = self.rects
+        return Rect(r[i * 4], r[i * 4 + 1], r[i * 4 + 2], r[i * 4 + 3])
+
+    def indexOf(self, handle):
+        """Returns the row number of the window with ``handle``, or ``-1`` if
+        it isn't in this snapshot."""
+        return self._getIndex().get(handle, -1)
+
+    def get(self, handle, default=None):
+        """Returns the WindowRecord for ``handle``, or ``default`` if it isn't
+        in this snapshot."""
+        i = self._getIndex().get(handle)
+        if i is None:
+            return default
+        return self[i]
+
+    def fingerprint(self):
+        """Returns a hash of the handles, z-order, and rects in this snapshot.
+        This is the same value that changeToken() would have returned at the
+        time the snapshot was taken, so the two can be compared to find out if
+        the windows have moved since."""
+        return _hashWindowSet(self.handles, self.rects)
+
+    def toBytes(self):
+        """Returns the snapshot as bytes that ``fromBuffer()`` can read, on
+        this machine or another one. The handles must be integers."""
+        titleBlob = io.BytesIO()
+        titleOffsets = array.array("I", [0])
+        for title in self.titles:
+            titleBlob.write(title.encode("utf-8"))
+            titleOffsets.append(titleBlob.tell())
+        titleBlob = titleBlob.getvalue()
+        try:
+            handles = array.array("q", self.handles)
+        except (TypeError, OverflowError):
+            raise PyGetWindowException("Only snapshots whose handles are 64-bit integers can be written as bytes.")
+
+        out = io.BytesIO()
+        out.write(_FORMAT_HEADER.pack(_FORMAT_MAGIC, _FORMAT_VERSION, _byteOrder(), len(self.handles), len(titleBlob), self.timestamp))
+        for column in (handles, array.array("i", self.rects), array.array("I", self.flags), titleOffsets):
+            out.write(column.tobytes())
+            _pad(out)
+        out.write(titleBlob)
+        return out.getvalue()
+
+    @classmethod
+    def fromBuffer(cls, buffer):
+        """Returns the Snapshot in ``buffer`` (any object that supports the
+        buffer protocol, such as bytes or an mmap) written by ``toBytes()``.
+
+        Nothing is copied: the columns are views of ``buffer``, and each title
+        is decoded when it is read, so loading a snapshot only takes as long
+        as checking its title offsets. (The columns are copied if the
+        snapshot was written on a machine with a different byte order, or
+        when ``refresh()`` is called.) ``buffer`` must not change while the
+        snapshot is in use, and a loaded snapshot is pickled as a copy."""
+        view = memoryview(buffer).cast("B")
+        if len(view) < _FORMAT_HEADER.size:
+            raise PyGetWindowException("The buffer is too short to hold a snapshot.")
+        magic, version, byteOrder, count, titleBlobSize, timestamp = _FORMAT_HEADER.unpack_from(view, 0)
+        if magic != _FORMAT_MAGIC:
+            raise PyGetWindowException("The buffer does not hold a snapshot written by Snapshot.toBytes().")
+        if byteOrder not in (0, 1):
+            raise PyGetWindowException("The snapshot's header is corrupt: %s is not a byte order." % (byteOrder))
+        if version < 1:
+            raise PyGetWindowException("The snapshot's header is corrupt: %s is not a format version." % (version))
+        if version > _FORMAT_VERSION:
+            raise PyGetWindowException("The snapshot uses format version %s, but this version of PyGetWindow only reads up to %s." % (version, _FORMAT_VERSION))
+        if byteOrder != _byteOrder():
+            # The header was unpacked in the wrong byte order, too.
+            magic, version, byteOrder, count, titleBlobSize, timestamp = struct.unpack_from(
+                (">" if sys.byteorder == "little" else "<") + _FORMAT_HEADER.format[1:], view, 0)
+
+        columns, offset = _readColumns(view, _FORMAT_HEADER.size, (("q", count), ("i", count * 4), ("I", count), ("I", count + 1)),
+                                       byteOrder != _byteOrder())
+        if len(view) < offset + titleBlobSize:
+            raise PyGetWindowException("The buffer is too short to hold a snapshot of %s windows." % (count))
+
+        handles, rects, flags, titleOffsets = columns
+        offsets = titleOffsets.tolist()
+        if offsets[0] != 0 or offsets[-1] != titleBlobSize or offsets != sorted(offsets):  # sorted() is quick on sorted lists.
+            raise PyGetWindowException("The snapshot's title offsets are corrupt.")
+
+        snapshot = cls([], [], [], [], timestamp)
+        snapshot.handles = _HandleColumn(handles)
+        snapshot.rects, snapshot.flags = rects, flags
+        snapshot.titles = _TitleColumn(view[offset : offset + titleBlobSize], titleOffsets)
+        return snapshot
+
+    def save(self, path):
+        """Writes the snapshot to a file at ``path`` that ``load()`` can map
+        into memory."""
+        with open(path, "wb") as fileObj:
+            fileObj.write(self.toBytes())
+
+    @classmethod
+    def load(cls, path):
+        """Returns the Snapshot in a file written by ``save()``. The file is
+        memory-mapped, not read: see ``fromBuffer()``."""
+        with open(path, "rb") as fileObj:
+            if os.fstat(fileObj.fileno()).st_size == 0:  # Empty files can't be mapped.
+                raise PyGetWindowException("%s is empty, so it doesn't hold a snapshot." % (path))
+            buffer = mmap.mmap(fileObj.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.fromBuffer(buffer)
+
+    def __reduce__(self):
+        # The columns of a snapshot read by fromBuffer() are views of its
+        # buffer, which can't be pickled, so snapshots are pickled as copies
+        # of their columns and timestamp only.
+        return (Snapshot, (list(self.handles), array.array("i", self.rects), list(self.titles), array.array("I", self.flags), self.timestamp))
+
+    def _makeWritable(self):
+        # Copies columns that are views of a buffer (see fromBuffer()) into
+        # lists and arrays that refresh() can change.
+        if not isinstance(self.rects, array.array):
+            self.handles = list(self.handles)
+            self.rects = array.array("i", self.rects)
+            self.titles = list(self.titles)
+            self.flags = array.array("I", self.flags)
+
+    def markDirty(self, handle, fields=FIELDS):
+        """Marks ``fields`` of the window with ``handle`` as out of date, so
+        that ``refresh(handles='dirty')`` reads them again."""
+        _checkFields(fields)
+        if handle in self._getIndex():
+            self._dirty.setdefault(handle, set()).update(fields)
+
+    def dirty(self):
+        """Returns a list of the handles of the windows marked by
+        ``markDirty()``, in z-order."""
+        return [handle for handle in self.handles if handle in self._dirty]
+
+    def readTime(self, handle, field):
+        """Returns when ``field`` of the window with ``handle`` was last read."""
+        i = self._getIndex()[handle]
+        _checkFields((field,))
+        readTimes = self._readTimes.get(field)
+        return self.timestamp if readTimes is None else readTimes[i]
+
+    def age(self, handle, field, now=None):
+        """Returns how many seconds old ``field`` of the window with
+        ``handle`` is."""
+        return (time.time() if now is None else now) - self.readTime(handle, field)
+
+    def refresh(self, fields=FIELDS, handles=None, backend=None):
+        """Reads ``fields`` (any of ``'rect'``, ``'title'``, and ``'flags'``)
+        again for the windows with ``handles`` (all of them if it is
+        ``None``, or those marked by ``markDirty()`` if it is ``'dirty'``),
+        and updates them in place. Returns a list of the handles of the
+        windows whose fields changed, in z-order.
+
+        Only those fields of those windows are read, from ``backend`` (the
+        backend the snapshot was taken from, if it is ``None``). The set of
+        windows stays the same: windows that have closed keep their old
+        values and stay marked as dirty, and new windows need a new snapshot."""
+        if self._frozen:
+            raise PyGetWindowException("This snapshot is shared between threads and can't be refreshed; refresh a copy() of it instead.")
+        fields = tuple(fields)
+        _checkFields(fields)
+        self._makeWritable()
+        if backend is None:
+            backend = self._backend if self._backend is not None else pygetwindow._getBackend()
+        index = self._getIndex()
+        if handles is None:
+            rows = range(len(self.handles))
+        elif handles == "dirty":
+            rows = [index[handle] for handle in self.dirty()]
+        else:
+            rows = sorted(set(index[handle] for handle in handles if handle in index))
+
+        readRects = "rect" in fields
+        readFlags = "flags" in fields
+        readTitles = "title" in fields
+        activeHandle = backend._getActiveWindowHandle() if readFlags else None
+        for field in fields:
+            if field not in self._readTimes:
+                self._readTimes[field] = array.array("d", [self.timestamp]) * len(self.handles)
+
+        r = self.rects
+        changed = []
+        rectsChanged = False
+        for i in rows:
+            handle = self.handles[i]
+            timestamp = time.time()
+            try:
+                rect = flags = None
+                if readRects and readFlags:
+                    rect, flags = backend._getWindowState(handle)
+                elif readRects:
+                    rect = backend._getWindowRect(handle)
+                elif readFlags:
+                    flags = backend._getWindowFlags(handle)
+                if readFlags and handle == activeHandle:
+                    flags |= STATE_ACTIVE
+                title = backend._getWindowTitle(handle) if readTitles else None
+            except PyGetWindowException:
+                self._dirty.setdefault(handle, set()).update(fields)  # The window has closed.
+                continue
+
+            rowChanged = False
+            if rect is not None and tuple(rect) != tuple(r[i * 4 : i * 4 + 4]):
+                r[i * 4 : i * 4 + 4] = array.array("i", rect)
+                rowChanged = rectsChanged = True
+            if readFlags and flags != self.flags[i]:
+                self.flags[i] = flags
+                rowChanged = True
+            if readTitles and title != self.titles[i]:
+                self.titles[i] = title
+                rowChanged = True
+            for field in fields:
+                self._readTimes[field][i] = timestamp
+            if handle in self._dirty:
+                self._dirty[handle].difference_update(fields)
+                if not self._dirty[handle]:
+                    del self._dirty[handle]
+            if rowChanged:
+                changed.append(handle)
+
+        if rectsChanged:
+            self._monitorIndex = None
+        return changed
+
+    def _getIndex(self):
+        if self._index is None:
+            self._index = dict((handle, i) for i, handle in enumerate(self.handles))
+        return self._index
+
+
+class _Column(object):
+    # A read-only column of a snapshot read by fromBuffer(). It compares
+    # equal to a list (or array, or other column) of the same items, like
+    # the columns of any other snapshot do.
+
+    def __eq__(self, other):
+        if not isinstance(other, (_Column, list, tuple, array.array, memoryview)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self))
+
+
+class _HandleColumn(_Column):
+    # The handles column of a snapshot read by fromBuffer(): a view of the
+    # int64 handles in the buffer.
+
+    def __init__(self, view):
+        self._view = view
+
+    def __len__(self):
+        return len(self._view)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._view[i].tolist()
+        return self._view[i]
+
+    def __iter__(self):
+        return iter(self._view)
+
+
+class _TitleColumn(_Column):
+    # The titles column of a snapshot read by fromBuffer(). Titles are
+    # decoded from the UTF-8 blob each time they are read.
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("title index out of range")
+        return self._blob[self._offsets[i] : self._offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _byteOrder():
+    return 0 if sys.byteorder == "little" else 1
+
+
+def _pad(fileObj):
+    # Pads a file written column by column so that the next column starts on an 8-byte boundary.
+    fileObj.write(b"\0" * (-fileObj.tell() % 8))
+
+
+def _readColumns(view, offset, layout, swap=False):
+    # Returns a list of views of the columns that start at ``offset`` in
+    # ``view`` (a memoryview of bytes), one for each (typecode, length) in
+    # ``layout``, each padded to an 8-byte boundary as _pad() does, and the
+    # offset of whatever follows them. If ``swap`` is true the columns are
+    # copied into arrays in this machine's byte order instead.
+    columns = []
+    for typecode, length in layout:
+        size = struct.calcsize(typecode) * length
+        if len(view) < offset + size:
+            raise PyGetWindowException("The buffer ends in the middle of a column.")
+        column = view[offset : offset + size].cast(typecode)
+        if swap:
+            column = array.array(typecode, column.tobytes())
+            column.byteswap()
+        columns.append(column)
+        offset += size + (-size % 8)
+    return columns, offset
+
+
+def _checkFields(fields):
+    for field in fields:
+        if field not in FIELDS:
+            raise PyGetWindowException("%r is not a snapshot field; the fields are %s." % (field, ", ".join(FIELDS)))
+
+
+def takeSnapshot(backend, workers=None):
+    """Returns a Snapshot of the visible top-level windows, built from the
+    primitive functions of a platform backend module. If ``workers`` is more
+    than ``1``, the windows are read on that many threads at once. Windows
+    that close before they are read are left out."""
+    from pygetwindow._fetch import parallelMap
+
+    timestamp = time.time()
+    handles = backend._enumWindowHandles()
+    activeHandle = backend._getActiveWindowHandle()
+
+    def readRow(handle):
+        try:
+            return backend._getWindowState(handle), backend._getWindowTitle(handle)
+        except PyGetWindowException:
+            return None  # The window has been closed.
+
+    rowHandles = []
+    rects = array.array("i")
+    titles = []
+    flags = array.array("I")
+    for handle, row in zip(handles, parallelMap(readRow, handles, workers)):
+        if row is None:
+            continue
+        (rect, windowFlags), title = row
+        rowHandles.append(handle)
+        rects.extend(rect)
+        titles.append(title)
+        flags.append(windowFlags | STATE_ACTIVE if handle == activeHandle else windowFlags)
+    snapshot = Snapshot(rowHandles, rects, titles, flags, timestamp)
+    snapshot._backend = backend
+    return snapshot
+
+
+def _hashWindowSet(handles, rects):
+    # Hashes of ints (and tuples of ints) don't depend on PYTHONHASHSEED, so
+    # these tokens are stable across processes.
+    return hash((tuple(handles), tuple(rects)))
+
+
+def changeToken(backend):
+    """Returns a hash of the windows the backend enumerates (hidden ones
+    included), their z-order, and their rects. Only handles and rects are
+    read from the backend: no titles are fetched and no window objects are
+    created, so this is much cheaper than takeSnapshot(). Windows that close
+    before their rect is read are left out, as takeSnapshot() leaves them
+    out, so the token still equals the snapshot's fingerprint()."""
+    handles = []
+    rects = array.array("i")
+    for handle in backend._enumWindowHandles():
+        try:
+            rect = backend._getWindowRect(handle)
+        except PyGetWindowException:
+            continue  # The window has closed.
+        handles.append(handle)
+        rects.extend(rect)
+    return _hashWindowSet(handles, rects)
+
+
+def pollUntilChanged(backend, interval=0.1, backoff=1.0, maxInterval=None, timeout=None, token=None):
+    """Polls changeToken() until it differs from ``token`` (or from the
+    token at the time of the call, if ``token`` is ``None``), then returns a
+    new Snapshot. Returns ``None`` if ``timeout`` seconds pass first.
+
+    The delay between polls starts at ``interval`` seconds and is multiplied
+    by ``backoff`` after every poll that sees no change, up to
+    ``maxInterval`` seconds."""
+    if backoff < 1.0:
+        raise PyGetWindowException("backoff must be 1.0 or greater.")
+    if token is None:
+        token = changeToken(backend)
+    if timeout is not None:
+        deadline = time.time() + timeout
+
+    delay = interval
+    while True:
+        if timeout is None:
+            time.sleep(delay)
+        else:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(delay, remaining))
+
+        if changeToken(backend) != token:
+            return takeSnapshot(backend)
+
+        delay *= backoff
+        if maxInterval is not None:
+            delay = min(delay, maxInterval)
+
+
+def diff(oldSnapshot, newSnapshot):
+    """Returns a SnapshotDiff of the windows that were created, destroyed,
+    moved, resized, retitled, or had their state flags change between two
+    snapshots.
+
+    Windows are matched by handle, so this runs in time linear to the number
+    of windows. Records are only made for the windows that changed."""
+    oldIndex = oldSnapshot._getIndex()
+    newIndex = newSnapshot._getIndex()
+    oldRects, oldTitles, oldFlags = oldSnapshot.rects, oldSnapshot.titles, oldSnapshot.flags
+    newRects, newTitles, newFlags = newSnapshot.rects, newSnapshot.titles, newSnapshot.flags
+
+    created = collections.OrderedDict()
+    destroyed = collections.OrderedDict()
+    moved = collections.OrderedDict()
+    resized = collections.OrderedDict()
+    retitled = collections.OrderedDict()
+    stateChanged = collections.OrderedDict()
+
+    for i, handle in enumerate(newSnapshot.handles):
+        j = oldIndex.get(handle)
+        if j is None:
+            created[handle] = newSnapshot[i]
+            continue
+        oldLeft, oldTop, oldRight, oldBottom = oldRects[j * 4 : j * 4 + 4]
+        newLeft, newTop, newRight, newBottom = newRects[i * 4 : i * 4 + 4]
+        wasMoved = oldLeft != newLeft or oldTop != newTop
+        wasResized = oldRight - oldLeft != newRight - newLeft or oldBottom - oldTop != newBottom - newTop
+        wasRetitled = oldTitles[j] != newTitles[i]
+        stateWasChanged = oldFlags[j] != newFlags[i]
+        if not (wasMoved or wasResized or wasRetitled or stateWasChanged):
+            continue
+
+        oldRecord = oldSnapshot[j]
+        newRecord = newSnapshot[i]
+        if wasMoved:
+            moved[handle] = (oldRecord, newRecord)
+        if wasResized:
+            resized[handle] = (oldRecord, newRecord)
+        if wasRetitled:
+            retitled[handle] = (oldRecord, newRecord)
+        if stateWasChanged:
+            stateChanged[handle] = (oldRecord, newRecord)
+
+    for j, handle in enumerate(oldSnapshot.handles):
+        if handle not in newIndex:
+            destroyed[handle] = oldSnapshot[j]
+
+    return SnapshotDiff(created, destroyed, moved, resized, retitled, stateChanged)
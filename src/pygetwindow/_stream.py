@@ -0,0 +1,155 @@
+# GeometryStream: moving a window to a stream of target rects, such as one
+# that follows the mouse cursor, without flooding the window manager.
+#
+# Targets can be set at any rate; each one replaces the one before it if
+# that hasn't been applied yet. A background thread applies the latest
+# target at most ``rate`` times a second, with one _setWindowGeometry() call
+# and no reads: the window's rect is read once when the stream starts, and
+# after that the stream knows where it put the window. Targets that are the
+# same as the last one applied are skipped.
+
+import collections
+import threading
+import time
+
+import pygetwindow
+from pygetwindow import PyGetWindowException
+
+
+# ``received`` is the number of targets set, ``applied`` the number of
+# native writes made, ``dropped`` the number of targets that were replaced by
+# a newer one before they could be applied, and ``skipped`` the number that
+# were already where the window was. ``meanLatency`` and ``maxLatency`` are
+# the seconds from a target being set until its write finished.
+StreamStats = collections.namedtuple("StreamStats", "received applied dropped skipped meanLatency maxLatency")
+
+
+class GeometryStream(object):
+    """Applies a stream of target positions and sizes to ``window`` (a
+    Window object, or a handle on ``backend``), writing at most ``rate``
+    times a second. Call ``set()`` as often as needed; only the latest target
+    is written. Use ``start()`` and ``stop()``, or a ``with`` statement, to
+    write from a background thread, or call ``flush()`` to write now."""
+
+    def __init__(self, window, rate=60, backend=None):
+        if rate <= 0:
+            raise PyGetWindowException("rate must be greater than 0.")
+        if backend is None:
+            backend = getattr(window, "_backend", None) or pygetwindow._getBackend()
+        self._backend = backend
+        self.handle = getattr(window, "_hWnd", window)
+        self.interval = 1.0 / rate
+        self._condition = threading.Condition(threading.Lock())
+        self._writeLock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        self._pending = None  # The latest target not yet written, as (left, top, width, height).
+        self._pendingSince = None  # When the pending target was set.
+        self._current = None  # Where the stream last put the window, as (left, top, width, height).
+        self._lastWrite = None
+
+        self._received = 0
+        self._applied = 0
+        self._dropped = 0
+        self._skipped = 0
+        self._totalLatency = 0.0
+        self._maxLatency = 0.0
+
+    def __repr__(self):
+        return "%s(handle=%r, rate=%s)" % (self.__class__.__name__, self.handle, round(1.0 / self.interval, 3))
+
+    def set(self, left, top, width=None, height=None):
+        """Sets the target position of the window's top-left corner, and
+        its size (if ``width`` and ``height`` are ``None``, it keeps the size
+        it has)."""
+        with self._condition:
+            if (width is None or height is None) and self._current is None and self._pending is None:
+                self._current = self._readGeometry()
+            base = self._pending if self._pending is not None else self._current
+            target = (left, top, base[2] if width is None else width, base[3] if height is None else height)
+            self._received += 1
+            if self._pending is not None:
+                self._dropped += 1
+            else:
+                self._pendingSince = time.time()
+            self._pending = target
+            self._condition.notify()
+
+    def _readGeometry(self):
+        r = self._backend._getWindowRect(self.handle)
+        return (r.left, r.top, r.right - r.left, r.bottom - r.top)
+
+    def flush(self):
+        """Writes the latest target now, if there is one and it moves the
+        window. Returns True if a write was made."""
+        with self._writeLock:
+            with self._condition:
+                target, since = self._pending, self._pendingSince
+                self._pending = self._pendingSince = None
+                if target is None:
+                    return False
+                if target == self._current:
+                    self._skipped += 1
+                    return False
+            self._backend._setWindowGeometry(self.handle, *target)
+            finished = time.time()
+            with self._condition:
+                self._current = target
+                self._lastWrite = finished
+                self._applied += 1
+                latency = finished - since
+                self._totalLatency += latency
+                self._maxLatency = max(self._maxLatency, latency)
+            return True
+
+    def start(self):
+        """Starts writing targets from a background thread."""
+        if self._thread is not None:
+            raise PyGetWindowException("The GeometryStream has already been started.")
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="pygetwindow geometry stream")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the background thread, after writing the latest target."""
+        if self._thread is not None:
+            with self._condition:
+                self._stopping = True
+                self._condition.notify()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                # Wait out the rest of the frame; targets set meanwhile replace this one.
+                if self._lastWrite is not None:
+                    delay = self._lastWrite + self.interval - time.time()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+            try:
+                self.flush()
+            except PyGetWindowException:
+                pass  # The window has closed.
+
+    def stats(self):
+        """Returns a StreamStats tuple of the targets and writes so far."""
+        with self._condition:
+            return StreamStats(self._received, self._applied, self._dropped, self._skipped,
+                               self._totalLatency / self._applied if self._applied else None,
+                               self._maxLatency if self._applied else None)
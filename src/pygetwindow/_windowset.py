@@ -0,0 +1,225 @@
+# WindowSet: geometry queries over the rects of many windows at once.
+#
+# The rects are held as an (N, 4) array of left, top, right, bottom values.
+# When NumPy is installed, the queries are done with array operations;
+# otherwise the same results are computed with plain Python loops (and
+# matrices are returned as lists of lists instead of NumPy arrays).
+
+from pygetwindow import PyGetWindowException, Rect
+
+
+# Maps each direction for neighbor() to the (x, y) unit vector pointing that way.
+_DIRECTIONS = {"left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}
+
+# In neighbor(), how much more an offset across the direction of travel
+# counts than the distance along it.
+_OFF_AXIS_WEIGHT = 2
+
+_numpy = None
+_numpyChecked = False
+
+
+def _getNumPy():
+    # Returns the numpy module, or None if it isn't installed. Importing it is
+    # slow, so this is only done the first time a WindowSet is created.
+    global _numpy, _numpyChecked
+    if not _numpyChecked:
+        try:
+            import numpy as _numpy
+        except ImportError:
+            _numpy = None
+        _numpyChecked = True
+    return _numpy
+
+
+class WindowSet(object):
+    """The rects of a set of windows, with queries that work on all of them
+    at once: bounding boxes, intersections, IoU and containment matrices,
+    point hit-testing, and finding the nearest window in a direction.
+
+    ``rects`` is a sequence of ``(left, top, right, bottom)`` rects (or an
+    (N, 4) NumPy array) and ``handles`` is an optional list of the windows'
+    handles. Queries refer to windows by their index in ``rects``. If
+    ``useNumPy`` is ``None``, NumPy is used if it is installed."""
+
+    def __init__(self, rects, handles=None, useNumPy=None):
+        numpy = _getNumPy() if useNumPy is None or useNumPy else None
+        if useNumPy and numpy is None:
+            raise PyGetWindowException("NumPy is not installed.")
+        self._np = numpy
+
+        if numpy is not None:
+            self._rects = numpy.asarray(rects, dtype=numpy.int64).reshape(-1, 4)
+        else:
+            self._rects = [tuple(int(value) for value in rect) for rect in rects]
+            if any(len(rect) != 4 for rect in self._rects):
+                raise PyGetWindowException("Each rect must have four values: left, top, right, bottom.")
+        self.handles = list(range(len(self._rects))) if handles is None else list(handles)
+        if len(self.handles) != len(self._rects):
+            raise PyGetWindowException("There must be one handle for each rect.")
+
+    @classmethod
+    def fromSnapshot(cls, snapshot, useNumPy=None):
+        """Returns a WindowSet of the windows in ``snapshot``, in z-order."""
+        r = snapshot.rects
+        rects = [r[i * 4 : i * 4 + 4] for i in range(len(snapshot))]
+        return cls(rects, snapshot.handles, useNumPy)
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __repr__(self):
+        return "%s(windows=%s, numpy=%s)" % (self.__class__.__name__, len(self), self._np is not None)
+
+    @property
+    def rects(self):
+        """The (N, 4) array of rects (a list of tuples without NumPy)."""
+        return self._rects
+
+    def rect(self, i):
+        """Returns the Rect of window ``i``."""
+        return Rect(*[int(value) for value in self._rects[i]])
+
+    def areas(self):
+        """Returns the area of each window's rect."""
+        if self._np is not None:
+            r = self._rects
+            return _clip(self._np, r[:, 2] - r[:, 0]) * _clip(self._np, r[:, 3] - r[:, 1])
+        return [max(right - left, 0) * max(bottom - top, 0) for left, top, right, bottom in self._rects]
+
+    def boundingBox(self, indices=None):
+        """Returns the Rect that bounds all of the windows (or just those in
+        ``indices``), or ``None`` if there are none."""
+        if self._np is not None:
+            r = self._rects if indices is None else self._rects[list(indices)]
+            if not len(r):
+                return None
+            return Rect(int(r[:, 0].min()), int(r[:, 1].min()), int(r[:, 2].max()), int(r[:, 3].max()))
+
+        r = self._rects if indices is None else [self._rects[i] for i in indices]
+        if not r:
+            return None
+        return Rect(min(rect[0] for rect in r), min(rect[1] for rect in r), max(rect[2] for rect in r), max(rect[3] for rect in r))
+
+    def intersections(self, rect):
+        """Returns the area of each window that is inside ``rect``."""
+        left, top, right, bottom = rect
+        if self._np is not None:
+            np, r = self._np, self._rects
+            width = _clip(np, np.minimum(r[:, 2], right) - np.maximum(r[:, 0], left))
+            height = _clip(np, np.minimum(r[:, 3], bottom) - np.maximum(r[:, 1], top))
+            return width * height
+        return [_overlap(windowRect, (left, top, right, bottom)) for windowRect in self._rects]
+
+    def containing(self, x, y):
+        """Returns the indices, in order, of the windows that contain the
+        point ``(x, y)``. Like pointInRect(), points on an edge don't count."""
+        if self._np is not None:
+            r = self._rects
+            hits = (r[:, 0] < x) & (x < r[:, 2]) & (r[:, 1] < y) & (y < r[:, 3])
+            return [int(i) for i in self._np.flatnonzero(hits)]
+        return [i for i, (left, top, right, bottom) in enumerate(self._rects) if left < x < right and top < y < bottom]
+
+    def unionArea(self):
+        """Returns the area covered by the union of all the windows' rects,
+        counting overlapping areas only once."""
+        from pygetwindow._occlusion import _Region
+
+        region = _Region()
+        area = 0
+        for i in range(len(self)):
+            left, top, right, bottom = self.rect(i)
+            if left < right and top < bottom:
+                area += region.uncovered(left, top, right, bottom)
+                region.add(left, top, right, bottom)
+        return area
+
+    def intersectionMatrix(self):
+        """Returns an N x N matrix of the overlapping area of each pair of
+        windows. The diagonal holds each window's own area."""
+        if self._np is not None:
+            np, r = self._np, self._rects
+            width = _clip(np, np.minimum.outer(r[:, 2], r[:, 2]) - np.maximum.outer(r[:, 0], r[:, 0]))
+            height = _clip(np, np.minimum.outer(r[:, 3], r[:, 3]) - np.maximum.outer(r[:, 1], r[:, 1]))
+            return width * height
+        rects = self._rects
+        return [[_overlap(a, b) for b in rects] for a in rects]
+
+    def iouMatrix(self):
+        """Returns an N x N matrix of the intersection-over-union of each pair
+        of windows' rects: 1.0 for identical rects, 0.0 for disjoint ones."""
+        intersections = self.intersectionMatrix()
+        areas = self.areas()
+        if self._np is not None:
+            np = self._np
+            unions = np.add.outer(areas, areas) - intersections
+            return np.divide(intersections, unions, out=np.zeros(unions.shape), where=unions > 0)
+
+        n = len(self)
+        matrix = []
+        for i in range(n):
+            row = []
+            for j in range(n):
+                union = areas[i] + areas[j] - intersections[i][j]
+                row.append(intersections[i][j] / float(union) if union > 0 else 0.0)
+            matrix.append(row)
+        return matrix
+
+    def containmentMatrix(self):
+        """Returns an N x N matrix of booleans that are True where window
+        ``i``'s rect completely contains window ``j``'s rect."""
+        if self._np is not None:
+            np, r = self._np, self._rects
+            return (np.less_equal.outer(r[:, 0], r[:, 0]) & np.less_equal.outer(r[:, 1], r[:, 1])
+                    & np.greater_equal.outer(r[:, 2], r[:, 2]) & np.greater_equal.outer(r[:, 3], r[:, 3]))
+        rects = self._rects
+        return [[a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2] and a[3] >= b[3] for b in rects] for a in rects]
+
+    def neighbor(self, i, direction):
+        """Returns the index of the nearest window in ``direction`` (one of
+        ``'left'``, ``'right'``, ``'up'``, or ``'down'``) from window ``i``,
+        or ``-1`` if there isn't one, for moving between windows with the
+        keyboard. Windows whose centers are further along the direction count;
+        they are ranked by that distance plus twice their offset across it."""
+        if direction not in _DIRECTIONS:
+            raise PyGetWindowException("direction must be 'left', 'right', 'up', or 'down', not %r." % (direction,))
+        dx, dy = _DIRECTIONS[direction]
+        left, top, right, bottom = self.rect(i)
+        # Centers are doubled so that they stay integers.
+        centerX, centerY = left + right, top + bottom
+
+        if self._np is not None:
+            np, r = self._np, self._rects
+            offsetX = r[:, 0] + r[:, 2] - centerX
+            offsetY = r[:, 1] + r[:, 3] - centerY
+            along = offsetX * dx + offsetY * dy
+            across = np.abs(offsetX * dy + offsetY * dx)
+            scores = np.where(along > 0, along + _OFF_AXIS_WEIGHT * across, np.iinfo(np.int64).max)
+            scores[i] = np.iinfo(np.int64).max
+            best = int(np.argmin(scores))
+            return best if along[best] > 0 and best != i else -1
+
+        best = -1
+        bestScore = None
+        for j, (otherLeft, otherTop, otherRight, otherBottom) in enumerate(self._rects):
+            offsetX = otherLeft + otherRight - centerX
+            offsetY = otherTop + otherBottom - centerY
+            along = offsetX * dx + offsetY * dy
+            if j == i or along <= 0:
+                continue
+            score = along + _OFF_AXIS_WEIGHT * abs(offsetX * dy + offsetY * dx)
+            if bestScore is None or score < bestScore:
+                best = j
+                bestScore = score
+        return best
+
+
+def _clip(np, values):
+    return np.maximum(values, 0)
+
+
+def _overlap(a, b):
+    # Returns the area of the intersection of two (left, top, right, bottom) rects.
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    return width * height if width > 0 and height > 0 else 0
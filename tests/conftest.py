@@ -0,0 +1,281 @@
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, STATE_VISIBLE, STATE_MINIMIZED, STATE_MAXIMIZED
+
+
+class FakeBackend(object):
+    """An in-memory backend for tests. ``rows`` is a list of
+    (handle, (left, top, right, bottom), title, flags) tuples in z-order, and
+    ``monitors`` is a list of Monitor tuples (one 1920x1080 monitor by default).
+    Child windows go in ``rows`` too, and ``children`` maps a handle to the
+    list of its children's handles. ``pids`` maps a handle to its process ID,
+    ``processPaths`` maps a process ID to its executable's path, and
+    ``classNames`` maps a handle to its window class. ``cursorPosition`` is
+    the mouse cursor's position.
+    Change ``displayGeneration`` to simulate a display change, and call
+    ``sendEvent()`` to send a window event to the watchers."""
+
+    Window = pygetwindow.ReplayWindow
+
+    def __init__(self, rows, activeHandle=None, monitors=None):
+        self.rows = dict((row[0], row) for row in rows)
+        self.order = [row[0] for row in rows]
+        self.activeHandle = activeHandle
+        if monitors is None:
+            monitors = [pygetwindow.Monitor(1, 'primary', Rect(0, 0, 1920, 1080), Rect(0, 0, 1920, 1040), 96, True)]
+        self.monitors = monitors
+        self.displayGeneration = 0
+        self.numEnumMonitorsCalls = 0
+        self.children = {}
+        self.numEnumChildCalls = 0
+        self.pids = {}
+        self.processPaths = {}
+        self.numGetWindowPidCalls = 0
+        self.watchers = []
+        self.classNames = {}
+        self.cursorPosition = pygetwindow.Point(0, 0)
+
+    def _enumWindowHandles(self):
+        return list(self.order)
+
+    def _getActiveWindowHandle(self):
+        return self.activeHandle
+
+    def _getWindowRect(self, handle):
+        if handle not in self.rows:
+            raise pygetwindow.PyGetWindowException('Invalid window handle.')
+        return Rect(*self.rows[handle][1])
+
+    def _getWindowTitle(self, handle):
+        return self.rows[handle][2]
+
+    def _getWindowFlags(self, handle):
+        return self.rows[handle][3]
+
+    def _getWindowState(self, handle):
+        return self._getWindowRect(handle), self._getWindowFlags(handle)
+
+    def _setWindowGeometry(self, handle, left, top, width, height):
+        row = self.rows[handle]
+        self.rows[handle] = (handle, (left, top, left + width, top + height), row[2], row[3])
+
+    def _showWindow(self, handle, command):
+        row = self.rows[handle]
+        flags = {'minimize': STATE_VISIBLE | STATE_MINIMIZED,
+                 'maximize': STATE_VISIBLE | STATE_MAXIMIZED,
+                 'restore': STATE_VISIBLE,
+                 'show': row[3] | STATE_VISIBLE,
+                 'hide': row[3] & ~STATE_VISIBLE}[command]
+        self.rows[handle] = (handle, row[1], row[2], flags)
+
+    def _activateWindow(self, handle):
+        self.activeHandle = handle
+
+    def _closeWindow(self, handle):
+        del self.rows[handle]
+        self.order.remove(handle)
+
+    def _enumMonitors(self):
+        self.numEnumMonitorsCalls += 1
+        return list(self.monitors)
+
+    def _getDisplayGeneration(self):
+        return self.displayGeneration
+
+    def _enumChildHandles(self, handle):
+        self.numEnumChildCalls += 1
+        return list(self.children.get(handle, []))
+
+    def _getWindowPid(self, handle):
+        self.numGetWindowPidCalls += 1
+        return self.pids.get(handle)
+
+    def _getProcessPath(self, pid):
+        return self.processPaths.get(pid)
+
+    def _getWindowClass(self, handle):
+        return self.classNames.get(handle, '')
+
+    def _setWindowZOrder(self, handle, position):
+        self.order.remove(handle)
+        if position == 'top':
+            self.order.insert(0, handle)
+        else:
+            self.order.append(handle)
+
+    def _getCursorPosition(self):
+        return self.cursorPosition
+
+    def _watchWindowEvents(self, callback):
+        self.watchers.append(callback)
+        return lambda: self.watchers.remove(callback)
+
+    def sendEvent(self, event, handle, timestamp):
+        for callback in list(self.watchers):
+            callback(event, handle, timestamp)
+
+
+@pytest.fixture
+def fakeBackend():
+    """Returns the FakeBackend class, and restores the real backend afterwards
+    if the test passes an instance to pygetwindow.useBackend()."""
+    previousBackend = pygetwindow._backend
+    yield FakeBackend
+    pygetwindow.useBackend(previousBackend)
+
+
+def buildSnapshot(rows, timestamp=0):
+    """Returns a Snapshot of ``rows``, a list of
+    (handle, (left, top, right, bottom), title, flags) tuples in z-order."""
+    handles, rects, titles, flags = [], [], [], []
+    for handle, rect, title, windowFlags in rows:
+        handles.append(handle)
+        rects.extend(rect)
+        titles.append(title)
+        flags.append(windowFlags)
+    return pygetwindow.Snapshot(handles, rects, titles, flags, timestamp=timestamp)
+
+
+@pytest.fixture
+def makeSnapshot():
+    """Returns buildSnapshot(), for building snapshots from rows like FakeBackend's."""
+    return buildSnapshot
+
+
+def waitForCondition(condition, timeout=10.0, interval=0.01, message=None):
+    """Calls ``condition()`` until it returns something true, and returns
+    that. Fails the test if ``timeout`` seconds pass first. Errors from the
+    window closing or not existing yet count as not true yet."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            result = condition()
+        except pygetwindow.PyGetWindowException:
+            result = None
+        if result:
+            return result
+        if time.time() > deadline:
+            raise AssertionError(message or 'Timed out waiting for %r.' % (condition,))
+        time.sleep(interval)
+
+
+@pytest.fixture
+def waitFor():
+    """Returns waitForCondition(), for waiting on window state instead of sleeping."""
+    return waitForCondition
+
+
+# The lightweight EWMH window managers the X11 tests can run under, in order of preference.
+WINDOW_MANAGERS = (('openbox', '--sm-disable'), ('fluxbox',), ('icewm',), ('matchbox-window-manager', '-use_titlebar', 'yes'))
+
+
+@pytest.fixture(scope='session')
+def xvfb():
+    """Starts an Xvfb server for the test session and returns its display
+    name. Each pytest-xdist worker is a separate process with its own
+    session, and Xvfb picks a free display number itself (-displayfd), so
+    workers never share or race for a display. Skips if Xvfb isn't installed."""
+    server, displayName = _startXvfb()
+    yield displayName
+    server.terminate()
+    server.wait()
+
+
+@pytest.fixture
+def xvfbServer():
+    """Starts an Xvfb server for just this test, which the test may kill, and
+    returns its Popen object and display name."""
+    server, displayName = _startXvfb()
+    yield server, displayName
+    if server.poll() is None:
+        server.terminate()
+    server.wait()
+
+
+def _startXvfb():
+    if not sys.platform.startswith('linux') or shutil.which('Xvfb') is None:
+        pytest.skip('Xvfb is not installed.')
+    readFd, writeFd = os.pipe()
+    server = subprocess.Popen(['Xvfb', '-displayfd', str(writeFd), '-screen', '0', '1280x1024x24', '-nolisten', 'tcp', '-noreset'],
+                              pass_fds=(writeFd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(writeFd)
+    with os.fdopen(readFd) as displayFile:
+        number = displayFile.readline().strip()  # Xvfb writes this once it is accepting connections.
+    if not number:
+        server.kill()
+        pytest.skip('Xvfb could not be started.')
+    return server, ':' + number
+
+
+@pytest.fixture(scope='session')
+def x11Session(xvfb):
+    """Starts a window manager on the Xvfb display, and returns an X11Backend
+    connected to it once the window manager is running. Skips if none of
+    WINDOW_MANAGERS is installed."""
+    from pygetwindow._pygetwindow_linux import X11Backend
+
+    for command in WINDOW_MANAGERS:
+        if shutil.which(command[0]) is not None:
+            break
+    else:
+        pytest.skip('No window manager is installed (one of %s).' % (', '.join(command[0] for command in WINDOW_MANAGERS)))
+    environment = dict(os.environ, DISPLAY=xvfb)
+    manager = subprocess.Popen(command, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    backend = X11Backend(xvfb)
+    try:
+        waitForCondition(backend._hasWindowManager, message='%s did not start.' % (command[0]))
+        yield backend
+    finally:
+        backend.close()
+        manager.terminate()
+        manager.wait()
+
+
+@pytest.fixture
+def x11Backend(x11Session):
+    """Makes the Xvfb display's X11Backend the current backend for the test."""
+    previousBackend = pygetwindow.useBackend(x11Session)
+    yield x11Session
+    pygetwindow.useBackend(previousBackend)
+
+
+TK_WINDOW_SCRIPT = """
+import sys
+import tkinter
+root = tkinter.Tk()
+root.title(sys.argv[1])
+root.geometry(sys.argv[2])
+root.configure(background=sys.argv[3])
+root.mainloop()
+"""
+
+_tkWindowNumbers = itertools.count()
+
+
+@pytest.fixture
+def tkWindow(x11Backend):
+    """Returns a function that opens a tkinter window on the Xvfb display in
+    a new process, and returns its Window object once the window manager
+    has mapped it. The windows are closed at the end of the test."""
+    processes = []
+
+    def openWindow(geometry='300x200+300+200', background='#ff0000'):
+        title = 'PyGetWindow test %s-%s' % (os.getpid(), next(_tkWindowNumbers))
+        environment = dict(os.environ, DISPLAY=x11Backend.displayName)
+        processes.append(subprocess.Popen([sys.executable, '-c', TK_WINDOW_SCRIPT, title, geometry, background], env=environment))
+        windows = waitForCondition(lambda: pygetwindow.getWindowsWithTitle(title), message='The tkinter window did not open.')
+        window = windows[0]
+        waitForCondition(lambda: window.visible)
+        return window
+
+    yield openWindow
+    for process in processes:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,114 @@
+import ctypes
+import sys
+
+import pytest
+import pygetwindow
+from pygetwindow import WindowCapture, STATE_VISIBLE
+
+
+ROWS = [
+    (1, (0, 0, 4, 3), 'small', STATE_VISIBLE),
+    (2, (10, 10, 12, 12), 'tiny', STATE_VISIBLE),
+]
+
+
+class FakeCaptureSession(object):
+    # Fills one reused buffer with each window's handle, like a backend's
+    # session writes each window's pixels into shared memory.
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.buffer = None
+        self.numAllocations = 0
+        self.closed = False
+
+    def capture(self, handles):
+        sizes = []
+        for handle in handles:
+            rect = self.backend._getWindowRect(handle)
+            sizes.append((rect.right - rect.left, rect.bottom - rect.top))
+        total = sum(width * height * 4 for width, height in sizes)
+        if self.buffer is None or len(self.buffer) < total:
+            self.buffer = (ctypes.c_ubyte * total)()
+            self.numAllocations += 1
+        results = []
+        offset = 0
+        for handle, (width, height) in zip(handles, sizes):
+            size = width * height * 4
+            ctypes.memset(ctypes.addressof(self.buffer) + offset, handle, size)
+            results.append(((ctypes.c_ubyte * size).from_buffer(self.buffer, offset), width, height))
+            offset += size
+        return results
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def captureBackend(fakeBackend):
+    backend = fakeBackend(ROWS)
+    backend.sessions = []
+
+    def openCaptureSession():
+        backend.sessions.append(FakeCaptureSession(backend))
+        return backend.sessions[-1]
+
+    backend._openCaptureSession = openCaptureSession
+    pygetwindow.useBackend(backend)
+    return backend
+
+
+def test_capture(captureBackend):
+    with WindowCapture() as capture:
+        frame = capture.capture(1)
+        assert frame.shape == (3, 4, 4)
+        assert frame[2, 3, 0] == 1 and frame.tobytes() == b'\x01' * 48
+
+        frames = capture.captureMany([2, pygetwindow.getAllWindows()[0]])
+        assert [f.shape for f in frames] == [(2, 2, 4), (3, 4, 4)]
+        assert frames[0][0, 0, 0] == 2 and frames[1][0, 0, 0] == 1
+
+        # The session is reused, and its buffer is only replaced when a batch needs more room.
+        capture.captureMany([1, 2])
+        assert len(captureBackend.sessions) == 1 and captureBackend.sessions[0].numAllocations == 2
+
+        stats = capture.stats()
+        assert stats.frames == 3 and stats.windows == 5
+        assert 0 <= stats.meanFrameTime <= stats.maxFrameTime
+    assert captureBackend.sessions[0].closed
+
+
+def test_capture_numpy(captureBackend):
+    np = pytest.importorskip('numpy')
+    frame = pygetwindow.getAllWindows()[1].capture(numpy=True)
+    assert isinstance(frame, np.ndarray) and frame.shape == (2, 2, 4) and frame.dtype == np.uint8
+    assert (frame == 2).all()
+
+    # The array is a view of the session's buffer, not a copy.
+    captureBackend.sessions[0].buffer[0] = 7
+    assert frame[0, 0, 0] == 7
+
+
+def test_capture_windows(captureBackend):
+    windows = pygetwindow.getAllWindows()
+    frames = pygetwindow.captureWindows(windows[::-1])
+    assert [frame[0, 0, 0] for frame in frames] == [2, 1]
+
+
+def test_capture_not_supported(fakeBackend):
+    with pytest.raises(NotImplementedError):
+        WindowCapture(fakeBackend(ROWS))
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='SysV shared memory is used on X11.')
+def test_shared_segment():
+    from pygetwindow._pygetwindow_linux import _SharedSegment
+
+    segment = _SharedSegment(4096)
+    view = segment.view(64, 16)
+    view[0] = 255
+    segment.remove()
+    frame = memoryview(view).cast('B')
+    del segment, view
+    # The frame keeps the segment attached.
+    assert frame[0] == 255 and len(frame) == 16
@@ -0,0 +1,108 @@
+from __future__ import division, print_function
+
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import Point, CursorTracker, STATE_VISIBLE, STATE_MINIMIZED
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'top', STATE_VISIBLE),
+    (2, (50, 50, 300, 300), 'middle', STATE_VISIBLE),
+    (3, (0, 0, 1000, 1000), 'minimized', STATE_VISIBLE | STATE_MINIMIZED),
+    (4, (0, 0, 1920, 1080), 'bottom', STATE_VISIBLE),
+]
+
+
+@pytest.fixture
+def cursorBackend(fakeBackend):
+    backend = fakeBackend(ROWS)
+    pygetwindow.useBackend(backend)
+    backend.numEnumCalls = 0
+    enumWindowHandles = backend._enumWindowHandles
+
+    def countedEnumWindowHandles():
+        backend.numEnumCalls += 1
+        return enumWindowHandles()
+
+    backend._enumWindowHandles = countedEnumWindowHandles
+    return backend
+
+
+def test_hover_events(cursorBackend):
+    events = []
+    tracker = CursorTracker(lambda handle, point, timestamp: events.append((handle, point)))
+    tracker.resync()
+    for point in ((10, 10), (20, 20), (60, 60), (200, 200), (500, 500), (5000, 5000)):
+        cursorBackend.cursorPosition = Point(*point)
+        tracker.sample()
+    # Only changes of the hovered window are reported, and the minimized window is skipped.
+    assert events == [(1, (10, 10)), (2, (200, 200)), (4, (500, 500)), (None, (5000, 5000))]
+    assert tracker.hovered is None and tracker.position == (5000, 5000)
+    assert cursorBackend.numEnumCalls == 1  # Samples don't enumerate the windows.
+
+    stats = tracker.stats()
+    assert stats.samples == 6 and stats.hoverChanges == 4 and stats.resyncs == 1
+    assert 0 <= stats.meanSampleTime <= stats.maxSampleTime
+
+
+def test_index_updates_from_events(cursorBackend):
+    tracker = CursorTracker(backend=cursorBackend)
+    tracker.resync()
+    tracker._stopWatching = cursorBackend._watchWindowEvents(tracker._onEvent)
+    assert tracker.windowAt(60, 60) == 1
+
+    # Window 2 is activated, so it comes to the top.
+    cursorBackend.sendEvent('activated', 2, time.time())
+    assert tracker.windowAt(60, 60) == 2
+
+    # Window 2 moves away.
+    cursorBackend._setWindowGeometry(2, 500, 500, 100, 100)
+    cursorBackend.sendEvent('moved', 2, time.time())
+    assert tracker.windowAt(60, 60) == 1
+    assert tracker.windowAt(550, 550) == 2
+
+    # A new window appears on top, and then closes.
+    cursorBackend.rows[5] = (5, (540, 540, 560, 560), 'new', STATE_VISIBLE)
+    cursorBackend.order.insert(0, 5)
+    cursorBackend.sendEvent('created', 5, time.time())
+    assert tracker.windowAt(550, 550) == 5
+    cursorBackend._closeWindow(5)
+    cursorBackend.sendEvent('destroyed', 5, time.time())
+    assert tracker.windowAt(550, 550) == 2
+
+    # Restacking reads the new order.
+    cursorBackend.order = [4, 2, 1, 3]
+    cursorBackend.sendEvent('restacked', None, time.time())
+    assert tracker.windowAt(60, 60) == 4
+
+    assert cursorBackend.numEnumCalls == 2
+    assert tracker.stats().indexUpdates == 5
+    tracker.stop()
+    assert cursorBackend.watchers == []
+
+
+def test_background_sampling(cursorBackend):
+    events = []
+    cursorBackend.cursorPosition = Point(10, 10)
+    startCpu = time.process_time() if hasattr(time, 'process_time') else time.clock()
+    with CursorTracker(lambda *args: events.append(args), rate=120) as tracker:
+        time.sleep(0.25)
+        cursorBackend.cursorPosition = Point(200, 200)
+        time.sleep(0.25)
+    cpu = (time.process_time() if hasattr(time, 'process_time') else time.clock()) - startCpu
+    assert [event[0] for event in events] == [1, 2]
+    stats = tracker.stats()
+    assert 30 <= stats.samples <= 70
+    assert stats.resyncs == 1
+    assert cpu < 0.25  # Sampling at 120 Hz leaves the CPU mostly idle.
+
+
+def test_invalid_rate():
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        CursorTracker(rate=0)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,111 @@
+from __future__ import print_function
+
+import threading
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import PyGetWindowException, STATE_VISIBLE, STATE_ACTIVE
+from pygetwindow._fetch import parallelMap
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'first', STATE_VISIBLE),
+    (2, (50, 50, 300, 300), 'second', STATE_VISIBLE),
+    (3, (0, 0, 1920, 1080), 'third', STATE_VISIBLE),
+]
+
+
+def test_parallelMap():
+    items = list(range(100))
+    for workers in (None, 1, 2, 8):
+        assert parallelMap(lambda i: i * i, items, workers) == [i * i for i in items]
+
+    # The earliest item's exception is raised, as in a serial loop.
+    def failing(i):
+        if i % 10 == 7:
+            raise ValueError(i)
+        return i
+
+    for workers in (None, 8):
+        with pytest.raises(ValueError) as excinfo:
+            parallelMap(failing, items, workers)
+        assert excinfo.value.args == (7,)
+
+    with pytest.raises(PyGetWindowException):
+        parallelMap(abs, items, 0)
+
+
+def test_getAllWindows_fetch(fakeBackend):
+    backend = fakeBackend(ROWS, activeHandle=2)
+    backend.pids = {1: 100, 2: 200, 3: 100}
+    backend.processPaths = {100: '/usr/bin/xterm', 200: 'C:\\Windows\\notepad.exe'}
+    backend.classNames = {2: 'Notepad'}
+    backend.children = {1: [10, 11]}
+    pygetwindow.useBackend(backend)
+
+    for workers in (None, 4):
+        windows = pygetwindow.getAllWindows(fetch=['title', 'state', 'processName', 'className', 'children'], workers=workers)
+        assert [window._hWnd for window in windows] == [1, 2, 3]
+        assert [window.fetched['title'] for window in windows] == ['first', 'second', 'third']
+        assert [window.fetched['state'].isActive for window in windows] == [False, True, False]
+        assert windows[1].fetched['processName'] == 'notepad.exe' and windows[1].fetched['className'] == 'Notepad'
+        assert windows[0].fetched['children'] == [10, 11]
+
+    with pytest.raises(PyGetWindowException):
+        pygetwindow.getAllWindows(fetch=['color'])
+
+
+def test_getAllWindows_skips_closed_windows(fakeBackend):
+    backend = fakeBackend(ROWS)
+    backend.order.insert(1, 99)  # Enumerated, but closed before it could be read.
+    pygetwindow.useBackend(backend)
+    assert [window._hWnd for window in pygetwindow.getAllWindows(fetch=['rect'], workers=2)] == [1, 2, 3]
+
+
+def test_getSnapshot_workers(fakeBackend):
+    pygetwindow.useBackend(fakeBackend(ROWS, activeHandle=3))
+    serial = pygetwindow.getSnapshot()
+    parallel = pygetwindow.getSnapshot(workers=3)
+    assert list(parallel) == list(serial)
+    assert parallel.flags[2] == STATE_VISIBLE | STATE_ACTIVE
+
+
+def test_workers_benchmark(fakeBackend):
+    # Each title takes a fixed time to read without holding the GIL, like a
+    # native call to a window that is slow to answer.
+    backend = fakeBackend([(handle, (0, 0, 10, 10), 'window %d' % (handle), STATE_VISIBLE) for handle in range(2000)])
+    getWindowTitle = backend._getWindowTitle
+    inFlight = [0, 0]  # The calls in flight now, and the most there have been at once.
+    lock = threading.Lock()
+    gate = {}
+
+    def slowGetWindowTitle(handle):
+        with lock:
+            inFlight[0] += 1
+            inFlight[1] = max(inFlight)
+            gate['arrivals'] += 1
+            first = gate['arrivals'] <= gate['barrier'].parties
+        if first:
+            # The first calls wait until there are ``workers`` of them in flight at once.
+            gate['barrier'].wait(10)
+        time.sleep(0.0001)
+        with lock:
+            inFlight[0] -= 1
+        return getWindowTitle(handle)
+
+    backend._getWindowTitle = slowGetWindowTitle
+    pygetwindow.useBackend(backend)
+
+    for workers in (1, 2, 4, 8):
+        inFlight[1] = 0
+        gate['arrivals'] = 0
+        gate['barrier'] = threading.Barrier(workers)
+        startTime = time.time()
+        windows = pygetwindow.getAllWindows(fetch=['title'], workers=workers)
+        print('getAllWindows(fetch=[\'title\']) of 2000 windows with %d workers: %.1f ms' % (workers, (time.time() - startTime) * 1000))
+        assert [window.fetched['title'] for window in windows] == ['window %d' % (handle) for handle in range(2000)]
+        assert inFlight[1] == workers  # The calls overlapped, but never more than ``workers`` at once.
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,89 @@
+from __future__ import division, print_function
+
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import STATE_VISIBLE
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'first', STATE_VISIBLE),
+    (2, (10, 10, 60, 60), 'second', STATE_VISIBLE),
+    (3, (20, 20, 80, 80), 'third', STATE_VISIBLE),
+]
+
+
+def test_mru_and_previous():
+    tracker = pygetwindow.FocusTracker()
+    assert tracker.previous() is None and tracker.mru() == []
+    for handle, timestamp in ((1, 0.0), (2, 1.0), (3, 2.0), (1, 3.0)):
+        tracker.activated(handle, timestamp)
+    assert tracker.current == 1
+    assert tracker.mru() == [1, 3, 2]
+    assert tracker.mru(2) == [1, 3]
+    assert tracker.previous() == 3
+
+    # Activating the active window again changes nothing.
+    tracker.activated(1, 4.0)
+    assert tracker.mru() == [1, 3, 2]
+    assert tracker.stats(1, now=4.0).activations == 2
+
+    tracker.forget(3)
+    assert tracker.mru() == [1, 2]
+    assert tracker.previous() == 2
+    tracker.forget(1)
+    assert tracker.mru() == [2] and tracker.current is None and tracker.previous() is None
+
+
+def test_focus_times():
+    tracker = pygetwindow.FocusTracker()
+    tracker.activated(1, 10.0)
+    tracker.activated(2, 13.0)
+    tracker.activated(None, 14.0)  # The desktop was clicked.
+    tracker.activated(1, 20.0)
+
+    assert tracker.current == 1
+    assert tracker.stats(1, now=25.0) == (8.0, 2, 20.0)
+    assert tracker.stats(2, now=25.0) == (1.0, 1, 13.0)
+    assert tracker.stats(99) == (0.0, 0, None)
+    assert list(tracker.focusTimes(now=25.0).items()) == [(1, 8.0), (2, 1.0)]
+
+
+def test_events(fakeBackend):
+    backend = fakeBackend(ROWS, activeHandle=1)
+    pygetwindow.useBackend(backend)
+    with pygetwindow.FocusTracker() as tracker:
+        assert tracker.current == 1
+        backend.sendEvent('activated', 3, time.time())
+        backend.sendEvent('activated', 2, time.time())
+
+        # Queries don't call the backend.
+        backend._getActiveWindowHandle = None
+        assert tracker.mru() == [2, 3, 1]
+        assert tracker.previous() == 3
+    assert backend.watchers == []
+    assert tracker.current is None  # Stopping ends the current stretch of focus.
+
+
+def test_unsupported_backend():
+    with pytest.raises(NotImplementedError):
+        pygetwindow.FocusTracker(backend=object()).start()
+
+
+def test_benchmark_queries():
+    # previous() and mru(k) don't depend on how many windows have been seen.
+    tracker = pygetwindow.FocusTracker()
+    for handle in range(100000):
+        tracker.activated(handle, float(handle))
+    start = time.time()
+    for i in range(10000):
+        tracker.previous()
+        tracker.mru(5)
+        tracker.activated(i * 7 % 100000, 100000.0 + i)
+    assert time.time() - start < 1.0
+    assert len(tracker) == 100000
+
+
+if __name__ == '__main__':
+    pytest.main()
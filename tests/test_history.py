@@ -0,0 +1,101 @@
+from __future__ import division, print_function
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, WindowHistory, STATE_VISIBLE, STATE_MINIMIZED
+
+
+def makeHistory(makeSnapshot, capacity=100):
+    history = WindowHistory(capacity)
+    history.append(makeSnapshot([(1, (0, 0, 10, 10), 'editor', STATE_VISIBLE), (2, (5, 5, 50, 50), 'browser', STATE_VISIBLE)], 1.0))
+    history.append(makeSnapshot([(1, (20, 0, 30, 10), 'editor', STATE_VISIBLE), (2, (5, 5, 50, 50), 'browser', STATE_VISIBLE)], 2.0))
+    history.append(makeSnapshot([(1, (20, 0, 30, 10), 'editor*', STATE_MINIMIZED)], 3.0))
+    return history
+
+
+def checkHistory(history):
+    assert history.rectAt(1, 0.5) is None
+    assert history.rectAt(1, 1.0) == Rect(0, 0, 10, 10)
+    assert history.rectAt(1, 1.5) == Rect(0, 0, 10, 10)
+    assert history.rectAt(1, 2.0) == Rect(20, 0, 30, 10)
+    assert history.titleAt(1, 2.5) == 'editor'
+    assert history.titleAt(1, 99) == 'editor*'
+    assert history.recordAt(1, 3.0).flags == STATE_MINIMIZED
+    assert history.rectAt(2, 2.9) == Rect(5, 5, 50, 50)
+    assert history.rectAt(2, 3.0) is None  # Destroyed at 3.0.
+    assert history.rectAt(999, 2.0) is None
+
+    assert [t for t, record in history.changes(1)] == [1.0, 2.0, 3.0]
+    assert [t for t, record in history.changes(1, start=2.0, end=2.0)] == [2.0]
+    assert history.changes(2)[-1] == (3.0, None)
+    assert [(t, handle) for t, handle, record in history.events(start=2.0)] == [(2.0, 1), (3.0, 1), (3.0, 2)]
+
+
+def test_history(makeSnapshot):
+    history = makeHistory(makeSnapshot)
+    assert len(history) == 5  # Two created, one moved, one changed, one destroyed.
+    assert (history.startTime, history.endTime) == (1.0, 3.0)
+    checkHistory(history)
+
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        history.append(makeSnapshot([], 0.5))
+
+
+def test_history_event_order(makeSnapshot):
+    history = WindowHistory()
+    handles = [50, 3, 41, 7, 12]
+    history.append(makeSnapshot([(handle, (0, 0, 10, 10), 'window', STATE_VISIBLE) for handle in handles], 1.0))
+    history.append(makeSnapshot([(handle, (handle, 0, handle + 10, 10), 'moved %s' % (handle), STATE_VISIBLE) for handle in handles]
+                                + [(99, (0, 0, 1, 1), 'new', STATE_VISIBLE)], 2.0))
+    # The changed windows are recorded in z-order, once each, whatever their handles hash to.
+    assert [handle for t, handle, record in history.events(start=2.0)] == handles + [99]
+
+
+def test_history_refreshed_snapshot(fakeBackend):
+    backend = fakeBackend([(1, (0, 0, 10, 10), 'editor', STATE_VISIBLE), (2, (5, 5, 50, 50), 'browser', STATE_VISIBLE)])
+    snapshot = pygetwindow._snapshot.takeSnapshot(backend)
+    history = WindowHistory()
+    history.append(snapshot)
+
+    # Refreshing the snapshot in place doesn't change the one the history compares the next snapshot to.
+    backend._setWindowGeometry(2, 20, 20, 45, 45)
+    assert snapshot.refresh(fields=('rect',)) == [2]
+    history.append(snapshot)
+    assert [(handle, record.rect) for t, handle, record in history.events()][2:] == [(2, Rect(20, 20, 65, 65))]
+
+
+def test_history_ring_buffer(makeSnapshot):
+    history = WindowHistory(capacity=4)
+    for t in range(10):
+        history.append(makeSnapshot([(1, (t, 0, t + 10, 10), 'title %s' % (t), STATE_VISIBLE)], float(t)))
+    assert len(history) == 4
+    assert history.startTime == 6.0
+    assert history.rectAt(1, 5.0) is None  # Overwritten.
+    assert history.rectAt(1, 7.5) == Rect(7, 0, 17, 10)
+    assert history.titleAt(1, 9.0) == 'title 9'
+    assert len(history._titles) <= 8  # Titles that fell out of the ring were dropped.
+
+
+def test_history_save_and_load(tmp_path, makeSnapshot):
+    path = str(tmp_path / 'history.bin')
+    makeHistory(makeSnapshot).save(path)
+    loaded = WindowHistory.load(path)
+    assert len(loaded) == 5
+    checkHistory(loaded)
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        loaded.append(makeSnapshot([], 4.0))
+
+
+def test_history_load_truncated(tmp_path, makeSnapshot):
+    path = tmp_path / 'history.bin'
+    makeHistory(makeSnapshot).save(str(path))
+    data = path.read_bytes()
+    # Empty, shorter than the header, cut off in the columns, and cut off in the titles.
+    for length in (0, 3, 40, len(data) - 1):
+        path.write_bytes(data[:length])
+        with pytest.raises(pygetwindow.PyGetWindowException):
+            WindowHistory.load(str(path))
+
+
+if __name__ == '__main__':
+    pytest.main()
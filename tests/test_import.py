@@ -0,0 +1,56 @@
+from __future__ import division, print_function
+
+import subprocess
+import sys
+
+import pytest
+import pygetwindow
+
+
+# Modules that ``import pygetwindow`` must not load. They're imported on
+# first use instead.
+HEAVY_MODULES = ('pyrect', 'ctypes', 'json', 'gzip', 'mmap', 'Quartz',
+                 'pygetwindow._pygetwindow_win', 'pygetwindow._pygetwindow_linux',
+                 'pygetwindow._snapshot', 'pygetwindow._replay', 'pygetwindow._history')
+
+# The most time, in microseconds, that ``import pygetwindow`` may take. This
+# is deliberately loose (importing pyrect alone used to take longer) so the
+# test only fails when something heavy starts being imported up front.
+IMPORT_TIME_BUDGET = 50000
+
+
+def importTime():
+    """Returns the cumulative time in microseconds that ``python -X importtime``
+    reports for importing pygetwindow in a new process."""
+    output = subprocess.check_output([sys.executable, '-X', 'importtime', '-c', 'import pygetwindow'],
+                                     stderr=subprocess.STDOUT, universal_newlines=True)
+    for line in output.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'pygetwindow':
+            return int(fields[1])
+    raise AssertionError('pygetwindow not found in -X importtime output:\n' + output)
+
+
+def test_import_is_lazy():
+    code = 'import sys, pygetwindow; print(" ".join(sys.modules))'
+    loaded = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True).split()
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='-X importtime needs Python 3.7')
+def test_import_time():
+    elapsed = min(importTime() for i in range(3))
+    print('import pygetwindow: %s us' % (elapsed))
+    assert elapsed < IMPORT_TIME_BUDGET
+
+
+def test_lazy_names():
+    assert pygetwindow.Snapshot is pygetwindow._snapshot.Snapshot
+    assert pygetwindow.WindowHistory is pygetwindow._history.WindowHistory
+    assert 'ReplayBackend' in dir(pygetwindow)
+    with pytest.raises(AttributeError):
+        pygetwindow.NoSuchName
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import LiveModel, STATE_VISIBLE
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'first', STATE_VISIBLE),
+    (2, (50, 50, 300, 300), 'second', STATE_VISIBLE),
+]
+
+
+def test_refresh_and_generation(fakeBackend):
+    backend = fakeBackend(ROWS)
+    model = LiveModel(backend=backend)
+    assert model.snapshot is None and model.generation == 0
+
+    version = model.refresh()
+    assert version.generation == 1 and version.snapshot.handles == [1, 2]
+
+    # Nothing changed, so the same version stays published.
+    assert model.refresh() is version and model.numRefreshes == 2
+
+    backend._setWindowGeometry(2, 60, 60, 250, 250)
+    version = model.refresh()
+    assert version.generation == 2 and version.snapshot.rect(1) == (60, 60, 310, 310)
+    assert model.current() is version
+
+    assert model.waitForChange(2, timeout=0.01) is None
+    assert model.waitForChange(1) is version
+
+
+def test_published_snapshots_cant_be_refreshed(fakeBackend):
+    backend = fakeBackend(ROWS)
+    model = LiveModel(backend=backend)
+    snapshot = model.refresh().snapshot
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        snapshot.refresh()
+
+    backend._setWindowGeometry(1, 10, 10, 100, 100)
+    copy = snapshot.copy()
+    assert copy.refresh(fields=('rect',)) == [1]
+    assert copy.rect(0) == (10, 10, 110, 110) and snapshot.rect(0) == (0, 0, 100, 100)
+
+
+def test_refreshes_on_events(fakeBackend):
+    backend = fakeBackend(ROWS)
+    with LiveModel(interval=60, backend=backend) as model:
+        assert model.generation == 1
+        backend._closeWindow(1)
+        backend.sendEvent('destroyed', 1, time.time())
+        version = model.waitForChange(1, timeout=5)
+        assert version.snapshot.handles == [2]
+    assert not backend.watchers
+
+
+def test_readers_see_whole_versions(fakeBackend):
+    backend = fakeBackend(ROWS)
+    pygetwindow.useBackend(backend)
+    model = LiveModel(interval=0.0001).start()
+    problems = []
+    done = threading.Event()
+
+    def read():
+        reads = 0
+        while not done.is_set() or reads == 0:
+            generation, snapshot = model.current()
+            # Window 2's left edge is moved to its generation number, so every
+            # version can be checked for being in one piece.
+            expected = 50 if generation == 1 else generation
+            if snapshot.rects[4] != expected:
+                problems.append((generation, snapshot.rects[4]))
+            reads += 1
+            time.sleep(0)  # Let the refresher run.
+
+    def write():
+        for generation in range(2, 100):
+            backend._setWindowGeometry(2, generation, 50, 250, 250)
+            model.waitForChange(generation - 1)
+        done.set()
+
+    threads = [threading.Thread(target=read) for i in range(8)] + [threading.Thread(target=write)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        model.stop()
+    assert problems == []
+    assert model.generation == 99
+
+
+if __name__ == '__main__':
+    pytest.main()
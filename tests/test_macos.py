@@ -0,0 +1,115 @@
+from __future__ import division, print_function
+
+import sys
+import time
+import types
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, STATE_VISIBLE, STATE_ACTIVE
+
+
+# Window-info dictionaries as CGWindowListCopyWindowInfo() returns them,
+# front to back. The menu bar is on a higher layer than normal windows.
+WINDOW_INFOS = [
+    {'kCGWindowNumber': 31, 'kCGWindowLayer': 25, 'kCGWindowOwnerName': 'SystemUIServer', 'kCGWindowOwnerPID': 220,
+     'kCGWindowBounds': {'X': 1500.0, 'Y': 0.0, 'Width': 420.0, 'Height': 24.0}, 'kCGWindowAlpha': 1.0,
+     'kCGWindowIsOnscreen': True},
+    {'kCGWindowNumber': 4412, 'kCGWindowLayer': 0, 'kCGWindowOwnerName': 'TextEdit', 'kCGWindowOwnerPID': 901,
+     'kCGWindowName': 'Untitled', 'kCGWindowBounds': {'X': 100.0, 'Y': 80.0, 'Width': 600.0, 'Height': 400.0},
+     'kCGWindowAlpha': 1.0, 'kCGWindowIsOnscreen': True},
+    {'kCGWindowNumber': 4390, 'kCGWindowLayer': 0, 'kCGWindowOwnerName': 'Safari', 'kCGWindowOwnerPID': 455,
+     'kCGWindowName': 'Apple', 'kCGWindowBounds': {'X': 0.0, 'Y': 24.0, 'Width': 1440.0, 'Height': 876.0},
+     'kCGWindowAlpha': 1.0, 'kCGWindowIsOnscreen': True},
+    {'kCGWindowNumber': 4391, 'kCGWindowLayer': 0, 'kCGWindowOwnerName': 'Safari', 'kCGWindowOwnerPID': 455,
+     'kCGWindowBounds': {'X': 0.0, 'Y': 24.0, 'Width': 10.0, 'Height': 10.0}, 'kCGWindowAlpha': 0.0,
+     'kCGWindowIsOnscreen': True},
+]
+
+
+@pytest.fixture
+def quartz(monkeypatch):
+    """Installs a stand-in Quartz module that returns ``quartz.windowInfos``,
+    and makes the macOS backend the current backend."""
+    stub = types.ModuleType('Quartz')
+    stub.kCGWindowListExcludeDesktopElements = 1 << 4
+    stub.kCGWindowListOptionOnScreenOnly = 1 << 0
+    stub.kCGNullWindowID = 0
+    stub.windowInfos = list(WINDOW_INFOS)
+    stub.numCalls = 0
+
+    def CGWindowListCopyWindowInfo(option, relativeToWindow):
+        stub.numCalls += 1
+        return stub.windowInfos
+
+    stub.CGWindowListCopyWindowInfo = CGWindowListCopyWindowInfo
+    monkeypatch.setitem(sys.modules, 'Quartz', stub)
+
+    from pygetwindow import _pygetwindow_macos
+    monkeypatch.setattr(_pygetwindow_macos, '_quartz', None)
+    monkeypatch.setattr(_pygetwindow_macos, '_current', None)
+    previousBackend = pygetwindow.useBackend(_pygetwindow_macos)
+    yield stub
+    pygetwindow.useBackend(previousBackend)
+
+
+def test_decodeWindowList():
+    from pygetwindow._pygetwindow_macos import decodeWindowList
+
+    windowList = decodeWindowList(WINDOW_INFOS, 1000.0)
+    snap = windowList.snapshot
+    assert snap.handles == [31, 4412, 4390, 4391] and snap.timestamp == 1000.0
+    assert snap.rect(snap.indexOf(4412)) == Rect(100, 80, 700, 480)
+    assert snap.titles == ['SystemUIServer ', 'TextEdit Untitled', 'Safari Apple', 'Safari ']
+    assert list(snap.flags) == [STATE_VISIBLE, STATE_VISIBLE | STATE_ACTIVE, STATE_VISIBLE, 0]
+    assert windowList.activeHandle == 4412
+    assert list(windowList.pids) == [220, 901, 455, 455] and windowList.owners[2] == 'Safari'
+
+
+def test_queries_use_one_window_list(quartz):
+    snap = pygetwindow.getSnapshot()
+    assert snap.handles == [31, 4412, 4390, 4391] and snap.flags[1] & STATE_ACTIVE
+    assert quartz.numCalls == 1  # Every per-window primitive was answered from the same list.
+
+    windows = pygetwindow.getWindowsWithTitle('untitled')
+    assert [window._hWnd for window in windows] == [4412]
+    assert windows[0].size == (600, 400) and windows[0].isActive and windows[0].processName == 'TextEdit'
+    assert quartz.numCalls == 2
+
+    # Titles start with the application's name, since window names are empty without Screen Recording permission.
+    assert [window._hWnd for window in pygetwindow.getWindowsWithTitle('Safari')] == [4390, 4391]
+    assert pygetwindow.getAllTitles() == ['SystemUIServer ', 'TextEdit Untitled', 'Safari Apple', 'Safari ']
+
+    # A window that isn't in the list yet is looked for in a new list.
+    newWindow = dict(WINDOW_INFOS[1], kCGWindowNumber=5000)
+    quartz.windowInfos = [newWindow] + WINDOW_INFOS
+    numCalls = quartz.numCalls
+    assert pygetwindow._pygetwindow_macos._getWindowRect(5000) == Rect(100, 80, 700, 480)
+    assert quartz.numCalls == numCalls + 1
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        pygetwindow._pygetwindow_macos._getWindowRect(9999)
+    assert quartz.numCalls == numCalls + 2
+
+    with pytest.raises(NotImplementedError):
+        windows[0].moveTo(0, 0)
+
+
+def test_decodeWindowList_benchmark():
+    from pygetwindow._pygetwindow_macos import decodeWindowList
+
+    windowInfos = []
+    for number in range(5000):
+        info = dict(WINDOW_INFOS[1])
+        info['kCGWindowNumber'] = number
+        info['kCGWindowName'] = 'Window %d' % (number)
+        windowInfos.append(info)
+    startTime = time.time()
+    snap = decodeWindowList(windowInfos).snapshot
+    elapsed = time.time() - startTime
+    print('decodeWindowList() of 5000 windows: %.1f ms' % (elapsed * 1000))
+    assert snap.indexOf(4999) == 4999
+    assert elapsed < 0.5  # Loose, so that this only catches something far slower than one pass.
+
+
+if __name__ == '__main__':
+    pytest.main()
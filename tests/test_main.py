@@ -0,0 +1,53 @@
+import json
+
+import pytest
+import pygetwindow
+from pygetwindow import Point, STATE_VISIBLE
+from pygetwindow.__main__ import main
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'Editor', STATE_VISIBLE),
+    (2, (50, 50, 300, 300), 'A much longer window title', STATE_VISIBLE),
+    (3, (0, 0, 10, 10), '', 0),
+]
+
+
+def test_stats(fakeBackend, capsys):
+    backend = fakeBackend(ROWS, activeHandle=1)
+    backend.cursorPosition = Point(60, 45)
+    pygetwindow.useBackend(backend)
+
+    assert main(['stats', '--json', '--count', '2', '--interval', '0']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    stats = json.loads(lines[0])
+    assert stats['windows'] == 3 and stats['visibleWindows'] == 2
+    assert stats['calls']['_enumWindowHandles']['count'] == 1
+    assert stats['calls']['_getWindowTitle']['count'] == 3
+    assert stats['titleLengths']['min'] == 0 and stats['titleLengths']['max'] == 26 and stats['titleLengths']['empty'] == 1
+    assert sum(stats['titleLengths']['histogram'].values()) == 3
+    assert len(stats['slowestWindows']) == 3 and set(w['handle'] for w in stats['slowestWindows']) == set([1, 2, 3])
+    assert stats['cursor'] == [60, 45] and stats['resolution'] is None
+
+    assert main(['stats', '--top', '1']) == 0
+    text = capsys.readouterr().out
+    assert 'Windows: 3 (2 visible)' in text and '_getWindowTitle' in text and 'Cursor: 60, 45' in text
+
+
+def test_watch(fakeBackend, capsys, monkeypatch):
+    backend = fakeBackend(ROWS)
+    pygetwindow.useBackend(backend)
+
+    # Change the windows between samples, in place of waiting for the interval.
+    changes = [lambda: backend._setWindowGeometry(1, 10, 0, 100, 100),
+               lambda: (backend.order.remove(3), backend.rows.pop(3))]
+    monkeypatch.setattr('pygetwindow.__main__.time.sleep', lambda seconds: changes.pop(0)())
+    assert main(['stats', '--watch', '--json', '--count', '3']) == 0
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(e['event'], e['handle']) for e in events] == [('moved', 1), ('destroyed', 3)]
+    assert events[0]['rect'] == [10, 0, 110, 100] and events[0]['snapshotTime'] >= 0
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,61 @@
+from __future__ import division, print_function
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, Monitor, STATE_VISIBLE
+
+
+LEFT = Monitor(1, 'left', Rect(0, 0, 1920, 1080), Rect(0, 0, 1920, 1040), 96, True)
+RIGHT = Monitor(2, 'right', Rect(1920, 0, 4480, 1440), Rect(1920, 0, 4480, 1440), 144, False)
+
+
+def test_getMonitors_cache(fakeBackend):
+    backend = fakeBackend([], monitors=[LEFT, RIGHT])
+    pygetwindow.useBackend(backend)
+    assert pygetwindow.getMonitors() == [LEFT, RIGHT]
+    assert pygetwindow.getMonitors() == [LEFT, RIGHT]
+    assert backend.numEnumMonitorsCalls == 1
+
+    # A display change invalidates the cache.
+    backend.monitors = [LEFT]
+    assert pygetwindow.getMonitors() == [LEFT, RIGHT]
+    backend.displayGeneration += 1
+    assert pygetwindow.getMonitors() == [LEFT]
+    assert backend.numEnumMonitorsCalls == 2
+
+
+def test_monitorOf(fakeBackend):
+    backend = fakeBackend([
+        (10, (100, 100, 500, 500), 'left', STATE_VISIBLE),
+        (20, (1800, 0, 2400, 600), 'mostly right', STATE_VISIBLE),
+        (30, (-900, 0, -100, 600), 'off-screen', STATE_VISIBLE),
+    ], monitors=[LEFT, RIGHT])
+    pygetwindow.useBackend(backend)
+    assert pygetwindow.monitorOf(10) == LEFT
+    assert pygetwindow.monitorOf(20) == RIGHT
+    assert pygetwindow.monitorOf(30) == LEFT  # The nearest monitor.
+    assert pygetwindow.monitorOf(pygetwindow.getAllWindows()[1]) == RIGHT
+
+    # With a snapshot, rects are read from it rather than from the backend.
+    snap = pygetwindow.getSnapshot()
+    backend.rows.clear()
+    assert pygetwindow.monitorOf(20, snap) == RIGHT
+    assert pygetwindow.monitorOf(10, snap) == LEFT
+
+
+def test_windowsOnMonitor(fakeBackend, makeSnapshot):
+    pygetwindow.useBackend(fakeBackend([], monitors=[LEFT, RIGHT]))
+    snap = makeSnapshot([
+        (1, (0, 0, 100, 100), 'a', STATE_VISIBLE),
+        (2, (2000, 0, 2100, 100), 'b', STATE_VISIBLE),
+        (3, (10, 10, 50, 50), 'c', STATE_VISIBLE),
+    ])
+    assert [record.handle for record in pygetwindow.windowsOnMonitor(LEFT, snap)] == [1, 3]
+    assert [record.handle for record in pygetwindow.windowsOnMonitor(RIGHT, snap)] == [2]
+
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        pygetwindow.windowsOnMonitor(Monitor(99, 'gone', Rect(0, 0, 1, 1), Rect(0, 0, 1, 1), 96, False), snap)
+
+
+if __name__ == '__main__':
+    pytest.main()
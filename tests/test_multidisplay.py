@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+from pygetwindow import MultiDisplay, DisplayWindow, PyGetWindowException, STATE_VISIBLE
+
+
+DISPLAYS = {
+    ':1': [(1, (0, 0, 100, 100), 'Editor - app under test', STATE_VISIBLE)],
+    ':2': [(1, (0, 0, 200, 200), 'Browser', STATE_VISIBLE), (2, (10, 10, 50, 50), 'Editor', STATE_VISIBLE)],
+}
+
+
+@pytest.fixture
+def displays(fakeBackend):
+    created = []
+    down = set()
+    barriers = []  # A barrier here makes every display wait until all of them are being queried.
+
+    class DisplayBackend(fakeBackend):
+        def __init__(self, displayName):
+            fakeBackend.__init__(self, DISPLAYS[displayName])
+            self.displayName = displayName
+            self.closed = False
+            created.append(self)
+
+        def _enumWindowHandles(self):
+            if self.displayName in down:
+                raise PyGetWindowException('Could not open the X display %r.' % (self.displayName))
+            for barrier in barriers:
+                barrier.wait(5)
+            return fakeBackend._enumWindowHandles(self)
+
+        def close(self):
+            self.closed = True
+
+    return DisplayBackend, created, down, barriers
+
+
+def test_queries(displays):
+    DisplayBackend, created, down, barriers = displays
+    barriers.append(threading.Barrier(2))  # Fails unless the displays are queried concurrently.
+    with MultiDisplay([':1', ':2'], backendFactory=DisplayBackend) as multi:
+        windows = multi.getAllWindows()
+        assert [(w.display, w.window._hWnd) for w in windows] == [(':1', 1), (':2', 1), (':2', 2)]
+        assert isinstance(windows[0], DisplayWindow)
+
+        editors = multi.getWindowsWithTitle('editor')
+        assert [(w.display, w.window.title) for w in editors] == [(':1', 'Editor - app under test'), (':2', 'Editor')]
+
+        snapshots = multi.getSnapshot()
+        assert list(snapshots) == [':1', ':2'] and [len(s) for s in snapshots.values()] == [1, 2]
+        assert multi.errors == {}
+        assert len(created) == 2  # The connections are reused.
+    assert all(backend.closed for backend in created)
+
+
+def test_unreachable_display(displays):
+    DisplayBackend, created, down, barriers = displays
+    multi = MultiDisplay([':1', ':2'], workers=1, backendFactory=DisplayBackend)
+    down.add(':1')
+    assert [w.display for w in multi.getAllWindows()] == [':2', ':2']
+    assert list(multi.errors) == [':1'] and created[0].closed
+
+    # The failed display is connected to again on the next query.
+    down.clear()
+    assert [w.display for w in multi.getAllWindows()] == [':1', ':2', ':2']
+    assert multi.errors == {} and len(created) == 3
+
+    with pytest.raises(PyGetWindowException):
+        MultiDisplay([':1', ':1'])
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,86 @@
+from __future__ import division, print_function
+
+import random
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, STATE_VISIBLE, STATE_MINIMIZED
+
+
+def bruteForceVisibleAreas(rows):
+    """Returns each window's visible area by counting uncovered unit cells."""
+    covered = set()
+    areas = []
+    for handle, (left, top, right, bottom), title, flags in rows:
+        cells = set((x, y) for x in range(left, right) for y in range(top, bottom))
+        if flags & STATE_VISIBLE and not flags & STATE_MINIMIZED:
+            areas.append(len(cells - covered))
+            covered |= cells
+        else:
+            areas.append(0)
+    return areas
+
+
+def test_occlusionReport(makeSnapshot):
+    snap = makeSnapshot([
+        (1, (0, 0, 10, 10), 'top', STATE_VISIBLE),
+        (2, (5, 5, 15, 15), 'partly covered', STATE_VISIBLE),
+        (3, (1, 1, 9, 9), 'fully covered', STATE_VISIBLE),
+        (4, (20, 20, 30, 30), 'minimized', STATE_VISIBLE | STATE_MINIMIZED),
+        (5, (20, 20, 30, 30), 'under a minimized window', STATE_VISIBLE),
+    ])
+    report = pygetwindow.occlusionReport(snap)
+    assert list(report) == [1, 2, 3, 4, 5]
+    assert report[1] == (100, 100, False)
+    assert report[2] == (100, 75, False)
+    assert report[3].occluded and report[3].visibleArea == 0
+    assert report[4].occluded
+    assert report[5] == (100, 100, False)
+
+
+def test_visibleRegion(makeSnapshot):
+    snap = makeSnapshot([
+        (1, (0, 0, 10, 10), 'top', STATE_VISIBLE),
+        (2, (5, 5, 15, 15), 'partly covered', STATE_VISIBLE),
+    ])
+    assert pygetwindow.visibleRegion(1, snap) == [Rect(0, 0, 10, 10)]
+    assert sorted(pygetwindow.visibleRegion(2, snap)) == [Rect(5, 10, 15, 15), Rect(10, 5, 15, 10)]
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        pygetwindow.visibleRegion(3, snap)
+
+
+def test_occlusion_matches_brute_force(makeSnapshot):
+    rng = random.Random(0)
+    for trial in range(200):
+        rows = []
+        for handle in range(rng.randint(0, 12)):
+            left, top = rng.randint(0, 20), rng.randint(0, 20)
+            rows.append((handle, (left, top, left + rng.randint(0, 10), top + rng.randint(0, 10)), '',
+                         rng.choice([STATE_VISIBLE, STATE_VISIBLE, STATE_VISIBLE | STATE_MINIMIZED, 0])))
+        snap = makeSnapshot(rows)
+        report = pygetwindow.occlusionReport(snap)
+        assert [occlusion.visibleArea for occlusion in report.values()] == bruteForceVisibleAreas(rows)
+        for handle in report:
+            rects = pygetwindow.visibleRegion(handle, snap)
+            assert sum((r.right - r.left) * (r.bottom - r.top) for r in rects) == report[handle].visibleArea
+
+
+def test_occlusionReport_benchmark(makeSnapshot):
+    rng = random.Random(0)
+    rows = []
+    for handle in range(5000):
+        width, height = rng.randint(100, 1200), rng.randint(80, 900)
+        left, top = rng.randint(-100, 3840 - width // 2), rng.randint(0, 2160 - height // 2)
+        rows.append((handle, (left, top, left + width, top + height), '', STATE_VISIBLE))
+    snap = makeSnapshot(rows)
+    startTime = time.time()
+    report = pygetwindow.occlusionReport(snap)
+    elapsed = time.time() - startTime
+    print('occlusionReport() of 5000 windows: %.1f ms' % (elapsed * 1000))
+    assert len(report) == 5000
+    assert elapsed < 0.5  # Loose, so that this only catches quadratic behavior.
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,90 @@
+from __future__ import division, print_function
+
+import os
+import subprocess
+import sys
+
+import pytest
+import pygetwindow
+from pygetwindow import STATE_VISIBLE
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'editor 1', STATE_VISIBLE),
+    (2, (10, 10, 60, 60), 'browser', STATE_VISIBLE),
+    (3, (20, 20, 80, 80), 'editor 2', STATE_VISIBLE),
+    (4, (30, 30, 90, 90), 'no pid', STATE_VISIBLE),
+]
+
+
+@pytest.fixture
+def processBackend(fakeBackend):
+    backend = fakeBackend(ROWS)
+    backend.pids = {1: 100, 2: 200, 3: 300}
+    backend.processPaths = {100: 'C:\\Windows\\notepad.exe', 200: '/usr/bin/firefox', 300: 'C:\\Windows\\NOTEPAD.EXE'}
+    pygetwindow.useBackend(backend)
+    return backend
+
+
+def test_pid_and_processName(processBackend):
+    first, second, third, fourth = pygetwindow.getAllWindows()
+    assert first.pid == 100
+    assert first.processName == 'notepad.exe'
+    assert second.processName == 'firefox'
+    assert fourth.pid is None and fourth.processName is None
+
+
+def test_windowsOfProcess(processBackend):
+    snap = pygetwindow.getSnapshot()
+    assert [record.handle for record in pygetwindow.windowsOfProcess(100, snap)] == [1]
+    assert pygetwindow.windowsOfProcess(999, snap) == []
+
+    # The pids are only looked up once per snapshot.
+    processBackend.numGetWindowPidCalls = 0
+    pygetwindow.windowsOfProcess(200, snap)
+    pygetwindow.windowsOfProcess(300, snap)
+    assert processBackend.numGetWindowPidCalls == 0
+
+
+def test_windowsOfExecutable(processBackend):
+    snap = pygetwindow.getSnapshot()
+    assert [record.handle for record in pygetwindow.windowsOfExecutable('notepad.exe', snap)] == [1, 3]
+    assert [record.handle for record in pygetwindow.windowsOfExecutable('/usr/bin/FIREFOX', snap)] == [2]
+    assert pygetwindow.windowsOfExecutable('calc.exe', snap) == []
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc')
+def test_linux_process_path_cache():
+    from pygetwindow import _pygetwindow_linux
+
+    assert _pygetwindow_linux._getProcessPath(os.getpid()) == os.path.realpath(sys.executable)
+
+    process = subprocess.Popen([sys.executable, '-c', 'import sys; sys.stdin.read()'], stdin=subprocess.PIPE)
+    pid = process.pid
+    assert _pygetwindow_linux._getProcessPath(pid) is not None
+    assert pid in _pygetwindow_linux._processPaths
+    process.communicate()
+    # Once the process has exited, its entry is dropped.
+    assert _pygetwindow_linux._getProcessPath(pid) is None
+    assert pid not in _pygetwindow_linux._processPaths
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc')
+def test_linux_process_path_cache_is_bounded(monkeypatch):
+    from pygetwindow import _pygetwindow_linux
+
+    monkeypatch.setattr(_pygetwindow_linux, '_MAX_PROCESS_PATHS', 2)
+    processes = [subprocess.Popen([sys.executable, '-c', 'import sys; sys.stdin.read()'], stdin=subprocess.PIPE) for i in range(3)]
+    try:
+        for process in processes:
+            assert _pygetwindow_linux._getProcessPath(process.pid) is not None
+        # The least recently used entry (and its pidfd) was dropped.
+        assert list(_pygetwindow_linux._processPaths)[-2:] == [processes[1].pid, processes[2].pid]
+        assert processes[0].pid not in _pygetwindow_linux._processPaths
+    finally:
+        for process in processes:
+            process.communicate()
+
+
+if __name__ == '__main__':
+    pytest.main()
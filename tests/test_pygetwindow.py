@@ -23,6 +23,7 @@ except ImportError:
 
 
 
+@pytest.mark.skipif(sys.platform != 'win32', reason='This test opens Notepad. The X11 tests are in test_x11.py.')
 def test_basic_win32():
     subprocess.Popen('notepad')
     time.sleep(0.5)
@@ -0,0 +1,82 @@
+from __future__ import division, print_function
+
+import json
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, STATE_VISIBLE
+
+
+ROWS = [
+    (100, (0, 0, 800, 600), 'Untitled - Notepad', STATE_VISIBLE),
+    (200, (50, 50, 250, 150), 'Calculator', STATE_VISIBLE),
+    (300, (400, 300, 900, 700), 'notepad++', STATE_VISIBLE),
+]
+
+
+@pytest.mark.parametrize('filename', ['session.jsonl', 'session.jsonl.gz'])
+def test_record_and_replay(tmp_path, fakeBackend, filename):
+    path = str(tmp_path / filename)
+
+    pygetwindow.useBackend(fakeBackend(ROWS, activeHandle=200))
+    with pygetwindow.SessionRecorder(path):
+        assert [w._hWnd for w in pygetwindow.getWindowsAt(100, 100)] == [100, 200]
+        notepads = pygetwindow.getWindowsWithTitle('NOTEPAD')
+        assert [w._hWnd for w in notepads] == [100, 300]
+        notepads[0].moveTo(10, 20)
+        assert notepads[0].topleft == (10, 20)
+        notepads[1].minimize()
+        assert notepads[1].isMinimized
+        assert pygetwindow.getActiveWindowTitle() == 'Calculator'
+        snapshot = pygetwindow.getSnapshot()
+
+    with pygetwindow.ReplayBackend(path) as replay:
+        assert replay.numCalls > 0
+        assert [w._hWnd for w in pygetwindow.getWindowsAt(100, 100)] == [100, 200]
+        notepads = pygetwindow.getWindowsWithTitle('NOTEPAD')
+        assert [w._hWnd for w in notepads] == [100, 300]
+        assert isinstance(notepads[0], pygetwindow.ReplayWindow)
+        notepads[0].moveTo(10, 20)
+        assert notepads[0].topleft == (10, 20)
+        notepads[1].minimize()
+        assert notepads[1].isMinimized
+        assert pygetwindow.getActiveWindowTitle() == 'Calculator'
+        assert not any(pygetwindow.diff(snapshot, pygetwindow.getSnapshot()))
+
+        # Calls that were never recorded can't be replayed.
+        with pytest.raises(pygetwindow.PyGetWindowException):
+            replay._getWindowTitle(999)
+
+
+def test_replay_errors_and_rewind(tmp_path, fakeBackend):
+    path = str(tmp_path / 'session.jsonl')
+    backend = fakeBackend(ROWS)
+    with pygetwindow.SessionRecorder(path, backend) as recorder:
+        assert recorder._getWindowRect(100) == Rect(0, 0, 800, 600)
+        backend._setWindowGeometry(100, 5, 5, 10, 10)
+        assert recorder._getWindowRect(100) == Rect(5, 5, 15, 15)
+        with pytest.raises(pygetwindow.PyGetWindowException):
+            recorder._getWindowRect(999)
+        with open(path) as fileObj:  # The lines can be read while the recording is still open.
+            lines = fileObj.readlines()
+        assert len(lines) == 4 and json.loads(lines[0])['format'] == 'pygetwindow-session'
+
+    replay = pygetwindow.ReplayBackend(path)
+    assert replay._getWindowRect(100) == Rect(0, 0, 800, 600)
+    assert replay._getWindowRect(100) == Rect(5, 5, 15, 15)
+    assert replay._getWindowRect(100) == Rect(5, 5, 15, 15)  # The last result repeats.
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        replay._getWindowRect(999)
+    replay.rewind()
+    assert replay._getWindowRect(100) == Rect(0, 0, 800, 600)
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / 'other.jsonl'
+    path.write_text(u'[1, 2, 3]\n')
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        pygetwindow.ReplayBackend(str(path))
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,164 @@
+from __future__ import division, print_function
+
+import re
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import Rule, WindowRules, STATE_VISIBLE, STATE_MAXIMIZED
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'Untitled - Notepad', STATE_VISIBLE),
+    (2, (10, 10, 60, 60), 'Mozilla Firefox', STATE_VISIBLE),
+    (3, (20, 20, 80, 80), 'notes.txt - Notepad', STATE_VISIBLE),
+]
+
+
+@pytest.fixture
+def rulesBackend(fakeBackend):
+    backend = fakeBackend(ROWS)
+    backend.classNames = {1: 'Notepad', 2: 'MozillaWindowClass', 3: 'Notepad'}
+    backend.pids = {1: 100, 2: 200, 3: 300}
+    backend.processPaths = {100: 'C:\\Windows\\notepad.exe', 200: 'C:\\Program Files\\Mozilla Firefox\\firefox.exe',
+                            300: 'C:\\Windows\\notepad.exe'}
+    pygetwindow.useBackend(backend)
+    return backend
+
+
+def test_match():
+    rules = WindowRules([
+        Rule(title='notes.txt', position=(0, 0)),
+        Rule(className='notepad', process='NOTEPAD.EXE', size=(500, 400)),
+        {'titleRegex': r'^mozilla\s', 'state': 'maximize'},
+        Rule(process='C:\\tools\\calc.exe', zOrder='bottom'),
+    ])
+    assert rules.match('Untitled - Notepad', 'Notepad', 'notepad.exe') is rules.rules[1]
+    # The first matching rule wins.
+    assert rules.match('notes.txt - Notepad', 'Notepad', 'notepad.exe') is rules.rules[0]
+    assert rules.match('Mozilla Firefox', 'MozillaWindowClass', 'firefox.exe') is rules.rules[2]
+    assert rules.match('Firefox - Mozilla', 'MozillaWindowClass', 'firefox.exe') is None
+    assert rules.match('Calculator', '', 'calc.exe') is rules.rules[3]
+    assert rules.match('Untitled - Notepad', 'Edit', 'notepad.exe') is None
+    assert rules.match('anything') is None
+
+
+def test_match_overlapping_titles():
+    rules = WindowRules([Rule(title='window 1', className='a'), Rule(title='window 12', className='b'), Rule(className='b')])
+    assert rules.match('window 12', 'a') is rules.rules[0]
+    assert rules.match('window 12', 'B') is rules.rules[1]
+    assert rules.match('window 1', 'b') is rules.rules[2]
+
+
+def test_match_special_characters():
+    # Titles are plain text; only titleRegex is a regular expression.
+    rules = WindowRules([Rule(title='(1) C++ [x]'), Rule(titleRegex='a.c')])
+    assert rules.match('Inbox (1) c++ [X]') is rules.rules[0]
+    assert rules.match('xabcx') is rules.rules[1]
+    assert rules.match('C++') is None
+
+
+def test_match_patterns_that_cant_be_alternated(rulesBackend):
+    # These patterns can't go in one alternation regex, so they're searched for on their own, in rule order.
+    rules = WindowRules([
+        Rule(titleRegex='(?P<r1>calc)ulator'),  # Uses the name of a group in the alternation.
+        Rule(titleRegex='(?i)notepad', position=(1, 2)),  # A global inline flag.
+        Rule(titleRegex='(?P<word>\\w+) - (?P=word)'),
+        Rule(titleRegex='(?P<word>x)'),  # Uses the same group name as the rule before it.
+        Rule(titleRegex='(\\w)\\1'),  # A numbered backreference.
+        Rule(title='untitled'),
+    ])
+    assert rules.match('Untitled - Notepad') is rules.rules[1]
+    assert rules.match('Calculator') is rules.rules[0]
+    assert rules.match('abc - ABC') is rules.rules[2]
+    assert rules.match('xx') is rules.rules[3]
+    assert rules.match('yy') is rules.rules[4]
+    assert rules.match('untitled') is rules.rules[5]
+    assert rules.match('nothing') is None
+
+    with rules:
+        rulesBackend.sendEvent('created', 1, time.time())
+    assert rulesBackend.rows[1][1] == (1, 2, 101, 102)
+
+
+def test_match_against_brute_force():
+    patterns = ['note', 'fire', 'pad$', '^un', 'x', 't.t', 'mozilla f', 'z+i']
+    rules = WindowRules([Rule(titleRegex=pattern) for pattern in patterns])
+    titles = ['Untitled - Notepad', 'Mozilla Firefox', 'notes.txt - Notepad', 'zzzip', 'nothing', '']
+    for title in titles:
+        expected = [i for i, pattern in enumerate(patterns) if re.search(pattern, title, re.IGNORECASE)]
+        rule = rules.match(title)
+        assert (rules.rules.index(rule) if rule is not None else None) == (expected[0] if expected else None)
+
+
+def test_apply(rulesBackend):
+    rules = WindowRules([
+        Rule(title='notes.txt', position=(5, 6), zOrder='top'),
+        Rule(process='notepad.exe', size=(500, 400)),
+        Rule(className='MozillaWindowClass', position=(100, 100), size=(800, 600), state='maximize'),
+    ])
+    assert rules.applyToAll() == 3
+    rows = rulesBackend.rows
+    assert rows[1][1] == (0, 0, 500, 400)
+    assert rows[2][1] == (100, 100, 900, 700) and rows[2][3] & STATE_MAXIMIZED
+    assert rows[3][1] == (5, 6, 65, 66)
+    assert rulesBackend.order[0] == 3
+
+    stats = rules.stats()
+    assert [s.matches for s in stats] == [1, 1, 1]
+    assert all(s.failures == 0 and 0 <= s.meanLatency <= s.maxLatency for s in stats)
+
+
+def test_apply_reads_only_what_rules_need(rulesBackend):
+    rulesBackend._getWindowPid = None  # No rule looks at the process.
+    rules = WindowRules([Rule(className='Notepad', title='notes', position=(0, 0))])
+    assert rules.apply(2) is None
+    assert rules.apply(3) is rules.rules[0]
+
+
+def test_creation_events(rulesBackend):
+    rules = WindowRules([Rule(title='new window', position=(300, 200), size=(640, 480))])
+    with rules:
+        rulesBackend.rows[4] = (4, (0, 0, 10, 10), 'A New Window', STATE_VISIBLE)
+        rulesBackend.order.insert(0, 4)
+        createdAt = time.time()
+        rulesBackend.sendEvent('created', 4, createdAt)
+        assert rulesBackend.rows[4][1] == (300, 200, 940, 680)
+    assert rulesBackend.watchers == []
+    stats = rules.stats()[0]
+    assert stats.matches == 1 and stats.failures == 0
+    assert 0 <= stats.maxLatency < 1.0
+
+
+def test_failures(rulesBackend):
+    rules = WindowRules([Rule(title='Firefox', position=(0, 0))])
+    def fail(*args):
+        raise pygetwindow.PyGetWindowException('The window was closed.')
+
+    rulesBackend._setWindowGeometry = fail
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        rules.apply(2)
+    assert rules.stats()[0] == (1, 1, None, None)
+
+
+def test_invalid_rules():
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Rule(title='a', titleRegex='b')
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Rule(state='fullscreen')
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Rule(zOrder='middle')
+
+
+def test_benchmark_matcher():
+    # One compiled matcher answers for all of the rules at once.
+    rules = WindowRules([Rule(title='window %d' % (i), className='class%d' % (i % 10)) for i in range(200)])
+    start = time.time()
+    for i in range(2000):
+        rules.match('A window %d title' % (i % 250), 'CLASS%d' % (i % 10))
+    assert time.time() - start < 1.0
+    assert rules.match('window 57', 'class7') is rules.rules[57]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,249 @@
+from __future__ import division, print_function
+
+import array
+import pickle
+import struct
+import time
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, Snapshot, STATE_VISIBLE, STATE_MINIMIZED, STATE_ACTIVE
+
+
+def test_snapshot_columns(makeSnapshot):
+    snap = makeSnapshot([(10, (0, 0, 100, 50), 'Notepad', STATE_VISIBLE), (20, (5, 5, 15, 15), 'Calc', STATE_VISIBLE)])
+    assert len(snap) == 2
+    assert snap.rect(1) == Rect(5, 5, 15, 15)
+    assert snap[0].title == 'Notepad'
+    assert snap[-1].handle == 20
+    assert snap.indexOf(20) == 1
+    assert snap.indexOf(30) == -1
+    assert 10 in snap and 30 not in snap
+    assert snap.get(20).rect == Rect(5, 5, 15, 15)
+    assert snap.get(30) is None
+    assert [record.handle for record in snap] == [10, 20]
+
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot([1, 2], [0, 0, 1, 1], ['a', 'b'], [0, 0])
+
+
+def test_takeSnapshot(fakeBackend):
+    backend = fakeBackend([(1, (0, 0, 10, 10), 'one', STATE_VISIBLE), (2, (1, 1, 5, 5), 'two', STATE_VISIBLE)], activeHandle=2)
+    snap = pygetwindow._snapshot.takeSnapshot(backend)
+    assert snap.handles == [1, 2]
+    assert list(snap.rects) == [0, 0, 10, 10, 1, 1, 5, 5]
+    assert snap.titles == ['one', 'two']
+    assert list(snap.flags) == [STATE_VISIBLE, STATE_VISIBLE | STATE_ACTIVE]
+
+
+def test_takeSnapshot_closed_window(fakeBackend):
+    backend = fakeBackend([(1, (0, 0, 10, 10), 'one', STATE_VISIBLE), (2, (1, 1, 5, 5), 'two', STATE_VISIBLE)])
+    backend.order.insert(1, 3)  # Enumerated, but closed before it could be read.
+    for workers in (None, 4):
+        snap = pygetwindow._snapshot.takeSnapshot(backend, workers)
+        assert snap.handles == [1, 2] and snap.titles == ['one', 'two']
+
+
+def test_diff(makeSnapshot):
+    old = makeSnapshot([
+        (1, (0, 0, 100, 100), 'unchanged', STATE_VISIBLE),
+        (2, (0, 0, 100, 100), 'moves', STATE_VISIBLE),
+        (3, (0, 0, 100, 100), 'resizes', STATE_VISIBLE),
+        (4, (0, 0, 100, 100), 'old title', STATE_VISIBLE),
+        (5, (0, 0, 100, 100), 'minimizes', STATE_VISIBLE),
+        (6, (0, 0, 100, 100), 'destroyed', STATE_VISIBLE),
+    ])
+    new = makeSnapshot([
+        (7, (1, 2, 3, 4), 'created', STATE_VISIBLE),
+        (1, (0, 0, 100, 100), 'unchanged', STATE_VISIBLE),
+        (2, (10, 10, 110, 110), 'moves', STATE_VISIBLE),
+        (3, (0, 0, 200, 200), 'resizes', STATE_VISIBLE),
+        (4, (0, 0, 100, 100), 'new title', STATE_VISIBLE),
+        (5, (0, 0, 100, 100), 'minimizes', STATE_VISIBLE | STATE_MINIMIZED),
+    ])
+    changes = pygetwindow.diff(old, new)
+    assert list(changes.created) == [7]
+    assert changes.created[7].title == 'created'
+    assert list(changes.destroyed) == [6]
+    assert list(changes.moved) == [2]
+    assert changes.moved[2][1].rect == Rect(10, 10, 110, 110)
+    assert list(changes.resized) == [3]
+    assert list(changes.retitled) == [4]
+    assert changes.retitled[4][0].title == 'old title'
+    assert list(changes.stateChanged) == [5]
+
+    # Diffing a snapshot against itself finds nothing.
+    assert not any(pygetwindow.diff(new, new))
+
+    # hash(-1) == hash(-2), so these rows hash the same, but the move is still found.
+    old = makeSnapshot([(1, (-1, 0, 99, 100), 'window', STATE_VISIBLE)])
+    new = makeSnapshot([(1, (-2, 0, 99, 100), 'window', STATE_VISIBLE)])
+    assert list(pygetwindow.diff(old, new).moved) == [1]
+
+
+def test_changeToken(fakeBackend):
+    rows = [(1, (0, 0, 10, 10), 'one', STATE_VISIBLE), (2, (1, 1, 5, 5), 'two', STATE_VISIBLE)]
+    backend = fakeBackend(rows)
+    token = pygetwindow._snapshot.changeToken(backend)
+    assert token == pygetwindow._snapshot.takeSnapshot(backend).fingerprint()
+
+    # Titles aren't part of the token, but rects and z-order are.
+    backend.rows[1] = (1, (0, 0, 10, 10), 'renamed', STATE_VISIBLE)
+    assert pygetwindow._snapshot.changeToken(backend) == token
+    backend.order.reverse()
+    assert pygetwindow._snapshot.changeToken(backend) != token
+    backend.order.reverse()
+    backend.rows[2] = (2, (1, 1, 6, 6), 'two', STATE_VISIBLE)
+    assert pygetwindow._snapshot.changeToken(backend) != token
+
+    # A window that closes between enumeration and reading its rect is left out, as takeSnapshot() leaves it out.
+    backend.order.insert(1, 3)
+    assert pygetwindow._snapshot.changeToken(backend) == pygetwindow._snapshot.takeSnapshot(backend).fingerprint()
+
+
+def test_pollUntilChanged(fakeBackend):
+    backend = fakeBackend([(1, (0, 0, 10, 10), 'one', STATE_VISIBLE)])
+    assert pygetwindow._snapshot.pollUntilChanged(backend, interval=0.001, backoff=2.0, timeout=0.02) is None
+
+    token = pygetwindow._snapshot.changeToken(backend)
+    backend.rows[2] = (2, (1, 1, 5, 5), 'two', STATE_VISIBLE)
+    backend.order.append(2)
+    snap = pygetwindow._snapshot.pollUntilChanged(backend, interval=0.001, token=token)
+    assert snap.handles == [1, 2]
+
+
+def test_refresh(fakeBackend):
+    rows = [(1, (0, 0, 10, 10), 'one', STATE_VISIBLE), (2, (1, 1, 5, 5), 'two', STATE_VISIBLE)]
+    backend = fakeBackend(rows)
+    snap = pygetwindow._snapshot.takeSnapshot(backend)
+    rects, titles = snap.rects, snap.titles
+    fingerprint = snap.fingerprint()
+
+    # Only the rects are read again, during a drag for example.
+    backend.numCalls = {}
+    for name in ('_getWindowRect', '_getWindowTitle', '_getWindowState', '_getWindowFlags'):
+        def counted(handle, name=name, primitive=getattr(backend, name)):
+            backend.numCalls[name] = backend.numCalls.get(name, 0) + 1
+            return primitive(handle)
+        setattr(backend, name, counted)
+    backend.rows[2] = (2, (3, 3, 7, 7), 'renamed', STATE_VISIBLE)
+    assert snap.refresh(fields=('rect',)) == [2]
+    assert backend.numCalls == {'_getWindowRect': 2}
+    assert snap.rect(1) == Rect(3, 3, 7, 7) and snap.titles[1] == 'two'
+    assert snap.rects is rects and snap.fingerprint() != fingerprint  # Updated in place.
+    assert snap.readTime(2, 'rect') > snap.timestamp and snap.readTime(2, 'title') == snap.timestamp
+    assert snap.age(2, 'title', now=snap.timestamp + 5) == 5
+
+    # Only the given windows are read.
+    backend.numCalls = {}
+    assert snap.refresh(fields=('title', 'flags'), handles=[2, 99]) == [2]
+    assert backend.numCalls == {'_getWindowTitle': 1, '_getWindowFlags': 1}
+    assert snap.titles is titles and snap.titles[1] == 'renamed'
+
+    # Dirty windows.
+    snap.markDirty(1, fields=('title',))
+    assert snap.dirty() == [1]
+    backend.numCalls = {}
+    assert snap.refresh(fields=('title',), handles='dirty') == []
+    assert backend.numCalls == {'_getWindowTitle': 1} and snap.dirty() == []
+
+    # A window that closed keeps its values and stays dirty.
+    backend._closeWindow(1)
+    assert snap.refresh(fields=('rect',)) == []
+    assert snap.dirty() == [1] and snap.rect(0) == Rect(0, 0, 10, 10)
+
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        snap.refresh(fields=('color',))
+
+
+def test_snapshot_bytes(fakeBackend, tmp_path, makeSnapshot):
+    snap = makeSnapshot([(10, (-8, -8, 1928, 1048), 'Notepad \u2014 caf\xe9', STATE_VISIBLE | STATE_ACTIVE), (2 ** 40, (5, 5, 15, 15), '', 0),
+                         (30, (0, 0, 1, 1), '\U0001f600', STATE_MINIMIZED)])
+    data = snap.toBytes()
+    loaded = Snapshot.fromBuffer(data)
+    assert len(loaded) == 3 and loaded.timestamp == snap.timestamp
+    assert list(loaded) == list(snap)
+    assert loaded.titles[-1] == '\U0001f600' and loaded.titles[1:] == ['', '\U0001f600']
+    assert loaded.get(2 ** 40).rect == Rect(5, 5, 15, 15)
+    assert loaded.fingerprint() == snap.fingerprint()
+    assert not any(pygetwindow.diff(snap, loaded))
+    assert Snapshot.fromBuffer(makeSnapshot([]).toBytes()).titles == []
+
+    # Files are memory-mapped, and the columns are views of the mapping until refresh() changes them.
+    path = str(tmp_path / 'snapshot.bin')
+    snap.save(path)
+    loaded = Snapshot.load(path)
+    assert isinstance(loaded.rects, memoryview) and list(loaded) == list(snap)
+    backend = fakeBackend([(10, (0, 0, 50, 50), 'Notepad', STATE_VISIBLE), (2 ** 40, (5, 5, 15, 15), '', 0)])
+    assert loaded.refresh(handles=[10], backend=backend) == [10]
+    assert loaded[0] == (10, Rect(0, 0, 50, 50), 'Notepad', STATE_VISIBLE)
+
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot.fromBuffer(b'not a snapshot' * 4)
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot.fromBuffer(data[:-8])
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot.fromBuffer(data[:8] + b'\x63' + data[9:])  # A newer format version.
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot.fromBuffer(data[:8] + b'\x00' + data[9:])  # There is no format version 0.
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot.fromBuffer(data[:9] + b'\x07' + data[10:])  # Not a byte order.
+    emptyPath = tmp_path / 'empty.bin'
+    emptyPath.write_bytes(b'')
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        Snapshot.load(str(emptyPath))
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        makeSnapshot([('handle', (0, 0, 1, 1), '', 0)]).toBytes()
+
+
+def test_snapshot_bytes_columns(makeSnapshot):
+    from pygetwindow._live import _sameWindows
+
+    snap = makeSnapshot([(10, (0, 0, 10, 10), 'first', STATE_VISIBLE), (20, (5, 5, 15, 15), 'second', 0)])
+    data = snap.toBytes()
+    loaded = Snapshot.fromBuffer(data)
+    # The loaded columns compare equal to the lists and arrays of other snapshots, either way around.
+    assert loaded.handles == snap.handles and snap.handles == loaded.handles and loaded.handles == [10, 20]
+    assert loaded.handles[::-1] == [20, 10] and 20 in loaded.handles
+    assert loaded.rects == snap.rects and loaded.titles == snap.titles and loaded.flags == snap.flags
+    assert _sameWindows(snap, loaded)
+
+    unpickled = pickle.loads(pickle.dumps(loaded))
+    assert list(unpickled) == list(snap) and unpickled.timestamp == snap.timestamp
+    assert isinstance(unpickled.rects, array.array)
+
+    # The title offsets must start at 0, never go down, and end at the end of the title blob.
+    offsetsStart = len(data) - len('firstsecond') - 16
+    for offsets in ((1, 5, 11), (0, 12, 11), (0, 5, 10)):
+        corrupt = data[:offsetsStart] + struct.pack('=3I', *offsets) + data[offsetsStart + 12:]
+        with pytest.raises(pygetwindow.PyGetWindowException):
+            Snapshot.fromBuffer(corrupt)
+
+
+def test_snapshot_bytes_benchmark(tmp_path):
+    count = 100000
+    rects = []
+    for i in range(count):
+        rects.extend((i % 1920, i % 1080, i % 1920 + 640, i % 1080 + 480))
+    snap = Snapshot(range(count), rects, ['Window %d - Application' % (i) for i in range(count)], [STATE_VISIBLE] * count, timestamp=0)
+    path = str(tmp_path / 'snapshot.bin')
+
+    startTime = time.time()
+    data = snap.toBytes()
+    writeTime = time.time() - startTime
+    with open(path, 'wb') as fileObj:
+        fileObj.write(data)
+    startTime = time.time()
+    loaded = Snapshot.load(path)
+    loadTime = time.time() - startTime
+    assert isinstance(loaded.rects, memoryview) and isinstance(loaded.flags, memoryview)  # Loading didn't copy the columns.
+    startTime = time.time()
+    assert list(loaded) == list(snap)
+    readTime = time.time() - startTime
+    print('toBytes() of %d windows: %.1f ms (%.0f MB/s, %d bytes); load(): %.2f ms; reading every row: %.1f ms'
+          % (count, writeTime * 1000, len(data) / writeTime / 1e6, len(data), loadTime * 1000, readTime * 1000))
+    assert len(data) < count * 64  # 36 bytes of columns and ~24 bytes of title per window.
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,83 @@
+import time
+import types
+
+import pytest
+import pygetwindow
+from pygetwindow import GeometryStream, STATE_VISIBLE
+
+
+@pytest.fixture
+def streamBackend(fakeBackend):
+    backend = fakeBackend([(1, (0, 0, 100, 50), 'follower', STATE_VISIBLE)])
+    backend.writes = []
+    backend.numReads = 0
+    setWindowGeometry = backend._setWindowGeometry
+    getWindowRect = backend._getWindowRect
+
+    def countedSetWindowGeometry(handle, left, top, width, height):
+        backend.writes.append((left, top, width, height))
+        setWindowGeometry(handle, left, top, width, height)
+
+    def countedGetWindowRect(handle):
+        backend.numReads += 1
+        return getWindowRect(handle)
+
+    backend._setWindowGeometry = countedSetWindowGeometry
+    backend._getWindowRect = countedGetWindowRect
+    pygetwindow.useBackend(backend)
+    return backend
+
+
+def test_coalescing(streamBackend):
+    stream = GeometryStream(1)
+    for x in range(100):
+        stream.set(x, 2 * x)
+    assert stream.flush()
+    # Only the latest target is written, and the size was read just once.
+    assert streamBackend.writes == [(99, 198, 100, 50)] and streamBackend.numReads == 1
+
+    stream.set(99, 198)  # Where the window already is.
+    assert not stream.flush() and not stream.flush()
+    stream.set(5, 5, 200, 200)
+    stream.flush()
+    assert streamBackend.rows[1][1] == (5, 5, 205, 205) and streamBackend.numReads == 1
+
+    stats = stream.stats()
+    assert (stats.received, stats.applied, stats.dropped, stats.skipped) == (102, 2, 99, 1)
+    assert 0 <= stats.meanLatency <= stats.maxLatency
+
+
+def test_rate_limit(streamBackend, monkeypatch, waitFor):
+    # The stream's clock only moves when the test moves it, so each write can be allowed explicitly.
+    now = [100.0]
+    monkeypatch.setattr(pygetwindow._stream, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    window = pygetwindow.getAllWindows()[0]
+    with GeometryStream(window, rate=20) as stream:
+        stream.set(1, 0)
+        waitFor(lambda: streamBackend.writes == [(1, 0, 100, 50)])
+        for x in range(2, 50):
+            stream.set(x, 0)
+        time.sleep(0.1)
+        assert len(streamBackend.writes) == 1  # The next write isn't due until 1/20th of a second has passed.
+
+        now[0] += 0.05
+        waitFor(lambda: len(streamBackend.writes) == 2)
+        assert streamBackend.writes[-1] == (49, 0, 100, 50)
+        stream.set(50, 0)
+        time.sleep(0.1)
+        assert len(streamBackend.writes) == 2
+    # stop() writes the last target.
+    assert streamBackend.writes[-1] == (50, 0, 100, 50)
+    stats = stream.stats()
+    assert (stats.received, stats.applied, stats.dropped) == (50, 3, 47)
+
+
+def test_moveTo_reads_once(streamBackend):
+    window = pygetwindow.getAllWindows()[0]
+    streamBackend.numReads = 0
+    window.moveTo(10, 20)
+    assert streamBackend.numReads == 1 and window.topleft == (10, 20) and window.size == (100, 50)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,73 @@
+from __future__ import division, print_function
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, STATE_VISIBLE, STATE_MINIMIZED, STATE_MAXIMIZED, STATE_ACTIVE
+
+
+ROWS = [
+    (1, (0, 0, 100, 100), 'first', STATE_VISIBLE),
+    (2, (10, 10, 60, 60), 'second', STATE_VISIBLE | STATE_MAXIMIZED),
+    (3, (-32000, -32000, -31840, -31972), 'third', STATE_VISIBLE | STATE_MINIMIZED),
+]
+
+
+def test_state(fakeBackend):
+    pygetwindow.useBackend(fakeBackend(ROWS, activeHandle=2))
+    first, second, third = pygetwindow.getAllWindows()
+
+    state = second.state()
+    assert state.rect == Rect(10, 10, 60, 60)
+    assert state.flags == STATE_VISIBLE | STATE_MAXIMIZED | STATE_ACTIVE
+    assert state.isMaximized and state.isActive and state.visible and not state.isMinimized
+    assert (state.isMaximized, state.isActive) == (second.isMaximized, second.isActive)
+
+    assert first.state().flags == STATE_VISIBLE
+    assert third.state().isMinimized
+
+
+def test_states(fakeBackend):
+    backend = fakeBackend(ROWS, activeHandle=1)
+    pygetwindow.useBackend(backend)
+    windows = pygetwindow.getAllWindows()
+
+    calls = []
+    getActiveWindowHandle = backend._getActiveWindowHandle
+    backend._getActiveWindowHandle = lambda: calls.append(1) or getActiveWindowHandle()
+
+    results = pygetwindow.states(windows)
+    assert len(calls) == 1  # The active window is only looked up once.
+    assert [r.flags for r in results] == [STATE_VISIBLE | STATE_ACTIVE, STATE_VISIBLE | STATE_MAXIMIZED, STATE_VISIBLE | STATE_MINIMIZED]
+    assert results == [window.state() for window in windows]
+
+
+def test_children(fakeBackend):
+    backend = fakeBackend(ROWS)
+    for handle in (11, 12, 111, 112, 1111):
+        backend.rows[handle] = (handle, (0, 0, 10, 10), 'child %s' % (handle), STATE_VISIBLE)
+    backend.children = {1: [11, 12], 11: [111, 112], 111: [1111]}
+    pygetwindow.useBackend(backend)
+    first = pygetwindow.getAllWindows()[0]
+
+    assert [w._hWnd for w in first.children()] == [11, 12]
+    assert [w._hWnd for w in first.descendants()] == [11, 111, 1111, 112, 12]
+    assert [w._hWnd for w in first.descendants(maxDepth=2)] == [11, 111, 112, 12]
+    assert [w._hWnd for w in first.descendants(maxDepth=1)] == [11, 12]
+
+    # Subtrees are only enumerated when they're reached.
+    backend.numEnumChildCalls = 0
+    descendants = first.descendants()
+    next(descendants)
+    assert backend.numEnumChildCalls == 1
+
+    # With a snapshot, each window's children are only enumerated once.
+    snap = pygetwindow.getSnapshot()
+    backend.numEnumChildCalls = 0
+    list(first.descendants(snapshot=snap))
+    list(first.descendants(snapshot=snap))
+    assert [w._hWnd for w in first.children(snap)] == [11, 12]
+    assert backend.numEnumChildCalls == 6  # One for each of the six windows in the tree.
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,97 @@
+from __future__ import division, print_function
+
+import pytest
+import pygetwindow
+from pygetwindow import Rect, WindowSet, STATE_VISIBLE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+RECTS = [
+    (0, 0, 100, 100),     # 0
+    (50, 50, 150, 150),   # 1 overlaps 0
+    (10, 10, 20, 20),     # 2 inside 0
+    (300, 0, 400, 100),   # 3 to the right of 0
+    (0, 300, 100, 400),   # 4 below 0
+]
+
+useNumPyValues = [False, pytest.param(True, marks=pytest.mark.skipif(numpy is None, reason='NumPy is not installed'))]
+
+
+def asLists(matrix):
+    return [[value for value in row] for row in matrix]
+
+
+@pytest.mark.parametrize('useNumPy', useNumPyValues)
+def test_windowset_queries(useNumPy):
+    windows = WindowSet(RECTS, useNumPy=useNumPy)
+    assert len(windows) == 5
+    assert windows.rect(1) == Rect(50, 50, 150, 150)
+    assert list(windows.areas()) == [10000, 10000, 100, 10000, 10000]
+    assert windows.boundingBox() == Rect(0, 0, 400, 400)
+    assert windows.boundingBox([0, 2]) == Rect(0, 0, 100, 100)
+    assert WindowSet([], useNumPy=useNumPy).boundingBox() is None
+    assert list(windows.intersections((90, 90, 110, 110))) == [100, 400, 0, 0, 0]
+    assert windows.containing(15, 15) == [0, 2]
+    assert windows.containing(100, 100) == [1]  # Edges don't count.
+    assert windows.unionArea() == 10000 * 4 - 2500  # Window 2 is inside window 0.
+
+
+@pytest.mark.parametrize('useNumPy', useNumPyValues)
+def test_windowset_matrices(useNumPy):
+    windows = WindowSet(RECTS, useNumPy=useNumPy)
+    intersections = asLists(windows.intersectionMatrix())
+    assert intersections[0] == [10000, 2500, 100, 0, 0]
+    assert intersections[1][0] == 2500
+
+    iou = asLists(windows.iouMatrix())
+    assert iou[0][0] == 1.0
+    assert iou[0][1] == pytest.approx(2500 / 17500)
+    assert iou[0][3] == 0.0
+
+    containment = asLists(windows.containmentMatrix())
+    assert containment[0] == [True, False, True, False, False]
+    assert not containment[2][0]
+
+
+@pytest.mark.parametrize('useNumPy', useNumPyValues)
+def test_windowset_neighbor(useNumPy):
+    windows = WindowSet(RECTS, useNumPy=useNumPy)
+    assert windows.neighbor(0, 'right') == 1  # Closer than 3, and only slightly off-axis.
+    assert windows.neighbor(1, 'down') == 4
+    assert windows.neighbor(3, 'left') == 0  # Straight across beats 1, which is nearer but off-axis.
+    assert windows.neighbor(4, 'down') == -1
+    assert windows.neighbor(2, 'up') == -1
+    with pytest.raises(pygetwindow.PyGetWindowException):
+        windows.neighbor(0, 'sideways')
+
+
+def test_windowset_numpy_matches_fallback():
+    if numpy is None:
+        pytest.skip('NumPy is not installed')
+    rng = numpy.random.RandomState(0)
+    rects = []
+    for i in range(200):
+        left, top = rng.randint(0, 1000, size=2)
+        rects.append((left, top, left + rng.randint(1, 300), top + rng.randint(1, 300)))
+    fast, slow = WindowSet(rects, useNumPy=True), WindowSet(rects, useNumPy=False)
+    assert asLists(fast.intersectionMatrix()) == slow.intersectionMatrix()
+    assert numpy.allclose(fast.iouMatrix(), slow.iouMatrix())
+    assert asLists(fast.containmentMatrix()) == slow.containmentMatrix()
+    for i in range(len(rects)):
+        for direction in ('left', 'right', 'up', 'down'):
+            assert fast.neighbor(i, direction) == slow.neighbor(i, direction)
+
+
+def test_windowset_fromSnapshot(makeSnapshot):
+    snap = makeSnapshot([(10, (0, 0, 10, 10), 'a', STATE_VISIBLE), (20, (5, 5, 15, 15), 'b', STATE_VISIBLE)])
+    windows = WindowSet.fromSnapshot(snap, useNumPy=False)
+    assert windows.handles == [10, 20]
+    assert windows.rect(1) == Rect(5, 5, 15, 15)
+
+
+if __name__ == '__main__':
+    pytest.main()
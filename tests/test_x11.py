@@ -0,0 +1,123 @@
+from __future__ import division, print_function
+
+import pytest
+import pygetwindow
+
+
+# These run against a real X server: an Xvfb started for the session, with a
+# window manager and tkinter windows (see the fixtures in conftest.py). They
+# are skipped where Xvfb or a window manager isn't installed.
+
+
+def test_find_windows(tkWindow):
+    window = tkWindow()
+    assert window in pygetwindow.getAllWindows()
+    assert pygetwindow.getWindowsWithTitle(window.title.upper()) == [window]
+    assert window.title in pygetwindow.getAllTitles()
+    assert window._hWnd in pygetwindow.getSnapshot()
+
+
+def test_maximize_minimize_restore(tkWindow, waitFor):
+    window = tkWindow()
+    assert not window.isMaximized and not window.isMinimized
+
+    window.maximize()
+    waitFor(lambda: window.isMaximized)
+    window.restore()
+    waitFor(lambda: not window.isMaximized)
+    window.minimize()
+    waitFor(lambda: window.isMinimized)
+    window.restore()
+    waitFor(lambda: not window.isMinimized)
+
+
+def test_resize_and_move(tkWindow, waitFor):
+    window = tkWindow()
+
+    window.resizeTo(300, 200)
+    waitFor(lambda: window.size == (300, 200))
+    window.resizeRel(10, 20)
+    waitFor(lambda: window.size == (310, 220))
+
+    window.moveTo(10, 20)
+    waitFor(lambda: window.topleft == (10, 20))
+    assert window.bottomright == (320, 240)
+    window.moveRel(1, 2)
+    waitFor(lambda: window.topleft == (11, 22))
+    assert window.bottomleft == (11, 242) and window.topright == (321, 22)
+
+
+def test_properties(tkWindow, waitFor):
+    window = tkWindow()
+    window.resizeTo(301, 201)
+    waitFor(lambda: window.size == (301, 201))
+
+    window.left = 200
+    waitFor(lambda: window.left == 200)
+    window.bottom = 400
+    waitFor(lambda: window.bottom == 400)
+    window.center = (500, 400)
+    waitFor(lambda: window.center == (500, 400))
+    window.size = (320, 240)
+    waitFor(lambda: window.size == (320, 240))
+
+
+def test_activate_and_close(tkWindow, waitFor):
+    first = tkWindow()
+    second = tkWindow()
+    first.activate()
+    waitFor(lambda: first.isActive)
+    second.activate()
+    waitFor(lambda: second.isActive and pygetwindow.getActiveWindow() == second)
+
+    second.close()
+    waitFor(lambda: second not in pygetwindow.getAllWindows())
+
+
+def test_capture(tkWindow, waitFor):
+    window = tkWindow(background='#ff0000')
+
+    def centerPixel():
+        frame = window.capture()
+        height, width = frame.shape[:2]
+        return frame[height // 2, width // 2, :3].tolist()
+
+    # The window is red once tkinter has drawn it. Pixels are BGRA (or BGRX).
+    waitFor(lambda: centerPixel() == [0, 0, 255])
+    frames = pygetwindow.captureWindows([window, window])
+    assert frames[0].shape == frames[1].shape
+
+
+def test_capture_resized_window(tkWindow, waitFor, x11Backend):
+    window = tkWindow()
+    with pygetwindow.WindowCapture(x11Backend) as capture:
+        for width in (300, 310, 320, 330):
+            window.resizeTo(width, 200)
+            waitFor(lambda: window.size == (width, 200))
+            assert waitFor(lambda: capture.capture(window)).shape[:2] == (200, width)
+        # Each region of the shared memory keeps one XImage, for the size last captured into it.
+        assert len(capture._session._images) <= 1
+
+
+def test_lost_connection(xvfbServer):
+    from pygetwindow._pygetwindow_linux import X11Backend, xlib
+
+    if not hasattr(xlib, 'XSetIOErrorExitHandler'):
+        pytest.skip('This libX11 exits the process when the connection is lost.')
+    server, displayName = xvfbServer
+    backend = X11Backend(displayName)
+    try:
+        backend._enumWindowHandles()
+        server.kill()
+        server.wait()
+        # Xlib would exit the process here if its default exit handler ran.
+        with pytest.raises(pygetwindow.PyGetWindowException):
+            backend._enumWindowHandles()
+        with pytest.raises(pygetwindow.PyGetWindowException):
+            backend._enumWindowHandles()
+    finally:
+        backend.close()
+
+
+if __name__ == '__main__':
+    pytest.main()